@@ -1148,6 +1148,11 @@ async def ws_clear_zone_demand(
     {
         vol.Required("type"): "ramses_extras/subscribe_messages",
         vol.Optional("codes", default=[]): [str],
+        vol.Optional("batch_ms", default=0): vol.All(int, vol.Range(min=0, max=60_000)),
+        vol.Optional("max_batch", default=100): vol.All(
+            int, vol.Range(min=1, max=1000)
+        ),
+        vol.Optional("coalesce", default=False): bool,
     }
 )
 @callback  # type: ignore[untyped-decorator]
@@ -1163,21 +1168,33 @@ def ws_subscribe_messages(
 
     Optional ``codes`` parameter filters by message code (e.g. ``["31DA",
     "10D0"]``).  When omitted, all messages are pushed.
+
+    By default every message is pushed as its own ``ramses_message`` event.
+    With ``batch_ms`` > 0, messages are collected for up to ``batch_ms``
+    milliseconds (or until ``max_batch`` are pending) and pushed as one
+    ``ramses_message_batch`` event with a ``messages`` list.  ``coalesce``
+    additionally keeps only the newest message per ``(src, code)`` within a
+    batch, for cards that only display current state; the event's
+    ``coalesced`` count tells how many were dropped.
     """
 
-    from ...framework.helpers.ramses_message_stream import get_ramses_message_stream
+    from ...framework.helpers.ramses_message_stream import (
+        MessageBatcher,
+        RamsesStreamMessage,
+        get_ramses_message_stream,
+    )
 
     target_codes: set[str] = {code.upper() for code in (msg.get("codes") or []) if code}
+    batch_ms = int(msg.get("batch_ms") or 0)
 
     stream = get_ramses_message_stream(hass)
     stream.start()
 
     @callback  # type: ignore[untyped-decorator]
     def _on_message(data: dict[str, Any]) -> None:
-        if target_codes:
-            code = str(data.get("code", "")).upper()
-            if code not in target_codes:
-                return
+        if isinstance(data, RamsesStreamMessage):
+            # Only messages pushed to the browser get decoded.
+            data.resolve()
         connection.send_message(
             websocket_api.event_message(
                 msg["id"],
@@ -1188,8 +1205,40 @@ def ws_subscribe_messages(
             )
         )
 
-    unsubscribe = stream.subscribe(_on_message)
-    connection.subscriptions[msg["id"]] = unsubscribe
+    def _send_batch(messages: list[dict[str, Any]], coalesced: int) -> None:
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {
+                    "event_type": "ramses_message_batch",
+                    "messages": messages,
+                    "coalesced": coalesced,
+                },
+            )
+        )
+
+    batcher: MessageBatcher | None = None
+    if batch_ms > 0:
+        batcher = MessageBatcher(
+            hass,
+            _send_batch,
+            batch_ms=batch_ms,
+            max_batch=int(msg.get("max_batch", 100)),
+            coalesce=bool(msg.get("coalesce", False)),
+        )
+
+    # The stream only dispatches messages with one of the requested codes.
+    unsubscribe = stream.subscribe(
+        batcher.add if batcher is not None else _on_message, codes=target_codes
+    )
+
+    @callback  # type: ignore[untyped-decorator]
+    def _unsubscribe() -> None:
+        unsubscribe()
+        if batcher is not None:
+            batcher.cancel()
+
+    connection.subscriptions[msg["id"]] = _unsubscribe
     connection.send_result(msg["id"], {"success": True})
 
 
@@ -775,11 +775,8 @@ async def create_device_simulator_feature(
 
     def _handle_processed_message(data: dict[str, Any]) -> None:
         frame = data.get("frame")
-        verb = data.get("verb")
         if not isinstance(frame, str) or not frame.strip():
             return
-        if verb not in {"RP", "I"}:
-            return
         dtm = data.get("dtm")
         timestamp = None
         if isinstance(dtm, str):
@@ -790,7 +787,7 @@ async def create_device_simulator_feature(
         registry["device_simulator_engine"].log_processed_frame(frame, timestamp)
 
     registry["device_simulator_message_stream_unsub"] = stream.subscribe(
-        _handle_processed_message
+        _handle_processed_message, verbs=("RP", "I")
     )
 
     # Restore persisted auto_answer and answer_unknown_devices settings into the
@@ -8,6 +8,8 @@ from custom_components.ramses_extras.const import DOMAIN
 
 from .const import DOMAIN as RAMSES_DEBUGGER_DOMAIN
 from .debugger_cache import DebuggerCache
+from .packet_log_follower import PacketLogFollower
+from .packet_log_index import flush_packet_log_indexes
 from .traffic_collector import TrafficCollector
 
 _LOGGER = logging.getLogger(__name__)
@@ -38,21 +40,29 @@ def create_ramses_debugger_feature(
 
     traffic_collector = debugger_data.get("traffic_collector")
     if traffic_collector is None or not hasattr(traffic_collector, "configure"):
-        traffic_collector = TrafficCollector(hass)
+        traffic_collector = TrafficCollector(hass, persist=True)
         debugger_data["traffic_collector"] = traffic_collector
         config_entry.async_on_unload(traffic_collector.stop)
+        config_entry.async_on_unload(traffic_collector.async_save)
 
     traffic_collector.configure(
         max_flows=config_entry.options.get("ramses_debugger_max_flows"),
         buffer_max_global=config_entry.options.get("ramses_debugger_buffer_max_global"),
-        buffer_max_per_flow=config_entry.options.get(
-            "ramses_debugger_buffer_max_per_flow"
-        ),
-        buffer_max_flows=config_entry.options.get("ramses_debugger_buffer_max_flows"),
     )
 
     traffic_collector.start()
 
+    packet_log_follower = debugger_data.get("packet_log_follower")
+    if packet_log_follower is None or not hasattr(packet_log_follower, "start"):
+        packet_log_follower = PacketLogFollower(hass)
+        debugger_data["packet_log_follower"] = packet_log_follower
+        config_entry.async_on_unload(packet_log_follower.stop)
+
+    async def _async_flush_packet_log_indexes() -> None:
+        await hass.async_add_executor_job(flush_packet_log_indexes)
+
+    config_entry.async_on_unload(_async_flush_packet_log_indexes)
+
     return {
         "feature_name": RAMSES_DEBUGGER_DOMAIN,
         "traffic_collector": traffic_collector,
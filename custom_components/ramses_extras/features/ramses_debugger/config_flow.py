@@ -52,16 +52,6 @@ async def async_step_ramses_debugger_config(
         if isinstance(buffer_max_global, int):
             new_options["ramses_debugger_buffer_max_global"] = int(buffer_max_global)
 
-        buffer_max_per_flow = user_input.get("ramses_debugger_buffer_max_per_flow")
-        if isinstance(buffer_max_per_flow, int):
-            new_options["ramses_debugger_buffer_max_per_flow"] = int(
-                buffer_max_per_flow
-            )
-
-        buffer_max_flows = user_input.get("ramses_debugger_buffer_max_flows")
-        if isinstance(buffer_max_flows, int):
-            new_options["ramses_debugger_buffer_max_flows"] = int(buffer_max_flows)
-
         default_poll_ms = user_input.get("ramses_debugger_default_poll_ms")
         if isinstance(default_poll_ms, int):
             new_options["ramses_debugger_default_poll_ms"] = int(default_poll_ms)
@@ -119,24 +109,6 @@ async def async_step_ramses_debugger_config(
         else 5000
     )
 
-    buffer_max_per_flow_default_raw = current_options.get(
-        "ramses_debugger_buffer_max_per_flow"
-    )
-    buffer_max_per_flow_default = (
-        int(buffer_max_per_flow_default_raw)
-        if isinstance(buffer_max_per_flow_default_raw, int)
-        else 500
-    )
-
-    buffer_max_flows_default_raw = current_options.get(
-        "ramses_debugger_buffer_max_flows"
-    )
-    buffer_max_flows_default = (
-        int(buffer_max_flows_default_raw)
-        if isinstance(buffer_max_flows_default_raw, int)
-        else 2000
-    )
-
     default_poll_ms_default_raw = current_options.get("ramses_debugger_default_poll_ms")
     default_poll_ms_default = (
         int(default_poll_ms_default_raw)
@@ -170,14 +142,6 @@ async def async_step_ramses_debugger_config(
                 "ramses_debugger_buffer_max_global",
                 default=buffer_max_global_default,
             ): vol.All(int, vol.Range(min=1, max=200_000)),
-            vol.Optional(
-                "ramses_debugger_buffer_max_per_flow",
-                default=buffer_max_per_flow_default,
-            ): vol.All(int, vol.Range(min=1, max=50_000)),
-            vol.Optional(
-                "ramses_debugger_buffer_max_flows",
-                default=buffer_max_flows_default,
-            ): vol.All(int, vol.Range(min=1, max=50_000)),
             vol.Optional(
                 "ramses_debugger_default_poll_ms",
                 default=default_poll_ms_default,
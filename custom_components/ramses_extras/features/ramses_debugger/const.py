@@ -13,11 +13,15 @@ RAMSES_DEBUGGER_WEBSOCKET_COMMANDS: dict[str, str] = {
     "traffic_get_stats": "ramses_extras/ramses_debugger/traffic/get_stats",
     "traffic_reset_stats": "ramses_extras/ramses_debugger/traffic/reset_stats",
     "traffic_subscribe_stats": "ramses_extras/ramses_debugger/traffic/subscribe_stats",
+    "traffic_get_rates": "ramses_extras/ramses_debugger/traffic/get_rates",
+    "traffic_get_latency": "ramses_extras/ramses_debugger/traffic/get_latency",
     "log_list_files": "ramses_extras/ramses_debugger/log/list_files",
     "log_get_tail": "ramses_extras/ramses_debugger/log/get_tail",
     "log_search": "ramses_extras/ramses_debugger/log/search",
+    "log_search_stream": "ramses_extras/ramses_debugger/log/search_stream",
     "packet_log_list_files": "ramses_extras/ramses_debugger/packet_log/list_files",
     "packet_log_get_messages": "ramses_extras/ramses_debugger/packet_log/get_messages",
+    "packet_log_subscribe": "ramses_extras/ramses_debugger/packet_log/subscribe",
     "messages_get_messages": "ramses_extras/ramses_debugger/messages/get_messages",
     "cache_get_stats": "ramses_extras/ramses_debugger/cache/get_stats",
     "cache_clear": "ramses_extras/ramses_debugger/cache/clear",
@@ -5,7 +5,10 @@ This module provides:
 - Discovery of log files (base file + rotated variants).
 - Allowlisted resolution of a user-provided ``file_id`` to an on-disk path.
 - Efficient tail reading for plain text and gzip files.
+- A memory-mapped byte prefilter for marker lines in a log tail.
+- Line-number range reads backed by a sparse line index (plain and gzip).
 - Best-effort search with context blocks.
+- Timestamp bisection to read only the lines within a time window.
 
 All public helpers are designed for use by WebSocket handlers.
 """
@@ -13,8 +16,12 @@ All public helpers are designed for use by WebSocket handlers.
 from __future__ import annotations
 
 import gzip
+import mmap
 import os
+import re
+import time
 from collections import deque
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -24,6 +31,12 @@ from homeassistant.core import HomeAssistant
 
 from custom_components.ramses_extras.const import DOMAIN
 
+from .log_index import GzipLineIndex, get_line_index, supports_line_index
+
+_LEADING_TIMESTAMP_RE = re.compile(
+    rb"^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?)"
+)
+
 
 @dataclass(frozen=True)
 class LogFileInfo:
@@ -252,8 +265,8 @@ def tail_text(path: Path, *, max_lines: int = 200, max_chars: int = 200_000) ->
     """Read the tail of a log file.
 
     For plain text files this seeks backwards from EOF to limit reads.
-    For gzip files it falls back to streaming and retaining the last
-    ``max_lines``.
+    For gzip files the shared checkpoint index is used so only the data after
+    the nearest checkpoint is decompressed.
 
     :param path: Log file path.
     :param max_lines: Maximum lines returned.
@@ -268,6 +281,9 @@ def tail_text(path: Path, *, max_lines: int = 200, max_chars: int = 200_000) ->
         return ""
 
     if path.suffix == ".gz":
+        if supports_line_index(path):
+            return read_tail_lines(path, max_lines=max_lines, max_chars=max_chars)
+
         buf: deque[str] = deque(maxlen=max_lines)
         for line in _open_text(path):
             buf.append(line)
@@ -303,6 +319,87 @@ def tail_text(path: Path, *, max_lines: int = 200, max_chars: int = 200_000) ->
     return out
 
 
+RAMSES_LINE_MARKERS: tuple[bytes, ...] = (b"ramses", b"Ramses", b"RAMSES")
+
+
+def tail_marked_lines(
+    path: Path,
+    *,
+    markers: tuple[bytes, ...] = RAMSES_LINE_MARKERS,
+    require: tuple[bytes, ...] = (),
+    max_bytes: int = 10_000_000,
+) -> str:
+    """Return the lines in the tail of a log file that contain a marker.
+
+    The last ``max_bytes`` of a plain file are memory-mapped and searched as
+    bytes, so only candidate lines are ever decoded. Gzip files (and files
+    that cannot be mapped) fall back to a streamed read of the same window.
+
+    :param path: Log file path.
+    :param markers: Byte strings of which at least one must occur in a line.
+    :param require: Byte strings that must all occur in a line.
+    :param max_bytes: Size of the scanned tail window.
+    :return: Matching lines, oldest first, newline separated.
+    """
+
+    max_bytes = max(0, int(max_bytes))
+    if max_bytes == 0 or not markers:
+        return ""
+
+    def _keep(line: bytes) -> bool:
+        return all(r in line for r in require)
+
+    if path.suffix != ".gz":
+        try:
+            with path.open("rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return ""
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    window = max(0, size - max_bytes)
+                    if window:
+                        # Skip the partial line the window starts in.
+                        window = mm.find(b"\n", window - 1) + 1
+                        if window == 0:
+                            return ""
+                    starts: set[int] = set()
+                    for marker in markers:
+                        pos = window
+                        while (hit := mm.find(marker, pos)) >= 0:
+                            start = max(window, mm.rfind(b"\n", window, hit) + 1)
+                            starts.add(start)
+                            end = mm.find(b"\n", hit)
+                            if end < 0:
+                                break
+                            pos = end + 1
+
+                    out: list[str] = []
+                    for start in sorted(starts):
+                        end = mm.find(b"\n", start)
+                        line = mm[start : end if end >= 0 else size]
+                        if _keep(line):
+                            out.append(
+                                line.decode("utf-8", errors="replace").rstrip("\r")
+                            )
+                    return "\n".join(out)
+        except (OSError, ValueError):
+            pass
+
+    # Keep only candidate lines with their start offset, then drop the ones
+    # that fall before the tail window.
+    hits: deque[tuple[int, bytes]] = deque()
+    total = 0
+    for raw in _open_binary(path):
+        if any(m in raw for m in markers) and _keep(raw):
+            hits.append((total, raw))
+        total += len(raw)
+        while hits and hits[0][0] < total - max_bytes:
+            hits.popleft()
+    return "\n".join(
+        raw.decode("utf-8", errors="replace").rstrip("\r\n") for _, raw in hits
+    )
+
+
 @dataclass(frozen=True)
 class LogBlock:
     """A contiguous block of log lines returned from search."""
@@ -316,6 +413,9 @@ class LogBlock:
 def read_file_lines(path: Path, start_line: int, end_line: int) -> list[str]:
     """Read a specific range of lines from a file.
 
+    The shared line index is used so the read starts at the nearest
+    checkpoint instead of line 1.
+
     :param path: Path to the file
     :param start_line: 1-based line number to start from
     :param end_line: 1-based line number to end at (inclusive)
@@ -324,33 +424,171 @@ def read_file_lines(path: Path, start_line: int, end_line: int) -> list[str]:
     if not path.exists() or not path.is_file():
         return []
 
-    lines = []
     try:
-        with open(path, encoding="utf-8", errors="replace") as f:
-            for current_line, line in enumerate(f, 1):
-                if current_line > end_line:
-                    break
-                if current_line >= start_line:
-                    lines.append(line.rstrip("\n\r"))
-    except (OSError, UnicodeDecodeError):
+        if supports_line_index(path):
+            return get_line_index(path).read_lines(start_line, end_line)
+
+        lines = []
+        for current_line, line in enumerate(_open_text(path), 1):
+            if current_line > end_line:
+                break
+            if current_line >= start_line:
+                lines.append(line.rstrip("\n\r"))
+        return lines
+    except (OSError, EOFError, UnicodeDecodeError):
         return []
 
-    return lines
 
+def count_file_lines(path: Path) -> int:
+    """Return the number of lines in a log file.
 
-def _merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
-    if not ranges:
-        return []
+    Answered from the shared line index, which only scans bytes appended
+    since the previous call (gzip files are indexed once).
+    """
+
+    try:
+        if supports_line_index(path):
+            return get_line_index(path).line_count
+        return sum(1 for _ in _open_text(path))
+    except (OSError, EOFError):
+        return 0
+
+
+def read_tail_lines(
+    path: Path,
+    *,
+    max_lines: int = 200,
+    offset_lines: int = 0,
+    max_chars: int = 200_000,
+) -> str:
+    """Read ``max_lines`` lines ending ``offset_lines`` before EOF.
 
-    ranges.sort()
-    merged: list[tuple[int, int]] = [ranges[0]]
-    for start, end in ranges[1:]:
-        prev_start, prev_end = merged[-1]
-        if start <= prev_end + 1:
-            merged[-1] = (prev_start, max(prev_end, end))
+    This is the paging counterpart of :func:`tail_text`. Files are read
+    through the line index so paging far back into a large file does not
+    require reading everything after the requested window.
+
+    :param path: Log file path.
+    :param max_lines: Maximum lines returned.
+    :param offset_lines: Number of lines to skip back from EOF.
+    :param max_chars: Maximum characters returned (oldest text is dropped).
+    :return: Tail content.
+    """
+
+    max_lines = max(0, min(int(max_lines), 10_000))
+    offset_lines = max(0, int(offset_lines))
+    max_chars = max(0, min(int(max_chars), 2_000_000))
+
+    if max_lines == 0 or max_chars == 0:
+        return ""
+
+    if not supports_line_index(path):
+        text = tail_text(path, max_lines=max_lines + offset_lines, max_chars=max_chars)
+        lines = text.splitlines(keepends=True)
+        if offset_lines >= len(lines):
+            return ""
+        return "".join(lines[:-offset_lines] if offset_lines else lines)
+
+    index = get_line_index(path)
+    end_line = index.line_count - offset_lines
+    if end_line < 1:
+        return ""
+
+    start_line = max(1, end_line - max_lines + 1)
+    out = "".join(f"{line}\n" for line in index.read_lines(start_line, end_line))
+    if len(out) > max_chars:
+        out = out[-max_chars:]
+    return out
+
+
+def _open_binary(path: Path) -> Iterable[bytes]:
+    if path.suffix == ".gz":
+        with gzip.open(path, "rb") as f:
+            yield from f
+    else:
+        with path.open("rb") as f:
+            yield from f
+
+
+def _empty_search_result() -> dict[str, Any]:
+    return {
+        "matches": 0,
+        "blocks": [],
+        "truncated": False,
+        "truncated_by_max_chars": False,
+        "truncated_by_max_matches": False,
+    }
+
+
+def _trie_pattern(terms: list[str]) -> str:
+    """Return a regex source matching any of ``terms``.
+
+    Terms are merged into a prefix trie so shared prefixes (e.g. device ids
+    ``32:153289`` / ``32:153290``) are tested once per position, which keeps
+    the cost close to a single pattern instead of growing with every term.
+    Search only needs *whether* a term occurs, so a term that is a prefix of
+    another one makes the longer term redundant.
+    """
+
+    trie: dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            if "" in node:
+                break
+            node = node.setdefault(ch, {})
         else:
-            merged.append((start, end))
-    return merged
+            node.clear()
+            node[""] = {}
+
+    def _build(node: dict[str, Any]) -> str:
+        parts: list[str] = []
+        while "" not in node:
+            if len(node) == 1:
+                ((ch, node),) = node.items()
+                parts.append(re.escape(ch))
+                continue
+            alts = [re.escape(ch) + _build(child) for ch, child in sorted(node.items())]
+            parts.append(f"(?:{'|'.join(alts)})")
+            break
+        return "".join(parts)
+
+    return _build(trie)
+
+
+def compile_search_pattern(
+    query: str, *, case_sensitive: bool = False, regex: bool = False
+) -> re.Pattern[str] | None:
+    """Compile the OR terms of a search query into one pattern.
+
+    Each non-empty line of ``query`` is a term. Plain terms are matched
+    literally through a trie-shaped alternation; with ``regex`` every term is
+    a regular expression. Case-insensitive matching uses ``re.IGNORECASE``
+    instead of lowercasing every scanned line.
+
+    :param query: Search query.
+    :param case_sensitive: Whether matching is case sensitive.
+    :param regex: Treat terms as regular expressions.
+    :return: Compiled pattern, or None if the query has no terms.
+    :raises ValueError: If a regex term is invalid.
+    """
+
+    if not isinstance(query, str):
+        return None
+
+    terms = [t.strip() for t in query.splitlines() if t.strip()]
+    if not terms:
+        return None
+
+    flags = 0 if case_sensitive else re.IGNORECASE
+    if regex:
+        source = "|".join(f"(?:{t})" for t in terms)
+    else:
+        source = _trie_pattern(terms if case_sensitive else [t.lower() for t in terms])
+
+    try:
+        return re.compile(source, flags)
+    except re.error as exc:
+        raise ValueError(f"Invalid search pattern: {exc}") from exc
 
 
 def search_with_context(
@@ -362,9 +600,14 @@ def search_with_context(
     max_matches: int = 200,
     max_chars: int = 400_000,
     case_sensitive: bool = False,
+    regex: bool = False,
 ) -> dict[str, Any]:
     """Search for one or more terms and return surrounding context blocks.
 
+    The file is read exactly once. The previous ``before`` lines are kept in a
+    bounded deque so a block can be opened retroactively when a match is found,
+    and overlapping or adjacent context windows are merged while streaming.
+
     :param path: Log file path.
     :param query: Search query. Multiple lines are treated as OR terms.
     :param before: Context lines before each match.
@@ -372,7 +615,11 @@ def search_with_context(
     :param max_matches: Maximum matches considered.
     :param max_chars: Maximum returned output size.
     :param case_sensitive: Whether matching is case sensitive.
-    :return: A dict containing plain/markdown content plus structured blocks.
+    :param regex: Treat each term as a regular expression.
+    :return: A dict containing plain/markdown content plus structured blocks,
+        along with scan statistics (``scan_lines``, ``scan_bytes``,
+        ``scan_seconds`` and ``scan_bytes_per_s``).
+    :raises ValueError: If ``regex`` is set and a term is invalid.
     """
 
     before = max(0, min(int(before), 200))
@@ -380,62 +627,31 @@ def search_with_context(
     max_matches = max(0, min(int(max_matches), 5000))
     max_chars = max(0, min(int(max_chars), 2_000_000))
 
-    if not isinstance(query, str) or not query:
-        return {
-            "matches": 0,
-            "blocks": [],
-            "truncated": False,
-            "truncated_by_max_chars": False,
-            "truncated_by_max_matches": False,
-        }
-
-    terms = [t.strip() for t in query.splitlines() if t.strip()]
-    if not terms:
-        return {
-            "matches": 0,
-            "blocks": [],
-            "truncated": False,
-            "truncated_by_max_chars": False,
-            "truncated_by_max_matches": False,
-        }
-
-    needles = terms if case_sensitive else [t.lower() for t in terms]
+    pattern = compile_search_pattern(query, case_sensitive=case_sensitive, regex=regex)
+    if pattern is None:
+        return _empty_search_result()
+    search = pattern.search
 
     match_lines: list[int] = []
-    ranges: list[tuple[int, int]] = []
-    truncated_by_max_matches = False
-
-    for idx, line in enumerate(_open_text(path), start=1):
-        hay = line if case_sensitive else line.lower()
-        if any(needle in hay for needle in needles):
-            match_lines.append(idx)
-            ranges.append((max(1, idx - before), idx + after))
-            if len(match_lines) >= max_matches:
-                truncated_by_max_matches = True
-                break
-
-    merged = _merge_ranges(ranges)
-    if not merged:
-        return {
-            "matches": 0,
-            "blocks": [],
-            "truncated": False,
-            "truncated_by_max_chars": False,
-            "truncated_by_max_matches": False,
-        }
-
     blocks: list[LogBlock] = []
-    current_idx = 0
-    current_range = merged[current_idx]
-    start, end = current_range
-    current_lines: list[str] = []
+    history: deque[tuple[int, str]] = deque(maxlen=before)
+
+    # Currently open block: [start, end], collected lines and the last line
+    # number appended. A block stays open for ``before`` lines past ``end`` so
+    # a following match whose window overlaps or touches it can be merged.
+    start = end = last_line = 0
+    current_lines: list[str] | None = None
 
     total_chars = 0
-    truncated = False
     truncated_by_max_chars = False
+    truncated_by_max_matches = False
 
-    for idx, line in enumerate(_open_text(path), start=1):
-        while idx > end:
+    scan_lines = 0
+    scan_bytes = 0
+    started = time.monotonic()
+
+    def _close_block() -> None:
+        if current_lines:
             blocks.append(
                 LogBlock(
                     file_id=path.name,
@@ -444,59 +660,248 @@ def search_with_context(
                     lines=current_lines,
                 )
             )
-            current_idx += 1
-            if current_idx >= len(merged):
-                break
-            start, end = merged[current_idx]
-            current_lines = []
 
-        if current_idx >= len(merged):
+    for idx, raw in enumerate(_open_binary(path), start=1):
+        scan_lines = idx
+        scan_bytes += len(raw)
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+
+        if not truncated_by_max_matches and search(line):
+            match_lines.append(idx)
+            if len(match_lines) >= max_matches:
+                truncated_by_max_matches = True
+
+            if truncated_by_max_chars:
+                # Output is full; keep counting matches only.
+                if truncated_by_max_matches:
+                    break
+                continue
+
+            match_start = max(1, idx - before)
+            if current_lines is None or match_start > end + 1:
+                _close_block()
+                start = match_start
+                current_lines = []
+                last_line = match_start - 1
+            end = max(end, idx + after)
+
+            for prev_idx, prev in history:
+                if prev_idx > last_line:
+                    total_chars += len(prev) + 1
+                    current_lines.append(prev)
+                    last_line = prev_idx
+
+        if current_lines is not None:
+            if idx <= end:
+                total_chars += len(line) + 1
+                current_lines.append(line)
+                last_line = idx
+            elif idx > end + before:
+                _close_block()
+                current_lines = None
+
+        if total_chars > max_chars and not truncated_by_max_chars:
+            truncated_by_max_chars = True
+            current_lines = None
+
+        if truncated_by_max_matches and (current_lines is None or idx >= end):
             break
 
-        if start <= idx <= end:
-            s = line.rstrip("\n")
-            total_chars += len(s) + 1
-            if total_chars > max_chars:
-                truncated = True
-                truncated_by_max_chars = True
-                break
-            current_lines.append(s)
-
-    if current_idx < len(merged) and current_lines and not truncated:
-        blocks.append(
-            LogBlock(
-                file_id=path.name,
-                start_line=start,
-                end_line=end,
-                lines=current_lines,
-            )
+        if before:
+            history.append((idx, line))
+
+    _close_block()
+
+    scan_seconds = time.monotonic() - started
+
+    if not match_lines:
+        result = _empty_search_result()
+    else:
+        plain = "\n\n".join(
+            "\n".join(block.lines) for block in blocks if block.lines
+        ).strip("\n")
+        markdown = f"```text\n{plain}\n```" if plain else ""
+
+        result = {
+            "matches": len(match_lines),
+            "match_lines": match_lines,
+            "blocks": [
+                {
+                    "file_id": b.file_id,
+                    "start_line": b.start_line,
+                    "end_line": b.end_line,
+                    "lines": b.lines,
+                }
+                for b in blocks
+            ],
+            "plain": plain,
+            "markdown": markdown,
+            "truncated": truncated_by_max_chars or truncated_by_max_matches,
+            "truncated_by_max_chars": truncated_by_max_chars,
+            "truncated_by_max_matches": truncated_by_max_matches,
+        }
+
+    result.update(
+        {
+            "scan_lines": scan_lines,
+            "scan_bytes": scan_bytes,
+            "scan_seconds": round(scan_seconds, 6),
+            "scan_bytes_per_s": int(scan_bytes / scan_seconds) if scan_seconds else 0,
+        }
+    )
+    return result
+
+
+def _line_timestamp(line: bytes) -> str | None:
+    match = _LEADING_TIMESTAMP_RE.match(line)
+    return match.group(1).decode("ascii") if match else None
+
+
+def _bisect_first(
+    lo: int,
+    hi: int,
+    probe: Callable[[int, int], tuple[int, str | None]],
+    pred: Callable[[str], bool],
+) -> int:
+    """Return the first position whose timestamped line satisfies ``pred``.
+
+    ``probe(pos, hi)`` returns the position and timestamp of the first
+    timestamped line starting at or after ``pos`` (or ``(hi, None)``).
+    Positions are byte offsets or line numbers; ``pred`` must be monotonic
+    (false ... true) over the file, which holds for time-ordered logs.
+    """
+
+    end = hi
+    while lo < hi:
+        mid = (lo + hi) // 2
+        pos, ts = probe(mid, hi)
+        if ts is None or pred(ts):
+            hi = mid
+        else:
+            lo = pos + 1
+    return probe(lo, end)[0]
+
+
+def find_time_window(
+    path: Path, *, since: str | None = None, until: str | None = None
+) -> tuple[int, int]:
+    """Return the byte range ``[start, end)`` of a plain log's time window.
+
+    :param path: Plain text log file path.
+    :param since: Inclusive lower bound timestamp.
+    :param until: Inclusive upper bound timestamp.
+    :return: ``(start, end)`` byte offsets aligned to line starts.
+    """
+
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+
+        def _probe(pos: int, hi: int) -> tuple[int, str | None]:
+            if pos <= 0:
+                f.seek(0)
+            else:
+                # Land on the first line starting at or after pos.
+                f.seek(pos - 1)
+                f.readline()
+            while (start := f.tell()) < hi:
+                line = f.readline()
+                if not line:
+                    break
+                ts = _line_timestamp(line)
+                if ts is not None:
+                    return start, ts
+            return hi, None
+
+        start = _bisect_first(0, size, _probe, lambda ts: ts >= since) if since else 0
+        end = (
+            _bisect_first(start, size, _probe, lambda ts: ts > until) if until else size
         )
+    return start, end
+
+
+def _iter_plain_time_window(
+    path: Path, since: str | None, until: str | None
+) -> Iterator[str]:
+    start, end = find_time_window(path, since=since, until=until)
+    with path.open("rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            raw = f.readline()
+            if not raw:
+                break
+            yield raw.decode("utf-8", errors="replace").rstrip("\r\n")
 
-    plain = "\n\n".join(
-        "\n".join(block.lines) for block in blocks if block.lines
-    ).strip("\n")
-    markdown = f"```text\n{plain}\n```" if plain else ""
 
-    truncated = truncated or truncated_by_max_matches
+def _iter_gzip_time_window(
+    index: GzipLineIndex, since: str | None, until: str | None
+) -> Iterator[str]:
+    count = index.line_count
 
-    return {
-        "matches": len(match_lines),
-        "match_lines": match_lines,
-        "blocks": [
-            {
-                "file_id": b.file_id,
-                "start_line": b.start_line,
-                "end_line": b.end_line,
-                "lines": b.lines,
-            }
-            for b in blocks
-        ],
-        "plain": plain,
-        "markdown": markdown,
-        "truncated": truncated,
-        "truncated_by_max_chars": truncated_by_max_chars,
-        "truncated_by_max_matches": truncated_by_max_matches,
-    }
+    def _probe(pos: int, hi: int) -> tuple[int, str | None]:
+        for line_no, text in index.iter_lines(max(1, pos)):
+            if line_no >= hi:
+                break
+            ts = _line_timestamp(text.encode("utf-8", errors="replace"))
+            if ts is not None:
+                return line_no, ts
+        return hi, None
+
+    start = _bisect_first(1, count + 1, _probe, lambda ts: ts >= since) if since else 1
+    end = (
+        _bisect_first(start, count + 1, _probe, lambda ts: ts > until)
+        if until
+        else count + 1
+    )
+
+    for line_no, text in index.iter_lines(start):
+        if line_no >= end:
+            break
+        yield text
+
+
+def iter_time_window(
+    path: Path, *, since: str | None = None, until: str | None = None
+) -> Iterator[str]:
+    """Yield the lines of a time-ordered log within ``[since, until]``.
+
+    Lines are expected to start with an ISO timestamp (as written by the
+    ramses packet log). The window boundaries are located by binary search:
+    over byte offsets for plain files and over line numbers (via the gzip
+    checkpoint index) for rotated ``.gz`` files, so only the window itself is
+    read. Comparison is lexicographic, matching the string filters used by
+    the message providers.
+
+    :param path: Log file path.
+    :param since: Inclusive lower bound timestamp.
+    :param until: Inclusive upper bound timestamp.
+    :return: Iterator of lines (oldest first, line terminators stripped).
+    """
+
+    index = get_line_index(path)
+    if isinstance(index, GzipLineIndex):
+        yield from _iter_gzip_time_window(index, since, until)
+    else:
+        yield from _iter_plain_time_window(path, since, until)
+
+
+def get_time_bounds(path: Path) -> tuple[str | None, str | None]:
+    """Return the first and last leading timestamps found in a log file.
+
+    :param path: Log file path.
+    :return: ``(first, last)``; either may be ``None`` if not found.
+    """
+
+    first: str | None = None
+    for _, line in zip(range(50), _open_binary(path), strict=False):
+        if (first := _line_timestamp(line)) is not None:
+            break
+
+    last: str | None = None
+    for line in reversed(tail_text(path, max_lines=50).splitlines()):
+        if (last := _line_timestamp(line.encode("utf-8"))) is not None:
+            break
+
+    return first, last
 
 
 def resolve_file_id(hass: HomeAssistant, file_id: str) -> Path | None:
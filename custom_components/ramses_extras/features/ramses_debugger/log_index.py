@@ -0,0 +1,403 @@
+"""Sparse line-offset indexes for Ramses Debugger log files.
+
+Paging through a multi-hundred-MB ``home-assistant.log`` by line number used to
+require scanning the file from line 1 on every request. :class:`LineIndex`
+records a ``(line_number, byte_offset)`` checkpoint at a line boundary roughly
+every ``checkpoint_bytes`` so line lookups become a seek plus a short forward
+read.
+
+Rotated ``.N.gz`` files cannot be seeked into directly. :class:`GzipLineIndex`
+follows the zran approach instead: while decompressing once it snapshots the
+inflate state (``zlib`` decompressor copies) at regular uncompressed offsets,
+so later reads resume from the nearest snapshot rather than byte 0.
+
+Indexes are:
+
+- keyed by file identity (inode + size + mtime) and rebuilt when the file is
+  rotated, truncated or rewritten
+- extended incrementally when a plain file only grew (log files are
+  append-only); gzip files are immutable once rotated
+- kept in a small process-wide registry so every WebSocket handler reuses them
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+DEFAULT_CHECKPOINT_BYTES = 64 * 1024
+DEFAULT_GZIP_CHECKPOINT_BYTES = 1024 * 1024
+
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+_GZIP_READ_BYTES = 32 * 1024
+# Each gzip checkpoint holds a ~32 KiB inflate window; spacing doubles once
+# this many are held so memory stays bounded for very large files.
+_MAX_GZIP_CHECKPOINTS = 64
+
+_HEAD_BYTES = 256
+_MAX_INDEXES = 16
+
+
+class LineIndex:
+    """Sparse, incrementally built line-offset index for one plain text file.
+
+    :param path: Path to the indexed file.
+    :param checkpoint_bytes: Approximate byte distance between checkpoints.
+    """
+
+    def __init__(
+        self, path: Path, *, checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES
+    ) -> None:
+        self.path = path
+        self._checkpoint_bytes = max(1024, int(checkpoint_bytes))
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._inode: int | None = None
+        self._size = 0
+        self._mtime_ns = 0
+        self._head = b""
+        # Offset just after the last complete (newline-terminated) line.
+        self._indexed_bytes = 0
+        # Complete lines in [0, _indexed_bytes).
+        self._complete_lines = 0
+        # Parallel checkpoint columns: line number starting at offset.
+        self._lines: list[int] = [1]
+        self._offsets: list[int] = [0]
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the file as of the last refresh.
+
+        A trailing line without a newline is counted, matching iteration over
+        the file object.
+        """
+
+        partial = 1 if self._size > self._indexed_bytes else 0
+        return self._complete_lines + partial
+
+    @property
+    def checkpoints(self) -> int:
+        """Number of checkpoints currently held by the index."""
+        return len(self._offsets)
+
+    def refresh(self) -> None:
+        """Bring the index up to date with the file on disk.
+
+        :raises OSError: If the file cannot be read.
+        """
+
+        with self._lock:
+            st = self.path.stat()
+            size = int(st.st_size)
+            mtime_ns = int(st.st_mtime_ns)
+
+            if (
+                self._inode != st.st_ino
+                or size < self._indexed_bytes
+                or (size == self._size and mtime_ns != self._mtime_ns)
+                or (self._head and self._read_head()[: len(self._head)] != self._head)
+            ):
+                self._reset()
+                self._inode = st.st_ino
+
+            if size > self._indexed_bytes:
+                self._extend(size)
+
+            if len(self._head) < _HEAD_BYTES:
+                self._head = self._read_head()
+
+            self._size = size
+            self._mtime_ns = mtime_ns
+
+    def _read_head(self) -> bytes:
+        with self.path.open("rb") as f:
+            return f.read(_HEAD_BYTES)
+
+    def _extend(self, size: int) -> None:
+        """Index complete lines between the last indexed offset and ``size``."""
+
+        with self.path.open("rb") as f:
+            pos = self._indexed_bytes
+            f.seek(pos)
+            while pos < size:
+                chunk = f.read(min(self._checkpoint_bytes, size - pos))
+                if not chunk:
+                    break
+
+                last_nl = chunk.rfind(b"\n")
+                pos += len(chunk)
+                if last_nl < 0:
+                    continue
+
+                self._complete_lines += chunk.count(b"\n")
+                self._indexed_bytes = pos - len(chunk) + last_nl + 1
+                if self._indexed_bytes - self._offsets[-1] >= self._checkpoint_bytes:
+                    self._lines.append(self._complete_lines + 1)
+                    self._offsets.append(self._indexed_bytes)
+
+                # Re-read any partial line at the start of the next chunk.
+                if pos != self._indexed_bytes:
+                    pos = self._indexed_bytes
+                    f.seek(pos)
+
+    def locate(self, line_no: int) -> tuple[int, int]:
+        """Return the nearest checkpoint at or before ``line_no``.
+
+        :param line_no: 1-based line number.
+        :return: ``(checkpoint_line, byte_offset)``.
+        """
+
+        idx = max(0, bisect_right(self._lines, max(1, int(line_no))) - 1)
+        return self._lines[idx], self._offsets[idx]
+
+    def iter_lines(self, start_line: int) -> Iterator[tuple[int, str]]:
+        """Yield ``(line_no, text)`` pairs from ``start_line`` to EOF.
+
+        Lines are decoded as UTF-8 (with replacement) and stripped of their
+        line terminator. :meth:`refresh` must have been called first.
+        """
+
+        line_no, offset = self.locate(start_line)
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if line_no >= start_line:
+                    yield line_no, raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                line_no += 1
+
+    def read_lines(self, start_line: int, end_line: int) -> list[str]:
+        """Return lines ``start_line``..``end_line`` (1-based, inclusive)."""
+
+        if end_line < start_line:
+            return []
+
+        lines: list[str] = []
+        for line_no, text in self.iter_lines(start_line):
+            if line_no > end_line:
+                break
+            lines.append(text)
+        return lines
+
+
+def _inflate(decomp: Any, chunk: bytes) -> tuple[Any, bytes]:
+    """Feed ``chunk`` to ``decomp``, following gzip member boundaries.
+
+    :return: ``(decompressor, output)``; the decompressor is replaced when a
+        new gzip member starts.
+    :raises zlib.error: If the data is not valid gzip.
+    """
+
+    out: list[bytes] = []
+    while chunk:
+        if decomp.eof:
+            decomp = zlib.decompressobj(_GZIP_WBITS)
+        out.append(decomp.decompress(chunk))
+        chunk = decomp.unused_data if decomp.eof else b""
+    return decomp, b"".join(out)
+
+
+class GzipLineIndex:
+    """zran-style checkpoint index for one gzip-compressed log file.
+
+    Each checkpoint stores the line number of the first line it yields, the
+    compressed offset to resume reading from, a copy of the decompressor state
+    at that offset and the bytes of the partial line already produced.
+
+    :param path: Path to the indexed ``.gz`` file.
+    :param checkpoint_bytes: Approximate uncompressed distance between
+        checkpoints.
+    """
+
+    def __init__(
+        self, path: Path, *, checkpoint_bytes: int = DEFAULT_GZIP_CHECKPOINT_BYTES
+    ) -> None:
+        self.path = path
+        self._initial_checkpoint_bytes = max(1024, int(checkpoint_bytes))
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._identity: tuple[int, int, int] | None = None
+        self._checkpoint_bytes = self._initial_checkpoint_bytes
+        self._line_count = 0
+        self._uncompressed_size = 0
+        # (line_no, compressed_offset, decompressor or None, partial_line)
+        self._checkpoints: list[tuple[int, int, Any, bytes]] = [(1, 0, None, b"")]
+        self._lines: list[int] = [1]
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the decompressed file."""
+        return self._line_count
+
+    @property
+    def uncompressed_size(self) -> int:
+        """Size of the decompressed content in bytes."""
+        return self._uncompressed_size
+
+    @property
+    def checkpoints(self) -> int:
+        """Number of checkpoints currently held by the index."""
+        return len(self._checkpoints)
+
+    def refresh(self) -> None:
+        """Build the index if the file is new or changed since the last build.
+
+        :raises OSError: If the file cannot be read.
+        """
+
+        with self._lock:
+            st = self.path.stat()
+            identity = (int(st.st_ino), int(st.st_size), int(st.st_mtime_ns))
+            if identity == self._identity:
+                return
+
+            self._reset()
+            self._build()
+            self._identity = identity
+
+    def _build(self) -> None:
+        decomp = zlib.decompressobj(_GZIP_WBITS)
+        complete_lines = 0
+        uncompressed = 0
+        last_checkpoint = 0
+        partial = b""
+
+        with self.path.open("rb") as f:
+            offset = 0
+            while chunk := f.read(_GZIP_READ_BYTES):
+                offset += len(chunk)
+                try:
+                    decomp, data = _inflate(decomp, chunk)
+                except zlib.error:
+                    break
+
+                if not data:
+                    continue
+
+                uncompressed += len(data)
+                complete_lines += data.count(b"\n")
+                last_nl = data.rfind(b"\n")
+                partial = data[last_nl + 1 :] if last_nl >= 0 else partial + data
+
+                if uncompressed - last_checkpoint >= self._checkpoint_bytes:
+                    self._add_checkpoint(
+                        (complete_lines + 1, offset, decomp.copy(), partial)
+                    )
+                    last_checkpoint = uncompressed
+
+        self._uncompressed_size = uncompressed
+        self._line_count = complete_lines + (1 if partial else 0)
+
+    def _add_checkpoint(self, checkpoint: tuple[int, int, Any, bytes]) -> None:
+        self._checkpoints.append(checkpoint)
+        if len(self._checkpoints) > _MAX_GZIP_CHECKPOINTS:
+            self._checkpoints = self._checkpoints[::2]
+            self._checkpoint_bytes *= 2
+        self._lines = [cp[0] for cp in self._checkpoints]
+
+    def locate(self, line_no: int) -> tuple[int, int]:
+        """Return the nearest checkpoint at or before ``line_no``.
+
+        :param line_no: 1-based line number.
+        :return: ``(checkpoint_line, compressed_offset)``.
+        """
+
+        idx = max(0, bisect_right(self._lines, max(1, int(line_no))) - 1)
+        return self._checkpoints[idx][0], self._checkpoints[idx][1]
+
+    def iter_lines(self, start_line: int) -> Iterator[tuple[int, str]]:
+        """Yield ``(line_no, text)`` pairs from ``start_line`` to EOF.
+
+        Decompression resumes from the nearest checkpoint. :meth:`refresh`
+        must have been called first.
+        """
+
+        idx = max(0, bisect_right(self._lines, max(1, int(start_line))) - 1)
+        line_no, offset, saved, buf = self._checkpoints[idx]
+        decomp = saved.copy() if saved is not None else zlib.decompressobj(_GZIP_WBITS)
+
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            while chunk := f.read(_GZIP_READ_BYTES):
+                try:
+                    decomp, data = _inflate(decomp, chunk)
+                except zlib.error:
+                    break
+
+                buf += data
+                if b"\n" not in data:
+                    continue
+
+                *complete, buf = buf.split(b"\n")
+                for raw in complete:
+                    if line_no >= start_line:
+                        yield (
+                            line_no,
+                            raw.decode("utf-8", errors="replace").rstrip("\r"),
+                        )
+                    line_no += 1
+
+        if buf and line_no >= start_line:
+            yield line_no, buf.decode("utf-8", errors="replace").rstrip("\r")
+
+    def read_lines(self, start_line: int, end_line: int) -> list[str]:
+        """Return lines ``start_line``..``end_line`` (1-based, inclusive)."""
+
+        if end_line < start_line:
+            return []
+
+        lines: list[str] = []
+        for line_no, text in self.iter_lines(start_line):
+            if line_no > end_line:
+                break
+            lines.append(text)
+        return lines
+
+
+_registry: OrderedDict[str, LineIndex | GzipLineIndex] = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def get_line_index(path: Path) -> LineIndex | GzipLineIndex:
+    """Return the shared, refreshed line index for ``path``.
+
+    ``.gz`` files get a :class:`GzipLineIndex`, everything else a
+    :class:`LineIndex`. The registry keeps the most recently used indexes so
+    repeated paging, tail and search calls reuse prior work.
+
+    :raises OSError: If the file cannot be read.
+    """
+
+    key = str(path)
+    with _registry_lock:
+        index = _registry.get(key)
+        if index is None:
+            index = GzipLineIndex(path) if path.suffix == ".gz" else LineIndex(path)
+            _registry[key] = index
+            while len(_registry) > _MAX_INDEXES:
+                _registry.popitem(last=False)
+        else:
+            _registry.move_to_end(key)
+
+    index.refresh()
+    return index
+
+
+def clear_line_indexes() -> None:
+    """Drop all cached line indexes."""
+    with _registry_lock:
+        _registry.clear()
+
+
+def supports_line_index(path: Path) -> bool:
+    """Return True if ``path`` is a regular file that can be indexed."""
+    return os.path.isfile(path)
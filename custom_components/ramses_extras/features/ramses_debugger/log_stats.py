@@ -0,0 +1,408 @@
+"""Streaming traffic statistics over log files for the Ramses Debugger.
+
+``traffic/get_stats`` for the ``packet_log`` and ``ha_log`` sources used to
+materialize (up to 20,000) message dicts, dedupe and sort them, and only then
+count. :func:`get_log_traffic_stats` instead streams parsed lines straight
+into a :class:`TrafficAggregate`, which keeps one counter per
+``(src, dst, verb, code)``. Every stats filter (``device_id``, ``src``,
+``dst``, ``verb``, ``code``) can be answered from those counters, so one
+aggregate serves all filter combinations.
+
+Aggregates are checkpointed per byte range of each file:
+
+- a plain file is split into ranges of :data:`CHECKPOINT_BYTES`; each sealed
+  range keeps its partial aggregate and only the open tail range grows
+- appended data is parsed once and merged into the open range
+- a truncated file keeps the ranges that still fit, a rotated or rewritten
+  file (inode or head change) is re-aggregated from the start
+- gzip files are aggregated whole and reused until their size or mtime change
+
+Duplicate lines are counted once, as on the deduped message path: lines in
+the regular ramses_log layout are keyed by their raw packet bytes, others by
+:func:`~.packet_log_parse.message_key`. Duplicates share a timestamp, so only
+the keys of the current timestamp are remembered.
+"""
+
+from __future__ import annotations
+
+import gzip
+import re
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from .log_backend import RAMSES_LINE_MARKERS
+from .packet_log_parse import (
+    MessageKey,
+    NormalizedMessage,
+    message_key,
+    parse_ha_log_line,
+    parse_packet_log_line,
+)
+
+CHECKPOINT_BYTES = 4 * 1024 * 1024
+_READ_BYTES = 256 * 1024
+_HEAD_BYTES = 256
+_MAX_INDEXES = 8
+
+AggregateKey = tuple[str, str, str, str]
+
+# The regular ramses_log line layout, matched on raw bytes so the common case
+# skips decoding and tokenizing; other layouts fall back to the full parser.
+# Like the parser, it requires the payload length after the code.
+_PACKET_LINE = re.compile(
+    rb"(\S+) (?:\d{3}|---|\.\.\.) +([A-Z]{1,2}) (?:\d{3}|---) "
+    rb"(--:------|\d{2}:\d{6}) (--:------|\d{2}:\d{6}) "
+    rb"(?:--:------|\d{2}:\d{6}) ([0-9A-F]{4}) \d{3}(?:\s|$)"
+)
+
+
+class TrafficAggregate:
+    """Mergeable message counts per ``(src, dst, verb, code)``.
+
+    Each entry holds ``[count, first_dtm, last_dtm]``; a missing verb or code
+    is stored as ``""``.
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self) -> None:
+        self.counts: dict[AggregateKey, list[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, src: str, dst: str, verb: str, code: str, dtm: str) -> None:
+        """Count one message."""
+        key = (src, dst, verb, code)
+        entry = self.counts.get(key)
+        if entry is None:
+            self.counts[key] = [1, dtm, dtm]
+            return
+        entry[0] += 1
+        if dtm:
+            if not entry[1] or dtm < entry[1]:
+                entry[1] = dtm
+            if dtm > entry[2]:
+                entry[2] = dtm
+
+    def merge(self, other: TrafficAggregate) -> None:
+        """Add the counts of ``other`` into this aggregate."""
+        for key, (count, first, last) in other.counts.items():
+            entry = self.counts.get(key)
+            if entry is None:
+                self.counts[key] = [count, first, last]
+                continue
+            entry[0] += count
+            if first and (not entry[1] or first < entry[1]):
+                entry[1] = first
+            if last > entry[2]:
+                entry[2] = last
+
+    def to_stats(
+        self,
+        *,
+        device_id: str | None = None,
+        src: str | None = None,
+        dst: str | None = None,
+        verb: str | None = None,
+        code: str | None = None,
+        limit: int = 200,
+    ) -> dict[str, Any]:
+        """Return a ``traffic/get_stats`` payload for the matching messages.
+
+        :param device_id: Count messages where this device is src or dst.
+        :param src: Count messages from this src.
+        :param dst: Count messages to this dst.
+        :param verb: Count messages with this verb.
+        :param code: Count messages with this code.
+        :param limit: Maximum flows returned (sorted by total count).
+        """
+
+        by_code: Counter[str] = Counter()
+        by_verb: Counter[str] = Counter()
+        flows: dict[tuple[str, str], dict[str, Any]] = {}
+        started_at = ""
+        total_count = 0
+
+        for (src_, dst_, verb_, code_), (count, first, last) in self.counts.items():
+            if device_id and device_id not in (src_, dst_):
+                continue
+            if (src and src_ != src) or (dst and dst_ != dst):
+                continue
+            if (verb and verb_ != verb) or (code and code_ != code):
+                continue
+
+            total_count += count
+            if first and (not started_at or first < started_at):
+                started_at = first
+            if code_:
+                by_code[code_] += count
+            if verb_:
+                by_verb[verb_] += count
+
+            flow = flows.get((src_, dst_))
+            if flow is None:
+                flow = {
+                    "src": src_,
+                    "dst": dst_,
+                    "count_total": 0,
+                    "last_seen": None,
+                    "verbs": Counter(),
+                    "codes": Counter(),
+                }
+                flows[(src_, dst_)] = flow
+            flow["count_total"] += count
+            if last and (flow["last_seen"] is None or last > flow["last_seen"]):
+                flow["last_seen"] = last
+            if verb_:
+                flow["verbs"][verb_] += count
+            if code_:
+                flow["codes"][code_] += count
+
+        flow_list = sorted(flows.values(), key=lambda f: f["count_total"], reverse=True)
+        return {
+            "started_at": started_at,
+            "total_count": total_count,
+            "by_code": dict(by_code),
+            "by_verb": dict(by_verb),
+            "flows": [
+                {**f, "verbs": dict(f["verbs"]), "codes": dict(f["codes"])}
+                for f in flow_list[: max(0, int(limit))]
+            ],
+        }
+
+
+class LogStatsIndex:
+    """Byte-range checkpointed traffic aggregate of one log file.
+
+    :param path: Log file path.
+    :param parse_line: Parser returning a message for a traffic line.
+    :param markers: Optional byte markers; lines without any are skipped
+        before decoding.
+    :param fast_line: Optional byte pattern matching the common line layout,
+        capturing dtm, verb, src, dst and code without running ``parse_line``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        parse_line: Callable[[str], NormalizedMessage | None],
+        markers: tuple[bytes, ...] | None = None,
+        fast_line: re.Pattern[bytes] | None = None,
+    ) -> None:
+        self.path = path
+        self._parse_line = parse_line
+        self._markers = markers
+        self._fast_line = fast_line
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._identity: tuple[int, ...] | None = None
+        self._head = b""
+        # Sealed ``(start, end, aggregate)`` ranges, in file order.
+        self._checkpoints: list[tuple[int, int, TrafficAggregate]] = []
+        self._sealed = TrafficAggregate()
+        self._open = TrafficAggregate()
+        self._open_start = 0
+        self._end = 0
+        self._dedupe_dtm = ""
+        self._dedupe_keys: set[MessageKey | bytes] = set()
+
+    @property
+    def checkpoints(self) -> list[tuple[int, int]]:
+        """Byte ranges with a sealed partial aggregate."""
+        return [(start, end) for start, end, _agg in self._checkpoints]
+
+    @property
+    def indexed_bytes(self) -> int:
+        """Offset just after the last aggregated (complete) line."""
+        return self._end
+
+    def aggregate(self) -> TrafficAggregate:
+        """Bring the aggregate up to date and return a merged copy.
+
+        :raises OSError: If the file cannot be read.
+        """
+
+        with self._lock:
+            if self.path.suffix == ".gz":
+                self._refresh_gzip()
+            else:
+                self._refresh_plain()
+            merged = TrafficAggregate()
+            merged.merge(self._sealed)
+            merged.merge(self._open)
+            return merged
+
+    def _add_lines(self, data: bytes, agg: TrafficAggregate) -> None:
+        markers = self._markers
+        for raw in data.split(b"\n"):
+            if not raw:
+                continue
+            if markers and not any(m in raw for m in markers):
+                continue
+
+            match = self._fast_line.match(raw) if self._fast_line else None
+            key: MessageKey | bytes
+            if match is not None:
+                dtm, verb, src, dst, code = (g.decode() for g in match.groups())
+                # The packet as raw bytes: everything after the timestamp up
+                # to a trailing comment. Keys only live for one timestamp, so
+                # it identifies the message on its own.
+                comment = raw.find(b"#", match.end())
+                key = raw[match.end(1) : comment if comment >= 0 else None].strip()
+            else:
+                msg = self._parse_line(raw.decode("utf-8", errors="replace"))
+                if msg is None:
+                    continue
+                src, dst = msg.src, msg.dst
+                if not isinstance(src, str) or not isinstance(dst, str):
+                    continue
+                dtm = msg.dtm if isinstance(msg.dtm, str) else ""
+                verb = msg.verb if isinstance(msg.verb, str) else ""
+                code = msg.code if isinstance(msg.code, str) else ""
+                key = message_key(dtm, src, dst, verb, code, msg.packet, msg.payload)
+
+            if dtm != self._dedupe_dtm:
+                self._dedupe_dtm = dtm
+                self._dedupe_keys.clear()
+            if key in self._dedupe_keys:
+                continue
+            self._dedupe_keys.add(key)
+            agg.add(src, dst, verb, code, dtm)
+
+    def _refresh_gzip(self) -> None:
+        st = self.path.stat()
+        identity = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if identity == self._identity:
+            return
+        self._reset()
+        agg = TrafficAggregate()
+        carry = b""
+        with gzip.open(self.path, "rb") as f:
+            while chunk := f.read(_READ_BYTES):
+                data = carry + chunk
+                cut = data.rfind(b"\n") + 1
+                self._add_lines(data[:cut], agg)
+                carry = data[cut:]
+        self._add_lines(carry, agg)
+        self._identity = identity
+        self._sealed = agg
+
+    def _refresh_plain(self) -> None:
+        st = self.path.stat()
+        with self.path.open("rb") as f:
+            head = f.read(_HEAD_BYTES)
+            if self._identity != (st.st_ino,) or head[: len(self._head)] != self._head:
+                self._reset()
+                self._identity = (st.st_ino,)
+            elif st.st_size < self._end:
+                self._truncate(st.st_size)
+            self._head = head
+
+            f.seek(self._end)
+            remaining = st.st_size - self._end
+            carry = b""
+            while remaining > 0:
+                chunk = f.read(min(_READ_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                data = carry + chunk
+                cut = data.rfind(b"\n") + 1
+                if cut:
+                    self._add_lines(data[:cut], self._open)
+                    self._end += cut
+                    carry = data[cut:]
+                    if self._end - self._open_start >= CHECKPOINT_BYTES:
+                        self._seal()
+                else:
+                    carry = data
+
+    def _seal(self) -> None:
+        self._checkpoints.append((self._open_start, self._end, self._open))
+        self._sealed.merge(self._open)
+        self._open = TrafficAggregate()
+        self._open_start = self._end
+
+    def _truncate(self, size: int) -> None:
+        """Drop the aggregates of ranges past ``size`` (file shrank)."""
+        kept = [cp for cp in self._checkpoints if cp[1] <= size]
+        self._checkpoints = kept
+        self._sealed = TrafficAggregate()
+        for _start, _end, agg in kept:
+            self._sealed.merge(agg)
+        self._open = TrafficAggregate()
+        self._open_start = self._end = kept[-1][1] if kept else 0
+        self._dedupe_dtm = ""
+        self._dedupe_keys.clear()
+
+
+_PARSERS: dict[str, dict[str, Any]] = {
+    "packet_log": {"parse_line": parse_packet_log_line, "fast_line": _PACKET_LINE},
+    "ha_log": {"parse_line": parse_ha_log_line, "markers": RAMSES_LINE_MARKERS},
+}
+
+_registry: OrderedDict[tuple[str, str], LogStatsIndex] = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def get_log_stats_index(path: Path, *, kind: str) -> LogStatsIndex:
+    """Return the shared :class:`LogStatsIndex` for a log file.
+
+    :param path: Log file path.
+    :param kind: ``packet_log`` or ``ha_log``.
+    """
+
+    key = (kind, str(path))
+    with _registry_lock:
+        index = _registry.get(key)
+        if index is None:
+            index = LogStatsIndex(path, **_PARSERS[kind])
+            _registry[key] = index
+            while len(_registry) > _MAX_INDEXES:
+                _registry.popitem(last=False)
+        else:
+            _registry.move_to_end(key)
+    return index
+
+
+def get_log_traffic_stats(
+    path: Path,
+    *,
+    kind: str,
+    device_id: str | None = None,
+    src: str | None = None,
+    dst: str | None = None,
+    verb: str | None = None,
+    code: str | None = None,
+    limit: int = 200,
+) -> dict[str, Any]:
+    """Return whole-file traffic stats for a packet log or HA log (blocking).
+
+    :param path: Log file path.
+    :param kind: ``packet_log`` or ``ha_log``.
+    :param device_id: Count messages where this device is src or dst.
+    :param src: Count messages from this src.
+    :param dst: Count messages to this dst.
+    :param verb: Count messages with this verb.
+    :param code: Count messages with this code.
+    :param limit: Maximum flows returned (sorted by total count).
+    :raises OSError: If the file cannot be read.
+    """
+
+    aggregate = get_log_stats_index(path, kind=kind).aggregate()
+    return aggregate.to_stats(
+        device_id=device_id, src=src, dst=dst, verb=verb, code=code, limit=limit
+    )
+
+
+def clear_log_stats_indexes() -> None:
+    """Drop all in-memory log stats aggregates."""
+    with _registry_lock:
+        _registry.clear()
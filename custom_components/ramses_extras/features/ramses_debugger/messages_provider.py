@@ -13,24 +13,49 @@ Sources:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from collections import OrderedDict, deque
-from collections.abc import Iterator
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
 from contextlib import contextmanager
-from dataclasses import dataclass, field
 from datetime import datetime
 from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, cast
 
 from homeassistant.core import HomeAssistant
 
+from ...framework.helpers.ramses_decode_cache import (
+    decode_key,
+    decoded_fields,
+    get_decode_cache,
+)
 from .log_backend import (
+    discover_log_files,
+    find_time_window,
     get_configured_log_path,
     get_configured_packet_log_path,
+    get_time_bounds,
+    iter_time_window,
+    tail_marked_lines,
     tail_text,
 )
+from .packet_log_follower import get_packet_log_follower
+from .packet_log_index import STORAGE_DIR_NAME, get_packet_log_index
+from .packet_log_parse import (
+    PACKET_LOG_TAIL_BYTES,
+    MessageKey,
+    NormalizedMessage,
+    matches_filters,
+    message_key,
+    parse_ha_log_line,
+    parse_packet_log_line,
+    select_newest,
+)
+from .parsed_segments import get_parsed_segment_cache
+from .traffic_store import TrafficStore, event_dtm
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,178 +75,302 @@ class PacketLogParser:
         until: str | None = None,
         limit: int = 1000,
     ) -> list[NormalizedMessage]:
-        """Parse traffic records from ramses_log."""
+        """Parse traffic records from ramses_log.
+
+        Every query is first answered from the shared parsed-segment tier
+        over the file tail, whatever its filters. Only when the tail does not
+        reach far enough back are filtered queries (``src`` / ``dst`` /
+        ``verb`` / ``code``) answered from the on-disk inverted index, and
+        time windows located by binary search on the leading timestamps.
+        Without an explicit ``log_path`` the rotated variants of the
+        configured packet log are included in ``since`` / ``until`` queries.
+
+        Queries on the followed packet log are answered from the live
+        :class:`~.packet_log_follower.PacketLogFollower` window when it
+        reaches far enough back.
+        """
+        include_rotated = log_path is None
         if log_path is None:
             log_path = get_configured_packet_log_path(hass)
         if log_path is None:
             return []
 
+        filters: dict[str, Any] = {
+            "src": src,
+            "dst": dst,
+            "verb": verb,
+            "code": code,
+            "since": since,
+            "until": until,
+        }
+        has_older = include_rotated and bool(since or until)
+
         try:
-            # Tail reading approach: prefer newest messages.
+            follower = get_packet_log_follower(hass)
+            if follower is not None and follower.path == log_path:
+                live = follower.get_messages(
+                    **filters, limit=limit, has_older=has_older
+                )
+                if live is not None:
+                    return live
+
+            # Parsed records come from the shared segment tier so every filter
+            # combination reuses the same parse of the tail.
+            tail = await hass.async_add_executor_job(
+                partial(_read_packet_log_tail, log_path)
+            )
+            if tail is not None:
+                parsed, whole_file = tail
+                # Unfiltered, unbounded queries are answered from the tail alone.
+                complete = not any(filters.values()) or (whole_file and not has_older)
+                tail_messages = select_newest(
+                    parsed, **filters, limit=limit, complete=complete
+                )
+                if tail_messages is not None:
+                    return tail_messages
+
+            if any(filters.values()):
+                selected = await hass.async_add_executor_job(
+                    partial(
+                        _read_packet_log_messages,
+                        log_path,
+                        include_rotated=has_older,
+                        storage_dir=_get_index_storage_dir(hass),
+                        **filters,
+                        limit=limit,
+                    )
+                )
+                if selected is not None:
+                    return cast(list[NormalizedMessage], selected)
+
             # We tail more than `limit` lines to allow for filtering.
             max_lines = max(int(limit) * 50, 2000)
             content = await hass.async_add_executor_job(
                 partial(tail_text, log_path, max_lines=max_lines, max_chars=2_000_000)
             )
-            lines = content.splitlines()
+            parsed = [
+                msg
+                for line in content.splitlines()
+                if (msg := parse_packet_log_line(line))
+            ]
+            return select_newest(parsed, **filters, limit=limit, complete=True) or []
+        except Exception as exc:
+            _LOGGER.warning("PacketLogProvider error: %s", exc)
+            return []
 
-            messages: list[NormalizedMessage] = []
-            for line in reversed(lines):
-                msg = _parse_packet_log_line(line)
-                if not msg:
-                    continue
 
-                # Apply filters
-                if src and msg.src != src:
-                    continue
-                if dst and msg.dst != dst:
-                    continue
-                if verb and msg.verb != verb:
-                    continue
-                if code and msg.code != code:
-                    continue
-                if until and msg.dtm > until:
-                    continue
-                if since and msg.dtm < since:
-                    break
+def _read_packet_log_tail(
+    log_path: Path,
+) -> tuple[list[NormalizedMessage], bool] | None:
+    """Return parsed messages from the packet log tail (oldest first).
 
-                messages.append(msg)
-                if len(messages) >= limit:
-                    break
+    :return: ``(messages, whole_file)`` from the shared parsed segment tier,
+        where ``whole_file`` tells whether the tail starts at the beginning
+        of the file, or None if ``log_path`` is not a plain regular file.
+    """
 
-            return messages
-        except Exception as exc:
-            _LOGGER.warning("PacketLogProvider error: %s", exc)
-            return []
+    if log_path.suffix == ".gz" or not log_path.is_file():
+        return None
+
+    whole_file = log_path.stat().st_size <= PACKET_LOG_TAIL_BYTES
+    messages = get_parsed_segment_cache().get_tail(
+        log_path,
+        kind="packet_log",
+        parse_line=parse_packet_log_line,
+        max_bytes=PACKET_LOG_TAIL_BYTES,
+    )
+    return cast(list[NormalizedMessage], messages), whole_file
 
 
-def _parse_packet_log_line(line: str) -> NormalizedMessage | None:
-    """Parse a single ramses packet log line into a normalized message."""
-    # Common ramses_log formats:
-    # - With RSSI + extra fields:
-    #   2026-01-20T13:31:43.693075 000 RQ --- 18:149488 01:000000 --:------ 0006 001 00
-    #   2026-01-20T13:31:43.070025 036 I --- 32:153289 --:------ 32:153289 31DA
-    #   030
-    #   00EF...
-    # - Older/shorter format (kept for compatibility):
-    #   2026-01-20T09:58:48.263427 I 32:153289 37:123456 --:------ 31DA 003 010203
-    line_no_comment = line.split("#", 1)[0]
-    parts = line_no_comment.strip().split()
-    if len(parts) < 7:
+def _get_index_storage_dir(hass: HomeAssistant) -> Path | None:
+    try:
+        raw = hass.config.path(".storage", STORAGE_DIR_NAME)
+    except Exception:
         return None
+    return Path(raw) if isinstance(raw, str) else None
 
-    def _is_addr(token: str) -> bool:
-        return bool(re.match(r"^(--:------|\d{2}:\d{6})$", token))
 
-    def _is_code(token: str) -> bool:
-        return bool(re.match(r"^[0-9A-F]{4}$", token))
+def _read_indexed_messages(
+    path: Path,
+    *,
+    storage_dir: Path | None,
+    filters: dict[str, str | None],
+    limit: int,
+) -> list[NormalizedMessage]:
+    """Return the newest ``limit`` matches using the inverted index."""
+
+    since = filters.get("since")
+    until = filters.get("until")
+
+    index = get_packet_log_index(path, storage_dir=storage_dir)
+    start, end = (
+        find_time_window(path, since=since, until=until)
+        if since or until
+        else (0, None)
+    )
+    offsets = index.lookup(
+        src=filters.get("src"),
+        dst=filters.get("dst"),
+        verb=filters.get("verb"),
+        code=filters.get("code"),
+        start=start,
+        end=end,
+    )
 
-    def _is_len(token: str) -> bool:
-        return bool(re.match(r"^\d{3}$", token))
+    messages: list[NormalizedMessage] = []
+    with path.open("rb") as f:
+        for offset in reversed(offsets):
+            f.seek(offset)
+            line = f.readline().decode("utf-8", errors="replace").rstrip("\r\n")
+            msg = parse_packet_log_line(line)
+            if msg is None or not matches_filters(msg, **filters):
+                continue
+            messages.append(msg)
+            if len(messages) >= limit:
+                break
+    return messages
 
-    def _is_rssi(token: str) -> bool:
-        return bool(re.match(r"^(\d{3}|---|\.\.\.)$", token))
 
-    def _is_seqn(token: str) -> bool:
-        return _is_rssi(token)
+def _read_packet_log_messages(
+    log_path: Path,
+    *,
+    include_rotated: bool,
+    storage_dir: Path | None,
+    src: str | None,
+    dst: str | None,
+    verb: str | None,
+    code: str | None,
+    since: str | None,
+    until: str | None,
+    limit: int,
+) -> list[NormalizedMessage] | None:
+    """Read newest-first packet log messages matching filters and time window.
+
+    Files are visited newest first and skipped entirely when their first/last
+    timestamps do not overlap the requested window. Plain files use the
+    inverted index for field filters; otherwise the time window is scanned.
+
+    :return: Matching messages, or None if ``log_path`` is not a regular file
+        or the query has neither filters nor a time window (the caller then
+        falls back to tail parsing).
+    """
 
-    try:
-        dtm = parts[0]
-        i = 1
+    if not log_path.is_file():
+        return None
 
-        if i >= len(parts):
-            return None
+    filters: dict[str, str | None] = {
+        "src": src,
+        "dst": dst,
+        "verb": verb,
+        "code": code,
+        "since": since,
+        "until": until,
+    }
+    has_field_filter = bool(src or dst or verb or code)
+    if not has_field_filter and not (since or until):
+        return None
 
-        # ramses_log uses: "..." (or "063" etc.) before verb
-        if _is_rssi(parts[i]):
-            i += 1
+    paths = (
+        [f.path for f in discover_log_files(log_path)]
+        if include_rotated
+        else [log_path]
+    )
 
-        if i >= len(parts):
-            return None
+    messages: list[NormalizedMessage] = []
+    for path in paths:
+        remaining = limit - len(messages)
+        if remaining <= 0:
+            break
 
-        verb = parts[i]
-        i += 1
+        try:
+            if since or until:
+                first, last = get_time_bounds(path)
+                if since and last is not None and last < since:
+                    continue
+                if until and first is not None and first > until:
+                    continue
 
-        # ramses_log has a seqn token ("---" or digits like "245") after verb
-        if i < len(parts) and _is_seqn(parts[i]):
-            i += 1
+            if has_field_filter and path.suffix != ".gz":
+                messages.extend(
+                    _read_indexed_messages(
+                        path,
+                        storage_dir=storage_dir,
+                        filters=filters,
+                        limit=remaining,
+                    )
+                )
+                continue
 
-        rest = parts[i:]
+            newest: deque[NormalizedMessage] = deque(maxlen=remaining)
+            for line in iter_time_window(path, since=since, until=until):
+                msg = parse_packet_log_line(line)
+                if msg is not None and matches_filters(msg, **filters):
+                    newest.append(msg)
+        except OSError as exc:
+            _LOGGER.debug("Skipping packet log %s: %s", path, exc)
+            continue
 
-        addrs = [t for t in rest if _is_addr(t)]
-        if len(addrs) < 2:
-            return None
+        messages.extend(reversed(newest))
 
-        src, dst = addrs[0], addrs[1]
+    return messages
 
-        code_idx: int | None = None
-        for idx, token in enumerate(rest):
-            if _is_code(token):
-                code_idx = idx
-                break
-        if code_idx is None:
-            return None
 
-        code = rest[code_idx]
+# ramses_tx loggers that would echo decoded log lines (``packet_log`` writes
+# the packet log itself).
+_DECODE_LOGGERS = (
+    "ramses_tx.packet_log",
+    "ramses_tx.packet",
+    "ramses_tx.message",
+    "ramses_tx.parsers",
+)
+# Messages per executor job in :func:`async_decode_messages`.
+DECODE_BATCH_SIZE = 500
 
-        payload_len: str | None = None
-        payload_hex = ""
-        for idx in range(code_idx + 1, len(rest)):
-            token = rest[idx]
-            if _is_len(token):
-                payload_len = token
-                payload_hex = " ".join(rest[idx + 1 :])
-                break
 
-        if payload_len is None:
-            return None
+class _ThreadSilencer(logging.Filter):
+    """Drop records logged by threads inside :func:`_silence_loggers`."""
 
-        packet = " ".join(parts[1:])
-        payload = f"{payload_len} {payload_hex}" if payload_hex else payload_len
+    def __init__(self) -> None:
+        super().__init__()
+        self._depth: dict[int, int] = {}
+        self._lock = threading.Lock()
 
-        return NormalizedMessage(
-            dtm=dtm,
-            src=src,
-            dst=dst,
-            verb=verb,
-            code=code,
-            payload=payload,
-            packet=packet,
-            source="packet_log",
-            raw_line=line,
-            parse_warnings=[],
-        )
-    except Exception:
-        return None
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.thread not in self._depth
+
+    @contextmanager
+    def silence(self) -> Iterator[None]:
+        ident = threading.get_ident()
+        with self._lock:
+            self._depth[ident] = self._depth.get(ident, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                depth = self._depth.pop(ident) - 1
+                if depth:
+                    self._depth[ident] = depth
 
 
-@contextmanager
-def _silence_loggers(logger_names: list[str]) -> Iterator[None]:
-    old: list[tuple[logging.Logger, bool, int]] = []
-    try:
-        for name in logger_names:
-            logger = logging.getLogger(name)
-            old.append((logger, logger.disabled, logger.level))
-            logger.disabled = True
-            logger.setLevel(logging.CRITICAL + 1)
-        yield
-    finally:
-        for logger, disabled, level in old:
-            logger.disabled = disabled
-            logger.setLevel(level)
+_SILENCER = _ThreadSilencer()
 
 
-def decode_message_with_ramses_rf(msg: dict[str, Any]) -> dict[str, Any] | None:
-    """Decode a message using ramses_rf (ramses_tx) without side effects.
+@contextmanager
+def _silence_loggers(logger_names: Iterable[str]) -> Iterator[None]:
+    """Drop records from ``logger_names`` logged by the current thread.
 
-    Returns None if ramses_tx is not installed or if decoding fails.
+    Only the calling thread is silenced, so decoding a batch in a worker
+    thread does not swallow live packets logged meanwhile.
     """
+    for name in logger_names:
+        logging.getLogger(name).addFilter(_SILENCER)
+    with _SILENCER.silence():
+        yield
 
-    try:
-        from ramses_rf import Message, Packet
-    except (ModuleNotFoundError, ImportError):
-        return None
 
+def _decode_message(
+    msg: dict[str, Any], message_cls: Any, packet_cls: Any
+) -> dict[str, Any] | None:
     dtm_raw = msg.get("dtm")
     if not isinstance(dtm_raw, str):
         return None
@@ -278,34 +427,91 @@ def decode_message_with_ramses_rf(msg: dict[str, Any]) -> dict[str, Any] | None:
     except ValueError:
         return None
 
-    try:
-        with _silence_loggers(
-            [
-                "ramses_tx.packet_log",
-                "ramses_tx.packet",
-                "ramses_tx.message",
-                "ramses_tx.parsers",
-            ]
-        ):
-            pkt = Packet(dt_obj, frame)
-            m = Message._from_packet(pkt)
-    except Exception as exc:
-        _LOGGER.debug("decode_message_with_ramses_rf failed for %s: %s", frame, exc)
+    def _decode() -> dict[str, Any] | None:
+        try:
+            pkt = packet_cls(dt_obj, frame)
+            m = message_cls._from_packet(pkt)
+        except Exception as exc:
+            _LOGGER.debug("decode_message_with_ramses_rf failed for %s: %s", frame, exc)
+            return None
+
+        try:
+            return decoded_fields(m)
+        except Exception:
+            return None
+
+    # Identical frames (periodic broadcasts) decode to the same result, so
+    # only the timestamp is rebuilt per message.
+    key = decode_key(verb, code, payload_hex, src, dst, via)
+    decoded = get_decode_cache().get_or_decode(key, _decode)
+    if decoded is None:
         return None
+    return {"dtm": dt_obj.isoformat(timespec="microseconds"), **decoded}
+
+
+def decode_messages_with_ramses_rf(
+    msgs: Sequence[dict[str, Any]],
+) -> list[dict[str, Any] | None]:
+    """Decode a batch of messages using ramses_rf without side effects.
+
+    ramses_rf is imported and the ramses_tx loggers are silenced once for
+    the whole batch. Blocking; use :func:`async_decode_messages` from the
+    event loop.
+
+    :param msgs: Message dicts (``dtm``, ``src``, ``dst``, ``verb``, ``code``,
+        ``payload`` and optionally ``packet``).
+    :return: One decoded dict per message, in order; None where ramses_tx is
+        not installed or decoding failed.
+    """
 
     try:
-        payload_decoded = m.payload
-    except Exception:
-        return None
+        from ramses_rf import Message, Packet
+    except (ModuleNotFoundError, ImportError):
+        return [None] * len(msgs)
 
-    return {
-        "dtm": m.dtm.isoformat(timespec="microseconds"),
-        "src": m.src.id,
-        "dst": m.dst.id,
-        "verb": m.verb.strip(),
-        "code": str(m.code),
-        "payload": payload_decoded,
-    }
+    with _silence_loggers(_DECODE_LOGGERS):
+        return [_decode_message(msg, Message, Packet) for msg in msgs]
+
+
+def decode_message_with_ramses_rf(msg: dict[str, Any]) -> dict[str, Any] | None:
+    """Decode a message using ramses_rf (ramses_tx) without side effects.
+
+    Decodes are memoized in the shared decode cache, so a repeated frame is
+    only parsed once. Returns None if ramses_tx is not installed or if
+    decoding fails.
+    """
+    return decode_messages_with_ramses_rf([msg])[0]
+
+
+async def async_decode_messages(
+    hass: HomeAssistant,
+    msgs: Sequence[dict[str, Any]],
+    *,
+    batch_size: int = DECODE_BATCH_SIZE,
+) -> list[dict[str, Any] | None]:
+    """Decode messages in the executor, returning results in order.
+
+    Large requests are split into batches of ``batch_size`` that run as
+    separate executor jobs.
+
+    :param hass: Home Assistant instance.
+    :param msgs: Message dicts to decode.
+    :param batch_size: Messages per executor job.
+    :return: One decoded dict (or None) per message.
+    """
+
+    if not msgs:
+        return []
+    size = max(1, batch_size)
+    batches = await asyncio.gather(
+        *(
+            hass.async_add_executor_job(
+                decode_messages_with_ramses_rf, list(msgs[i : i + size])
+            )
+            for i in range(0, len(msgs), size)
+        )
+    )
+    return [decoded for batch in batches for decoded in batch]
 
 
 def _stringify_payload(payload: Any) -> str | None:
@@ -322,38 +528,6 @@ def _stringify_payload(payload: Any) -> str | None:
     return str(payload)
 
 
-@dataclass
-class NormalizedMessage:
-    """A normalized representation of a Ramses message.
-
-    The debugger uses this as an intermediate representation that can be
-    derived from multiple sources.
-
-    :param dtm: Timestamp string (best-effort).
-    :param src: Source device id.
-    :param dst: Destination device id.
-    :param verb: Ramses verb (``RQ`` / ``RP`` / ``I`` / ``W``).
-    :param code: Ramses code (e.g. ``1F09``).
-    :param payload: Payload in a user-friendly representation.
-    :param packet: Raw packet string, if available.
-    :param source: Data source identifier.
-    :param raw_line: Raw line used for parsing (log sources).
-    :param parse_warnings: Any parsing warnings (best-effort).
-    """
-
-    dtm: str
-    src: str
-    dst: str
-    verb: str | None
-    code: str | None
-    payload: str | None
-    packet: str | None
-    source: str  # "traffic_buffer" | "packet_log" | "ha_log"
-    raw_line: str | None = None
-    parse_warnings: list[str] = field(default_factory=list)
-    decoded_payload: Any = None  # parsed dict from ramses_rf, if available
-
-
 class MessagesProvider:
     """Base class for message providers."""
 
@@ -378,66 +552,38 @@ class TrafficBufferProvider(MessagesProvider):
     This buffer is populated by
     :class:`~custom_components.ramses_extras.features.ramses_debugger.traffic_collector.TrafficCollector`
     and is intended for lightweight message browsing without hitting the log
-    files.
+    files. The global buffer is an indexed, columnar
+    :class:`~custom_components.ramses_extras.features.ramses_debugger.traffic_store.TrafficStore`,
+    so filtered and time-bounded queries only visit matching messages and
+    ``decoded_payload`` is only rebuilt for messages that are returned, in
+    the executor through :func:`async_decode_messages`.
     """
 
-    def __init__(
-        self,
-        max_global: int = 5000,
-        max_per_flow: int = 500,
-        max_flows: int = 2000,
-    ) -> None:
+    def __init__(self, max_global: int = 5000) -> None:
         self._max_global = max_global
-        self._max_per_flow = max_per_flow
-        self._max_flows = max_flows
-        self._global_buffer: deque[dict[str, Any]] = deque(maxlen=max_global)
-        self._per_flow_buffers: OrderedDict[tuple[str, str], deque[dict[str, Any]]] = (
-            OrderedDict()
-        )
+        self._store = TrafficStore(max_global)
 
-    def configure(
-        self,
-        *,
-        max_global: int | None = None,
-        max_per_flow: int | None = None,
-        max_flows: int | None = None,
-    ) -> None:
+    def configure(self, *, max_global: int | None = None) -> None:
         if max_global is not None:
             self._max_global = max(1, int(max_global))
-            self._global_buffer = deque(self._global_buffer, maxlen=self._max_global)
-
-        if max_per_flow is not None:
-            self._max_per_flow = max(1, int(max_per_flow))
-            for k, buf in list(self._per_flow_buffers.items()):
-                self._per_flow_buffers[k] = deque(buf, maxlen=self._max_per_flow)
+            self._store.resize(self._max_global)
 
-        if max_flows is not None:
-            self._max_flows = max(1, int(max_flows))
+    def __len__(self) -> int:
+        return len(self._store)
 
-        while len(self._per_flow_buffers) > self._max_flows:
-            self._per_flow_buffers.popitem(last=False)
+    def snapshot_events(self, limit: int) -> list[dict[str, Any]]:
+        """Return the newest ``limit`` buffered events for persisting."""
+        return self._store.snapshot(limit)
 
-    def evict_flow(self, key: tuple[str, str]) -> None:
-        self._per_flow_buffers.pop(key, None)
+    def restore_events(self, events: list[dict[str, Any]]) -> None:
+        """Re-ingest events from :meth:`snapshot_events`, oldest first."""
+        for event in events:
+            if isinstance(event, dict):
+                self.ingest_event(event)
 
     def ingest_event(self, event_data: dict[str, Any]) -> None:
         """Ingest a message event into buffers."""
-        self._global_buffer.append(event_data)
-        src = event_data.get("src")
-        dst = event_data.get("dst")
-        if isinstance(src, str) and isinstance(dst, str):
-            key = (src, dst)
-
-            buf = self._per_flow_buffers.get(key)
-            if buf is None:
-                while len(self._per_flow_buffers) >= self._max_flows:
-                    self._per_flow_buffers.popitem(last=False)
-                buf = deque(maxlen=self._max_per_flow)
-                self._per_flow_buffers[key] = buf
-            else:
-                self._per_flow_buffers.move_to_end(key)
-
-            buf.append(event_data)
+        self._store.append(event_data)
 
     async def get_messages(
         self,
@@ -451,24 +597,32 @@ class TrafficBufferProvider(MessagesProvider):
         until: str | None = None,
         limit: int = 200,
     ) -> list[NormalizedMessage]:
+        events = self._store.query(
+            src=src,
+            dst=dst,
+            verb=verb,
+            code=code,
+            since=since,
+            until=until,
+            limit=limit,
+        )
+        # The store keeps only a marker for decoded payloads; rebuild them
+        # through the shared decode cache, which the live stream also fills.
+        pending = [
+            raw
+            for raw in events
+            if "decoded_payload" in raw and raw["decoded_payload"] is None
+        ]
+        for raw, decoded in zip(
+            pending, await async_decode_messages(hass, pending), strict=True
+        ):
+            raw["decoded_payload"] = decoded.get("payload") if decoded else None
+
         messages: list[NormalizedMessage] = []
-        for raw in self._global_buffer:
-            if src and raw.get("src") != src:
-                continue
-            if dst and raw.get("dst") != dst:
-                continue
-            if verb and raw.get("verb") != verb:
-                continue
-            if code and raw.get("code") != code:
-                continue
-            # TODO: since/until filtering by dtm if needed
-            dtm = (
-                raw.get("time_fired")
-                if isinstance(raw.get("time_fired"), str)
-                else raw.get("dtm")
-            )
+        for raw in events:
+            dtm = event_dtm(raw)
             msg = NormalizedMessage(
-                dtm=dtm if isinstance(dtm, str) else "",
+                dtm=dtm or "",
                 src=raw.get("src", ""),
                 dst=raw.get("dst", ""),
                 verb=raw.get("verb"),
@@ -479,8 +633,6 @@ class TrafficBufferProvider(MessagesProvider):
                 decoded_payload=raw.get("decoded_payload"),
             )
             messages.append(msg)
-            if len(messages) >= limit:
-                break
         return messages
 
 
@@ -532,9 +684,18 @@ class HALogProvider(MessagesProvider):
         if not log_path:
             return []
 
+        # Address and code filters must appear verbatim in a matching line,
+        # so they narrow the byte prefilter as well.
+        require = tuple(v.encode() for v in (src, dst, code) if v)
+
         try:
             text = await hass.async_add_executor_job(
-                partial(tail_text, log_path, max_lines=200_000, max_chars=10_000_000)
+                partial(
+                    tail_marked_lines,
+                    log_path,
+                    require=require,
+                    max_bytes=10_000_000,
+                )
             )
             lines = text.splitlines()
 
@@ -543,13 +704,10 @@ class HALogProvider(MessagesProvider):
                 if not line:
                     continue
 
-                if "ramses" not in line.lower():
-                    continue
-
                 if "{" not in line and "--:------" not in line and ":" not in line:
                     continue
 
-                msg = _parse_ha_log_line(line)
+                msg = parse_ha_log_line(line)
                 if msg is None:
                     continue
 
@@ -572,173 +730,6 @@ class HALogProvider(MessagesProvider):
             return []
 
 
-def _parse_ha_log_line(line: str) -> NormalizedMessage | None:
-    """Parse a HA log line containing a ramses_cc message."""
-    # Expected HA log format with JSON payload:
-    # 2026-01-20 09:58:48 DEBUG (MainThread) [custom_components.ramses_cc] ...
-    # {"src": "...", "dst": "...", "verb": "...", ...}
-    # We'll try to extract JSON from the line and parse it.
-    try:
-        import ast
-        import json
-        import re
-
-        data: dict[str, Any] | None = None
-
-        decoder = json.JSONDecoder()
-        for idx, ch in enumerate(line):
-            if ch != "{":
-                continue
-            try:
-                obj, _end = decoder.raw_decode(line[idx:])
-            except Exception:
-                continue
-            if isinstance(obj, dict):
-                data = obj
-                break
-
-        if data is None:
-            start = line.find("{")
-            end = line.rfind("}")
-            if start >= 0 and end > start:
-                try:
-                    obj = ast.literal_eval(line[start : end + 1])
-                    if isinstance(obj, dict):
-                        data = obj
-                except Exception:
-                    data = None
-
-        if data is None:
-            raise ValueError("No JSON/dict payload found")
-
-        # Sometimes the dict is nested, e.g. {"message": {...}} or {"msg": {...}}
-        if not ("src" in data and "dst" in data):
-            nested = None
-            for key in ("msg", "message", "data"):
-                v = data.get(key)
-                if isinstance(v, dict) and "src" in v and "dst" in v:
-                    nested = v
-                    break
-            if nested is None:
-                for v in data.values():
-                    if isinstance(v, dict) and "src" in v and "dst" in v:
-                        nested = v
-                        break
-            if isinstance(nested, dict):
-                data = nested
-
-        src = data.get("src")
-        dst = data.get("dst")
-        verb = data.get("verb")
-        code = data.get("code")
-        payload = data.get("payload")
-        packet = data.get("packet")
-
-        # Keep dst as-is for broadcast; the UI can derive any effective target
-        # from the packet/via fields if needed.
-
-        # Extract timestamp from the beginning of the line
-        dtm_match = re.match(r"(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}[^\s]*)", line)
-        dtm = dtm_match.group(1) if dtm_match else ""
-
-        return NormalizedMessage(
-            dtm=dtm,
-            src=src or "",
-            dst=dst or "",
-            verb=verb,
-            code=code,
-            payload=str(payload) if payload is not None else None,
-            packet=str(packet) if packet is not None else None,
-            source="ha_log",
-            raw_line=line,
-            parse_warnings=[],
-        )
-    except Exception:
-        pass
-
-    msg = _parse_ha_log_line_as_packet(line)
-    if msg is not None:
-        return msg
-
-    return None
-
-
-def _parse_ha_log_line_as_packet(line: str) -> NormalizedMessage | None:
-    raw_tokens = line.split()
-    tokens = [t.strip('[](),;"') for t in raw_tokens]
-    if not tokens:
-        return None
-
-    # Try to derive a timestamp from the start of the line
-    dtm = ""
-    if len(tokens) >= 2 and re.match(r"^\d{4}-\d{2}-\d{2}$", tokens[0]):
-        if re.match(r"^\d{2}:\d{2}:\d{2}(?:\.\d+)?$", tokens[1]):
-            dtm = f"{tokens[0]} {tokens[1]}"
-    if not dtm and re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}", tokens[0]):
-        dtm = tokens[0]
-
-    verbs = {"RQ", "RP", "I", "W"}
-    addr_re = re.compile(r"^(--:------|\d{2}:\d{6})$")
-    code_re = re.compile(r"^[0-9A-F]{4}$")
-    len_re = re.compile(r"^\d{3}$")
-
-    verb_idx: int | None = None
-    verb: str | None = None
-    for i, tok in enumerate(tokens):
-        if tok in verbs:
-            verb_idx = i
-            verb = tok
-            break
-    if verb_idx is None or verb is None:
-        return None
-
-    rest = tokens[verb_idx + 1 :]
-
-    addrs = [t for t in rest if addr_re.match(t)]
-    if len(addrs) < 2:
-        return None
-    src = addrs[0]
-    dst_raw = addrs[1]
-    dst = dst_raw
-
-    code: str | None = None
-    code_idx: int | None = None
-    for idx, tok in enumerate(rest):
-        if code_re.match(tok):
-            code = tok
-            code_idx = idx
-            break
-    if code is None or code_idx is None:
-        return None
-
-    length: str | None = None
-    payload_hex = ""
-    for idx in range(code_idx + 1, len(rest)):
-        tok = rest[idx]
-        if len_re.match(tok):
-            length = tok
-            payload_hex = " ".join(rest[idx + 1 :])
-            break
-    if length is None:
-        return None
-
-    payload = f"{length} {payload_hex}".strip()
-    packet = " ".join(tokens[verb_idx:])
-
-    return NormalizedMessage(
-        dtm=dtm,
-        src=src,
-        dst=dst,
-        verb=verb,
-        code=code,
-        payload=payload,
-        packet=packet,
-        source="ha_log",
-        raw_line=line,
-        parse_warnings=[],
-    )
-
-
 async def get_messages_from_sources(
     hass: HomeAssistant,
     sources: list[str],
@@ -806,21 +797,17 @@ async def get_messages_from_sources(
             _LOGGER.warning("Error fetching messages from %s: %s", source, exc)
 
     if dedupe:
-        seen: set[tuple] = set()
+        seen: set[MessageKey] = set()
         deduped: list[NormalizedMessage] = []
         for msg in all_messages:
-            # Dedupe key: dtm+src+dst+verb+code+packet/payload
-            # Stringify payload in case it's a dict (from ramses_rf parser)
-            payload_str = msg.packet or (
-                str(msg.payload) if msg.payload is not None else ""
-            )
-            key = (
+            key = message_key(
                 msg.dtm,
                 msg.src,
                 msg.dst,
-                msg.verb or "",
-                msg.code or "",
-                payload_str,
+                msg.verb,
+                msg.code,
+                msg.packet,
+                msg.payload,
             )
             if key in seen:
                 continue
@@ -0,0 +1,401 @@
+"""Live tail-follow source for the ramses packet log.
+
+While it has subscribers (e.g. the ``packet_log/subscribe`` WebSocket
+command), the :class:`PacketLogFollower` keeps the configured packet log open
+and tracks ``(inode, offset)`` so each poll parses only the bytes appended
+since the previous one. Parsed messages are kept in a bounded in-memory
+window that answers tail queries without touching the disk. The backlog read
+when a file is first opened only fills the window; lines appended after that
+are pushed to the subscribers. Polling starts with the first subscription
+and stops, releasing the file, with the last one.
+
+Rotation is detected by an inode change: the remainder of the old file is
+drained from the still-open handle before the new file is followed from its
+start. A shrinking file (truncation) is re-read from offset 0.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+from custom_components.ramses_extras.const import DOMAIN
+
+from .const import DOMAIN as RAMSES_DEBUGGER_DOMAIN
+from .log_backend import get_configured_packet_log_path
+from .packet_log_parse import (
+    PACKET_LOG_TAIL_BYTES,
+    NormalizedMessage,
+    parse_packet_log_line,
+    select_newest,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_MESSAGES = 20_000
+DEFAULT_POLL_INTERVAL_S = 1.0
+_READ_BYTES = 256 * 1024
+
+
+def _parse_lines(data: bytes) -> list[NormalizedMessage]:
+    return [
+        msg
+        for raw in data.split(b"\n")
+        if raw and (msg := parse_packet_log_line(raw.decode("utf-8", errors="replace")))
+    ]
+
+
+class PacketLogFollower:
+    """Follow the configured packet log and keep its newest messages in memory.
+
+    :param hass: Home Assistant instance.
+    :param max_messages: Size of the in-memory message window.
+    :param poll_interval_s: Seconds between polls for appended data.
+    :param initial_bytes: Trailing bytes parsed when a file is first opened.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        *,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+        initial_bytes: int = PACKET_LOG_TAIL_BYTES,
+    ) -> None:
+        self._hass = hass
+        self._poll_interval_s = max(0.05, float(poll_interval_s))
+        self._initial_bytes = max(0, int(initial_bytes))
+        self._task: asyncio.Task[None] | None = None
+        self._subscribers: dict[int, Callable[[list[NormalizedMessage]], None]] = {}
+        self._next_subscription_id = 0
+
+        # File state; only touched by executor jobs holding ``_file_lock``.
+        self._file_lock = threading.Lock()
+        # Bumped by start() and stop(), so a read queued before stop() does
+        # not reopen the file and a release queued before start() does not
+        # close the file the new polls resume from.
+        self._generation = 0
+        self._fh: BinaryIO | None = None
+        self._fh_path: Path | None = None
+        self._inode: int | None = None
+        self._offset = 0
+        # Offset of the first line held in the window.
+        self._start_offset = 0
+
+        self._path: Path | None = None
+        self._window: deque[NormalizedMessage] = deque(maxlen=max(1, max_messages))
+        # True while the window holds every message of the followed file.
+        self._complete = False
+        self.polls = 0
+        self.read_bytes = 0
+
+    @property
+    def path(self) -> Path | None:
+        """Path of the file currently followed, if any."""
+        return self._path
+
+    def configure(
+        self,
+        *,
+        max_messages: int | None = None,
+        poll_interval_s: float | None = None,
+    ) -> None:
+        """Update window size and poll interval.
+
+        :param max_messages: Size of the in-memory message window.
+        :param poll_interval_s: Seconds between polls for appended data.
+        """
+
+        if max_messages is not None and max_messages != self._window.maxlen:
+            size = max(1, int(max_messages))
+            if size < len(self._window):
+                self._complete = False
+            self._window = deque(self._window, maxlen=size)
+        if poll_interval_s is not None:
+            self._poll_interval_s = max(0.05, float(poll_interval_s))
+
+    def start(self) -> None:
+        """Start polling the packet log in a background task."""
+        if self._task is not None:
+            return
+        self._generation += 1
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), "ramses_debugger_packet_log_follower"
+        )
+        _LOGGER.debug("PacketLogFollower started")
+
+    def stop(self) -> None:
+        """Stop polling and release the followed file."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._generation += 1
+        # The window is no longer kept up to date: stop answering from it.
+        self._path = None
+        self._hass.async_create_background_task(
+            self._async_release(self._generation),
+            "ramses_debugger_packet_log_release",
+        )
+        _LOGGER.debug("PacketLogFollower stopped")
+
+    async def _async_release(self, generation: int) -> None:
+        released = await self._hass.async_add_executor_job(
+            self._release_file, generation
+        )
+        if released and generation == self._generation:
+            self._window.clear()
+            self._complete = False
+
+    async def _async_run(self) -> None:
+        while True:
+            try:
+                await self.async_poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                _LOGGER.debug("PacketLogFollower poll failed: %s", err)
+            await asyncio.sleep(self._poll_interval_s)
+
+    async def async_poll(self) -> list[NormalizedMessage]:
+        """Read appended lines once and notify subscribers.
+
+        :return: Messages appended since the previous poll (oldest first).
+            The backlog read when a file is first opened is not included.
+        """
+
+        path = get_configured_packet_log_path(self._hass)
+        if path is None:
+            await self._hass.async_add_executor_job(
+                self._release_file, self._generation
+            )
+            self._path = None
+            self._window.clear()
+            self._complete = False
+            return []
+
+        drained, reset, fresh, attached = await self._hass.async_add_executor_job(
+            self._read_appended, path, self._generation
+        )
+        self.polls += 1
+
+        if reset:
+            self._window.clear()
+            self._complete = self._start_offset == 0
+        self._path = path if self._inode is not None else None
+        if len(self._window) + len(fresh) > (self._window.maxlen or 0):
+            self._complete = False
+        self._window.extend(fresh)
+
+        new = drained + fresh if attached else drained
+        if new:
+            self._notify_subscribers(new)
+        return new
+
+    def _release_file(self, generation: int) -> bool:
+        """Close the followed file (executor job).
+
+        :param generation: Value of ``_generation`` when the release was
+            requested; a stale release (polling restarted since) does nothing.
+        :return: Whether the file was released.
+        """
+        with self._file_lock:
+            if generation != self._generation:
+                return False
+            self._close()
+            return True
+
+    def _close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+        self._fh = None
+        self._fh_path = None
+        self._inode = None
+        self._offset = 0
+
+    def _read_complete_lines(self, fh: BinaryIO) -> bytes:
+        """Read complete lines from the current offset up to EOF."""
+
+        fh.seek(self._offset)
+        chunks: list[bytes] = []
+        while chunk := fh.read(_READ_BYTES):
+            chunks.append(chunk)
+
+        data = b"".join(chunks)
+        last_nl = data.rfind(b"\n")
+        if last_nl < 0:
+            return b""
+        data = data[: last_nl + 1]
+        self._offset += len(data)
+        self.read_bytes += len(data)
+        return data
+
+    def _read_appended(
+        self, path: Path, generation: int
+    ) -> tuple[list[NormalizedMessage], bool, list[NormalizedMessage], bool]:
+        """Parse lines appended since the last poll (executor job).
+
+        :param generation: Value of ``_generation`` when the poll started; a
+            stale read (the follower was stopped since) returns nothing.
+        :return: ``(drained, reset, fresh, attached)`` where ``drained`` are
+            the last lines of a rotated-away file, ``reset`` tells the window
+            to start over, ``fresh`` are messages read from ``path`` and
+            ``attached`` is False when ``fresh`` is the backlog of a file
+            that was not open yet rather than newly appended lines.
+        """
+
+        with self._file_lock:
+            if generation != self._generation:
+                return [], False, [], False
+            return self._read_appended_locked(path)
+
+    def _read_appended_locked(
+        self, path: Path
+    ) -> tuple[list[NormalizedMessage], bool, list[NormalizedMessage], bool]:
+        drained: list[NormalizedMessage] = []
+        # A file replacing (or truncating) one that was followed only holds
+        # lines written since; a first open starts with old lines.
+        attached = self._fh is not None
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._close()
+            return drained, True, [], attached
+
+        reset = False
+        if self._fh is not None and str(path) != str(self._fh_path):
+            # Re-configured: the new file's lines are not new.
+            attached = False
+        if self._fh is not None and (
+            str(path) != str(self._fh_path) or int(st.st_ino) != self._inode
+        ):
+            # Rotated (or re-configured): finish the old file first.
+            try:
+                drained = _parse_lines(self._read_complete_lines(self._fh))
+            except OSError:
+                pass
+            self._close()
+        elif self._fh is not None and int(st.st_size) < self._offset:
+            # Truncated in place.
+            self._offset = 0
+            self._start_offset = 0
+            reset = True
+
+        if self._fh is None:
+            self._fh = path.open("rb")
+            self._fh_path = path
+            self._inode = int(os.fstat(self._fh.fileno()).st_ino)
+            size = int(os.fstat(self._fh.fileno()).st_size)
+            start = max(0, size - self._initial_bytes)
+            if start > 0:
+                self._fh.seek(start - 1)
+                self._fh.readline()
+                start = self._fh.tell()
+            self._offset = start
+            self._start_offset = start
+            reset = True
+
+        fresh = _parse_lines(self._read_complete_lines(self._fh))
+        return drained, reset, fresh, attached
+
+    def get_messages(
+        self,
+        *,
+        src: str | None = None,
+        dst: str | None = None,
+        verb: str | None = None,
+        code: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 1000,
+        has_older: bool = False,
+    ) -> list[NormalizedMessage] | None:
+        """Answer a packet log query from the in-memory window (newest first).
+
+        :param has_older: True when the query also spans older files (rotated
+            logs), so reaching the start of the followed file is not enough.
+        :return: Matching messages, or None when the window does not reach
+            far enough back to answer the query completely.
+        """
+
+        if self._path is None:
+            return None
+
+        return select_newest(
+            self._window,
+            src=src,
+            dst=dst,
+            verb=verb,
+            code=code,
+            since=since,
+            until=until,
+            limit=limit,
+            complete=self._complete and not has_older,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return follower diagnostics."""
+        return {
+            "path": str(self._path) if self._path is not None else None,
+            "offset": self._offset,
+            "messages": len(self._window),
+            "max_messages": self._window.maxlen,
+            "complete": self._complete,
+            "polls": self.polls,
+            "read_bytes": self.read_bytes,
+        }
+
+    def subscribe(
+        self, callback: Callable[[list[NormalizedMessage]], None]
+    ) -> CALLBACK_TYPE:
+        """Subscribe to batches of newly appended messages.
+
+        The first subscription starts polling; removing the last one stops
+        it and releases the file.
+        """
+        subscription_id = self._next_subscription_id
+        self._next_subscription_id += 1
+        self._subscribers[subscription_id] = callback
+        self.start()
+
+        def _unsub() -> None:
+            if self._subscribers.pop(subscription_id, None) is None:
+                return
+            if not self._subscribers:
+                self.stop()
+
+        return _unsub
+
+    def _notify_subscribers(self, messages: list[NormalizedMessage]) -> None:
+        for callback in list(self._subscribers.values()):
+            try:
+                callback(messages)
+            except Exception as err:
+                _LOGGER.debug("PacketLogFollower subscriber callback failed: %s", err)
+
+
+def get_packet_log_follower(hass: HomeAssistant) -> PacketLogFollower | None:
+    """Return the active :class:`PacketLogFollower` instance if available."""
+    domain_data = hass.data.get(DOMAIN)
+    if not isinstance(domain_data, dict):
+        return None
+
+    debugger_data = domain_data.get(RAMSES_DEBUGGER_DOMAIN)
+    if not isinstance(debugger_data, dict):
+        return None
+
+    follower = debugger_data.get("packet_log_follower")
+    if not isinstance(follower, PacketLogFollower):
+        return None
+
+    return follower
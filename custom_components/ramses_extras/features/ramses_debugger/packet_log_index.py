@@ -0,0 +1,412 @@
+"""Inverted index over ramses packet logs for the Ramses Debugger.
+
+Filtered packet log queries (``src`` / ``dst`` / ``device_id`` / ``code`` /
+``verb``) used to re-parse the file tail and filter every line. The
+:class:`PacketLogIndex` maps each term to a posting list of byte offsets of
+the lines containing it, so a filtered query only seeks to and parses the
+matching lines.
+
+Terms are ``src:<id>``, ``dst:<id>``, ``code:<code>`` and ``verb:<verb>``.
+
+Indexes are:
+
+- built incrementally as the packet log grows (only appended complete lines
+  are parsed on each refresh)
+- invalidated when the file is rotated, truncated or rewritten (inode change,
+  shrink or a different head)
+- persisted as a compressed binary snapshot under HA's ``.storage`` directory
+  so a restart resumes from the last indexed offset; the snapshot is written
+  at most once per :data:`PERSIST_INTERVAL_S` and by
+  :func:`flush_packet_log_indexes` on unload, outside the index lock
+
+Only plain text files are indexed; rotated ``.gz`` files are scanned instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from .packet_log_parse import parse_packet_log_line
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_DIR_NAME = "ramses_extras_packet_log_index"
+
+_MAGIC = b"RXPLI1\n"
+_HEAD_BYTES = 256
+_READ_BYTES = 256 * 1024
+# Minimum seconds between two snapshots of the same index.
+PERSIST_INTERVAL_S = 60.0
+_MAX_INDEXES = 16
+
+
+def _terms_for_line(line: str) -> list[str]:
+    msg = parse_packet_log_line(line)
+    if msg is None:
+        return []
+
+    terms = [f"src:{msg.src}", f"dst:{msg.dst}"]
+    if msg.code:
+        terms.append(f"code:{msg.code}")
+    if msg.verb:
+        terms.append(f"verb:{msg.verb}")
+    return terms
+
+
+def _intersect(postings: list[array]) -> list[int]:
+    """Intersect sorted posting lists, probing the larger ones by bisection."""
+
+    if not postings:
+        return []
+
+    postings = sorted(postings, key=len)
+    smallest, others = postings[0], postings[1:]
+    out: list[int] = []
+    for offset in smallest:
+        for other in others:
+            idx = bisect_left(other, offset)
+            if idx >= len(other) or other[idx] != offset:
+                break
+        else:
+            out.append(offset)
+    return out
+
+
+def _union(a: array, b: array) -> array:
+    return array("Q", sorted(set(a).union(b)))
+
+
+class PacketLogIndex:
+    """Append-aware inverted index for one plain text packet log.
+
+    :param path: Path to the packet log.
+    :param storage_dir: Optional directory for the persisted snapshot.
+    """
+
+    def __init__(self, path: Path, *, storage_dir: Path | None = None) -> None:
+        self.path = path
+        self._storage_dir = storage_dir
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._reset()
+        self._load()
+
+    def _reset(self) -> None:
+        self._inode: int | None = None
+        self._head = b""
+        self._indexed_bytes = 0
+        self._persisted_bytes = 0
+        self._lines = 0
+        self._postings: dict[str, array] = {}
+
+    @property
+    def indexed_bytes(self) -> int:
+        """Offset just after the last indexed (complete) line."""
+        return self._indexed_bytes
+
+    @property
+    def indexed_lines(self) -> int:
+        """Number of parseable packet lines indexed so far."""
+        return self._lines
+
+    @property
+    def terms(self) -> int:
+        """Number of distinct terms in the index."""
+        return len(self._postings)
+
+    def _snapshot_path(self) -> Path | None:
+        if self._storage_dir is None:
+            return None
+        digest = hashlib.sha1(str(self.path).encode("utf-8")).hexdigest()[:16]
+        return self._storage_dir / f"{digest}.idx"
+
+    def refresh(self) -> None:
+        """Index newly appended lines, rebuilding after rotation.
+
+        :raises OSError: If the file cannot be read.
+        """
+
+        with self._lock:
+            st = self.path.stat()
+            size = int(st.st_size)
+
+            if (
+                self._inode != st.st_ino
+                or size < self._indexed_bytes
+                or (self._head and self._read_head()[: len(self._head)] != self._head)
+            ):
+                self._reset()
+                self._inode = st.st_ino
+
+            if size > self._indexed_bytes:
+                self._extend(size)
+
+            if len(self._head) < _HEAD_BYTES:
+                self._head = self._read_head()
+
+            due = time.monotonic() - self._last_save >= PERSIST_INTERVAL_S
+
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Persist the index now if it has changed since the last snapshot."""
+
+        with self._save_lock:
+            with self._lock:
+                snapshot = self._snapshot()
+            if snapshot is not None:
+                self._save(snapshot)
+
+    def _read_head(self) -> bytes:
+        with self.path.open("rb") as f:
+            return f.read(_HEAD_BYTES)
+
+    def _extend(self, size: int) -> None:
+        postings = self._postings
+        with self.path.open("rb") as f:
+            pos = self._indexed_bytes
+            f.seek(pos)
+            while pos < size:
+                chunk = f.read(min(_READ_BYTES, size - pos))
+                if not chunk:
+                    break
+
+                last_nl = chunk.rfind(b"\n")
+                if last_nl < 0:
+                    if len(chunk) < _READ_BYTES:
+                        break
+                    # A single line longer than the read size; skip it.
+                    rest = f.readline()
+                    if not rest.endswith(b"\n"):
+                        break
+                    pos += len(chunk) + len(rest)
+                    self._indexed_bytes = pos
+                    continue
+
+                line_start = pos
+                for raw in chunk[:last_nl].split(b"\n"):
+                    terms = _terms_for_line(raw.decode("utf-8", errors="replace"))
+                    if terms:
+                        self._lines += 1
+                        for term in terms:
+                            plist = postings.get(term)
+                            if plist is None:
+                                plist = postings[term] = array("Q")
+                            plist.append(line_start)
+                    line_start += len(raw) + 1
+
+                pos += last_nl + 1
+                self._indexed_bytes = pos
+                f.seek(pos)
+
+    def lookup(
+        self,
+        *,
+        src: str | None = None,
+        dst: str | None = None,
+        verb: str | None = None,
+        code: str | None = None,
+        device_id: str | None = None,
+        start: int = 0,
+        end: int | None = None,
+    ) -> list[int]:
+        """Return ascending byte offsets of lines matching every filter.
+
+        :param src: Source device id.
+        :param dst: Destination device id.
+        :param verb: Verb (``RQ`` / ``RP`` / ``I`` / ``W``).
+        :param code: Ramses code.
+        :param device_id: Device id matching either ``src`` or ``dst``.
+        :param start: Inclusive lower byte offset bound.
+        :param end: Exclusive upper byte offset bound.
+        :return: Matching line offsets (empty when no filter is given).
+        """
+
+        with self._lock:
+            empty = array("Q")
+            lists: list[array] = []
+            for prefix, value in (
+                ("src", src),
+                ("dst", dst),
+                ("verb", verb),
+                ("code", code),
+            ):
+                if value:
+                    lists.append(self._postings.get(f"{prefix}:{value}", empty))
+
+            if device_id:
+                lists.append(
+                    _union(
+                        self._postings.get(f"src:{device_id}", empty),
+                        self._postings.get(f"dst:{device_id}", empty),
+                    )
+                )
+
+            if not lists:
+                return []
+
+            bounded: list[array] = []
+            for plist in lists:
+                lo = bisect_left(plist, start) if start else 0
+                hi = bisect_left(plist, end) if end is not None else len(plist)
+                bounded.append(plist[lo:hi])
+
+        return _intersect(bounded)
+
+    def _snapshot(self) -> tuple[dict[str, Any], bytes] | None:
+        """Return the header and raw posting lists to persist, if changed.
+
+        Called with ``_lock`` held; copying the arrays is cheap compared to
+        compressing and writing them, which :meth:`_save` does after the
+        lock is released so queries are not blocked.
+        """
+
+        if (
+            self._storage_dir is None
+            or self._inode is None
+            or self._indexed_bytes == self._persisted_bytes
+        ):
+            return None
+
+        self._last_save = time.monotonic()
+        terms = sorted(self._postings)
+        header = {
+            "path": str(self.path),
+            "inode": self._inode,
+            "head": self._head.hex(),
+            "indexed_bytes": self._indexed_bytes,
+            "lines": self._lines,
+            "terms": [[term, len(self._postings[term])] for term in terms],
+        }
+        return header, b"".join(self._postings[term].tobytes() for term in terms)
+
+    def _save(self, snapshot: tuple[dict[str, Any], bytes]) -> None:
+        target = self._snapshot_path()
+        if target is None:
+            return
+
+        header, body = snapshot
+        data = (
+            _MAGIC
+            + json.dumps(header, separators=(",", ":")).encode("utf-8")
+            + b"\n"
+            + zlib.compress(body, 6)
+        )
+
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, target)
+        except OSError as exc:
+            _LOGGER.debug("Could not persist packet log index %s: %s", target, exc)
+            return
+
+        with self._lock:
+            if self._inode == header["inode"]:
+                self._persisted_bytes = max(
+                    self._persisted_bytes, header["indexed_bytes"]
+                )
+
+    def _load(self) -> None:
+        snapshot = self._snapshot_path()
+        if snapshot is None:
+            return
+
+        try:
+            data = snapshot.read_bytes()
+            st = self.path.stat()
+        except OSError:
+            return
+
+        try:
+            if not data.startswith(_MAGIC):
+                raise ValueError("bad magic")
+            header_end = data.index(b"\n", len(_MAGIC))
+            header: dict[str, Any] = json.loads(data[len(_MAGIC) : header_end])
+            body = zlib.decompress(data[header_end + 1 :])
+
+            head = bytes.fromhex(header["head"])
+            indexed_bytes = int(header["indexed_bytes"])
+            if (
+                header.get("path") != str(self.path)
+                or int(header["inode"]) != st.st_ino
+                or indexed_bytes > st.st_size
+                or self._read_head()[: len(head)] != head
+            ):
+                return
+
+            postings: dict[str, array] = {}
+            itemsize = array("Q").itemsize
+            pos = 0
+            for term, count in header["terms"]:
+                plist = array("Q")
+                plist.frombytes(body[pos : pos + int(count) * itemsize])
+                pos += int(count) * itemsize
+                postings[str(term)] = plist
+        except (ValueError, KeyError, TypeError, zlib.error, OSError) as exc:
+            _LOGGER.debug("Ignoring packet log index snapshot %s: %s", snapshot, exc)
+            return
+
+        self._inode = st.st_ino
+        self._head = head
+        self._indexed_bytes = indexed_bytes
+        self._persisted_bytes = indexed_bytes
+        self._lines = int(header.get("lines", 0))
+        self._postings = postings
+
+
+_registry: OrderedDict[str, PacketLogIndex] = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def get_packet_log_index(
+    path: Path, *, storage_dir: Path | None = None
+) -> PacketLogIndex:
+    """Return the shared, refreshed :class:`PacketLogIndex` for ``path``.
+
+    :param path: Plain text packet log path.
+    :param storage_dir: Optional directory holding persisted snapshots.
+    :raises OSError: If the file cannot be read.
+    """
+
+    key = str(path)
+    with _registry_lock:
+        index = _registry.get(key)
+        if index is None:
+            index = PacketLogIndex(path, storage_dir=storage_dir)
+            _registry[key] = index
+            while len(_registry) > _MAX_INDEXES:
+                _registry.popitem(last=False)
+        else:
+            _registry.move_to_end(key)
+
+    index.refresh()
+    return index
+
+
+def flush_packet_log_indexes() -> None:
+    """Persist every in-memory packet log index that has unsaved changes."""
+    with _registry_lock:
+        indexes = list(_registry.values())
+    for index in indexes:
+        index.flush()
+
+
+def clear_packet_log_indexes() -> None:
+    """Drop all in-memory packet log indexes."""
+    with _registry_lock:
+        _registry.clear()
@@ -0,0 +1,401 @@
+"""Parallel multi-file log search for the Ramses Debugger.
+
+:func:`~.log_backend.search_with_context` scans one file in one thread. To
+search the base log together with its rotated ``.N`` / ``.N.gz`` siblings,
+:func:`async_search_files_with_context` fans the work out as separate jobs on
+Home Assistant's executor threads (:func:`search_files_with_context` runs the
+same tasks inline):
+
+- plain files are split into newline-aligned byte ranges
+- each gzip file is one task (a deflate stream cannot be entered mid-way)
+
+Each task reports its line count, the (chunk-relative) match lines and the
+context lines it saw, including its last ``before`` lines and up to ``after``
+lines past its end. The parent turns chunk-relative line numbers into file
+line numbers and builds the same context blocks as the single-file search,
+in file/line order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import re
+import time
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .log_backend import LogBlock, _empty_search_result, compile_search_pattern
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+@dataclass
+class SearchPlan:
+    """Scan tasks of a multi-file search and the limits to merge them with.
+
+    :param paths: Files to search, in result order.
+    :param pattern: Compiled search pattern, or None for an empty query.
+    :param tasks: :func:`scan_range` arguments, one tuple per task.
+    :param task_files: Index into ``paths`` of each task.
+    """
+
+    paths: list[Path]
+    pattern: re.Pattern[str] | None
+    before: int
+    after: int
+    max_matches: int
+    max_chars: int
+    tasks: list[tuple[Any, ...]] = field(default_factory=list)
+    task_files: list[int] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+
+def split_ranges(path: Path, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Split a plain file into newline-aligned ``[start, end)`` byte ranges.
+
+    :param path: Plain text file path.
+    :param chunk_bytes: Nominal range size.
+    :return: Contiguous ranges covering the whole file.
+    """
+
+    size = path.stat().st_size
+    chunk_bytes = max(1, int(chunk_bytes))
+    ranges: list[tuple[int, int]] = []
+    start = 0
+    with path.open("rb") as f:
+        while start < size:
+            end = start + chunk_bytes
+            if end >= size:
+                end = size
+            else:
+                f.seek(end - 1)
+                f.readline()
+                end = min(size, f.tell())
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _iter_range(path: Path, start: int, end: int | None) -> Iterable[bytes]:
+    """Yield raw lines of ``[start, end)``, then the lines after ``end``."""
+
+    if end is None:
+        with gzip.open(path, "rb") as f:
+            yield from f
+        return
+
+    with path.open("rb") as f:
+        f.seek(start)
+        yield from f
+
+
+def scan_range(
+    path: str,
+    start: int,
+    end: int | None,
+    pattern: re.Pattern[str],
+    before: int,
+    after: int,
+    max_matches: int,
+) -> dict[str, Any]:
+    """Search one byte range (or a whole gzip file); runs in an executor thread.
+
+    :param path: File path.
+    :param start: First byte of the range.
+    :param end: End of the range, or None to read a gzip file to EOF.
+    :param pattern: Compiled search pattern.
+    :param before: Context lines before each match.
+    :param after: Context lines after each match.
+    :param max_matches: Maximum matches recorded for this range.
+    :return: ``lines`` (count), ``bytes``, ``matches`` (1-based, relative to
+        the range), ``context`` (relative line -> text) and ``tail`` (last
+        ``before`` lines of the range as ``(line, text)`` pairs).
+    """
+
+    search = pattern.search
+    matches: list[int] = []
+    context: dict[int, str] = {}
+    history: deque[tuple[int, str]] = deque(maxlen=before)
+    pending_until = 0
+    lines = 0
+    extra = 0
+    pos = start
+
+    for raw in _iter_range(Path(path), start, end):
+        if end is not None and pos >= end:
+            # Past the range: only collect trailing context of the last
+            # matches; the next range searches these lines itself.
+            extra += 1
+            if lines + extra > pending_until:
+                break
+            context[lines + extra] = raw.decode("utf-8", errors="replace").rstrip(
+                "\r\n"
+            )
+            continue
+
+        pos += len(raw)
+        lines += 1
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+
+        if len(matches) < max_matches:
+            if search(line):
+                matches.append(lines)
+                for prev_idx, prev in history:
+                    context[prev_idx] = prev
+                pending_until = max(pending_until, lines + after)
+
+        if lines <= pending_until:
+            context[lines] = line
+        if before:
+            history.append((lines, line))
+
+    return {
+        "lines": lines,
+        "bytes": pos - start,
+        "matches": matches,
+        "context": context,
+        "tail": list(history),
+    }
+
+
+def plan_search(
+    paths: list[Path],
+    *,
+    query: str,
+    before: int = 3,
+    after: int = 3,
+    max_matches: int = 200,
+    max_chars: int = 400_000,
+    case_sensitive: bool = False,
+    regex: bool = False,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> SearchPlan:
+    """Split a multi-file search into :func:`scan_range` tasks.
+
+    Parameters are those of :func:`search_files_with_context`.
+
+    :raises ValueError: If ``regex`` is set and a term is invalid.
+    """
+
+    plan = SearchPlan(
+        paths=list(paths),
+        pattern=compile_search_pattern(
+            query, case_sensitive=case_sensitive, regex=regex
+        ),
+        before=max(0, min(int(before), 200)),
+        after=max(0, min(int(after), 200)),
+        max_matches=max(0, min(int(max_matches), 5000)),
+        max_chars=max(0, min(int(max_chars), 2_000_000)),
+    )
+    if plan.pattern is None:
+        return plan
+
+    for file_no, path in enumerate(plan.paths):
+        try:
+            if path.suffix == ".gz":
+                ranges: list[tuple[int, int | None]] = [(0, None)]
+            else:
+                ranges = list(split_ranges(path, chunk_bytes))
+        except OSError:
+            continue
+        for start, end in ranges:
+            plan.tasks.append(
+                (
+                    str(path),
+                    start,
+                    end,
+                    plan.pattern,
+                    plan.before,
+                    plan.after,
+                    # One extra match tells the merge the cap was exceeded.
+                    plan.max_matches + 1,
+                )
+            )
+            plan.task_files.append(file_no)
+    return plan
+
+
+def merge_search_results(
+    plan: SearchPlan, results: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """Build the search result from the :func:`scan_range` result of each task.
+
+    :param plan: Plan the tasks came from.
+    :param results: One result per task, in task order.
+    """
+
+    paths = plan.paths
+    before, after = plan.before, plan.after
+    max_matches, max_chars = plan.max_matches, plan.max_chars
+    task_files = plan.task_files
+
+    empty = {**_empty_search_result(), "files": [p.name for p in paths]}
+    if plan.pattern is None:
+        return empty
+
+    # Rebase chunk-relative line numbers onto file line numbers.
+    file_lines = [0] * len(paths)
+    file_matches: list[list[int]] = [[] for _ in paths]
+    file_context: list[dict[int, str]] = [{} for _ in paths]
+    scan_lines = scan_bytes = 0
+    for file_no, result in zip(task_files, results, strict=True):
+        offset = file_lines[file_no]
+        file_matches[file_no].extend(offset + m for m in result["matches"])
+        context = file_context[file_no]
+        for rel, text in result["context"].items():
+            context[offset + rel] = text
+        for rel, text in result["tail"]:
+            context[offset + rel] = text
+        file_lines[file_no] += result["lines"]
+        scan_lines += result["lines"]
+        scan_bytes += result["bytes"]
+
+    match_lines: list[dict[str, Any]] = []
+    blocks: list[LogBlock] = []
+    total_chars = 0
+    truncated_by_max_chars = False
+    truncated_by_max_matches = False
+
+    for file_no, path in enumerate(paths):
+        matches = file_matches[file_no]
+        if truncated_by_max_matches or not matches:
+            continue
+        if len(match_lines) + len(matches) > max_matches:
+            matches = matches[: max_matches - len(match_lines)]
+            truncated_by_max_matches = True
+        match_lines.extend({"file_id": path.name, "line": m} for m in matches)
+
+        context = file_context[file_no]
+        windows: list[list[int]] = []
+        for m in matches:
+            start = max(1, m - before)
+            if windows and start <= windows[-1][1] + 1:
+                windows[-1][1] = max(windows[-1][1], m + after)
+            else:
+                windows.append([start, m + after])
+
+        for start, end in windows:
+            if truncated_by_max_chars:
+                break
+            lines = [
+                context[i]
+                for i in range(start, min(end, file_lines[file_no]) + 1)
+                if i in context
+            ]
+            total_chars += sum(len(line) + 1 for line in lines)
+            if total_chars > max_chars:
+                truncated_by_max_chars = True
+                break
+            blocks.append(
+                LogBlock(file_id=path.name, start_line=start, end_line=end, lines=lines)
+            )
+
+    scan_seconds = time.monotonic() - plan.started
+
+    if not match_lines:
+        result = empty
+    else:
+        plain = "\n\n".join(
+            "\n".join(block.lines) for block in blocks if block.lines
+        ).strip("\n")
+        result = {
+            "matches": len(match_lines),
+            "match_lines": match_lines,
+            "blocks": [
+                {
+                    "file_id": b.file_id,
+                    "start_line": b.start_line,
+                    "end_line": b.end_line,
+                    "lines": b.lines,
+                }
+                for b in blocks
+            ],
+            "plain": plain,
+            "markdown": f"```text\n{plain}\n```" if plain else "",
+            "truncated": truncated_by_max_chars or truncated_by_max_matches,
+            "truncated_by_max_chars": truncated_by_max_chars,
+            "truncated_by_max_matches": truncated_by_max_matches,
+            "files": [p.name for p in paths],
+        }
+
+    result.update(
+        {
+            "scan_lines": scan_lines,
+            "scan_bytes": scan_bytes,
+            "scan_seconds": round(scan_seconds, 6),
+            "scan_bytes_per_s": int(scan_bytes / scan_seconds) if scan_seconds else 0,
+        }
+    )
+    return result
+
+
+def search_files_with_context(
+    paths: list[Path],
+    *,
+    query: str,
+    before: int = 3,
+    after: int = 3,
+    max_matches: int = 200,
+    max_chars: int = 400_000,
+    case_sensitive: bool = False,
+    regex: bool = False,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> dict[str, Any]:
+    """Search several log files and return context blocks in file/line order.
+
+    Blocks, truncation flags and scan statistics have the same shape as
+    :func:`~.log_backend.search_with_context`; ``match_lines`` holds
+    ``{"file_id", "line"}`` entries and ``files`` lists the searched files.
+    The tasks run one after another in the calling thread; see
+    :func:`async_search_files_with_context` for the parallel variant.
+
+    :param paths: Files to search, in result order.
+    :param query: Search query. Multiple lines are treated as OR terms.
+    :param before: Context lines before each match.
+    :param after: Context lines after each match.
+    :param max_matches: Maximum matches considered (across all files).
+    :param max_chars: Maximum returned output size.
+    :param case_sensitive: Whether matching is case sensitive.
+    :param regex: Treat each term as a regular expression.
+    :param chunk_bytes: Byte range size for splitting plain files.
+    :raises ValueError: If ``regex`` is set and a term is invalid.
+    """
+
+    plan = plan_search(
+        paths,
+        query=query,
+        before=before,
+        after=after,
+        max_matches=max_matches,
+        max_chars=max_chars,
+        case_sensitive=case_sensitive,
+        regex=regex,
+        chunk_bytes=chunk_bytes,
+    )
+    return merge_search_results(plan, [scan_range(*task) for task in plan.tasks])
+
+
+async def async_search_files_with_context(
+    hass: HomeAssistant, paths: list[Path], **kwargs: Any
+) -> dict[str, Any]:
+    """Search several log files with one executor job per scan task.
+
+    Takes the keyword arguments of :func:`search_files_with_context` and
+    returns the same result. Planning and merging run in executor jobs too,
+    so nothing touches the disk on the event loop.
+
+    :raises ValueError: If ``regex`` is set and a term is invalid.
+    """
+
+    plan = await hass.async_add_executor_job(partial(plan_search, paths, **kwargs))
+    results = await asyncio.gather(
+        *(hass.async_add_executor_job(scan_range, *task) for task in plan.tasks)
+    )
+    return await hass.async_add_executor_job(merge_search_results, plan, list(results))
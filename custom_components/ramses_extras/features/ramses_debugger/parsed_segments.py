@@ -0,0 +1,251 @@
+"""Shared cache tier of parsed log messages for the Ramses Debugger.
+
+The WebSocket-level :class:`~.debugger_cache.DebuggerCache` keys results by
+every filter, so each new ``src`` / ``dst`` / ``verb`` / ``code`` / ``limit``
+combination used to re-read and re-parse the same file tail. This module keeps
+the *parsed* :class:`~.packet_log_parse.NormalizedMessage` records instead,
+independent of any filter, so all combinations share one parse.
+
+Files are split into segments on a fixed byte grid (adjusted to line starts).
+Each segment is cached under ``(kind, path, inode, start, end)``:
+
+- complete segments never change while the inode is unchanged (logs are
+  append-only)
+- the last, growing segment is extended by parsing only the bytes appended
+  since it was cached
+- a new inode (rotation) drops every segment of the old file
+- segments before the start of the newest requested tail are dropped, and
+  the cache is capped by the log bytes behind its segments (a parsed
+  message takes roughly ten times its line length in memory)
+
+Cached messages are shared between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from .packet_log_parse import PACKET_LOG_TAIL_BYTES
+
+DEFAULT_SEGMENT_BYTES = 256 * 1024
+# Log bytes whose parsed messages are kept across all segments.
+DEFAULT_MAX_BYTES = 3 * PACKET_LOG_TAIL_BYTES
+
+SegmentKey = tuple[str, str, int, int, int]
+
+
+def _line_start_at_or_after(f: Any, pos: int) -> int:
+    if pos <= 0:
+        return 0
+    f.seek(pos - 1)
+    f.readline()
+    return int(f.tell())
+
+
+def _complete_end(f: Any, size: int) -> int:
+    """Return the offset just after the last newline in the file."""
+
+    pos = size
+    block = 64 * 1024
+    while pos > 0:
+        read_size = min(block, pos)
+        f.seek(pos - read_size)
+        data = f.read(read_size)
+        last_nl = data.rfind(b"\n")
+        if last_nl >= 0:
+            return pos - read_size + last_nl + 1
+        pos -= read_size
+    return 0
+
+
+class ParsedSegmentCache:
+    """LRU cache of parsed messages per file segment.
+
+    :param segment_bytes: Nominal segment size in bytes.
+    :param max_bytes: Total log bytes covered by the cached segments.
+    """
+
+    def __init__(
+        self,
+        *,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._segment_bytes = max(4096, int(segment_bytes))
+        self._max_bytes = max(1, int(max_bytes))
+        self._lock = threading.Lock()
+        self._segments: OrderedDict[SegmentKey, list[Any]] = OrderedDict()
+        # (kind, path, inode, start) -> end of the cached, possibly growing
+        # segment starting at ``start``.
+        self._open_ends: dict[tuple[str, str, int, int], int] = {}
+        self._inodes: dict[tuple[str, str], int] = {}
+        self._message_count = 0
+        self._byte_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.parsed_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return cache counters."""
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "messages": self._message_count,
+                "bytes": self._byte_count,
+                "hits": self.hits,
+                "misses": self.misses,
+                "parsed_bytes": self.parsed_bytes,
+            }
+
+    def clear(self) -> None:
+        """Drop all cached segments."""
+        with self._lock:
+            self._segments.clear()
+            self._open_ends.clear()
+            self._inodes.clear()
+            self._message_count = 0
+            self._byte_count = 0
+
+    def get_tail(
+        self,
+        path: Path,
+        *,
+        kind: str,
+        parse_line: Callable[[str], Any | None],
+        max_bytes: int,
+    ) -> list[Any]:
+        """Return parsed messages covering at least the last ``max_bytes``.
+
+        Only complete (newline-terminated) lines are included. The result is
+        oldest first and starts at a segment boundary.
+
+        :param path: Plain text log file.
+        :param kind: Parser identifier; part of the cache key.
+        :param parse_line: Line parser returning a message or None.
+        :param max_bytes: Minimum number of trailing bytes covered.
+        :raises OSError: If the file cannot be read.
+        """
+
+        step = self._segment_bytes
+        out: list[Any] = []
+
+        with path.open("rb") as f:
+            st = os.fstat(f.fileno())
+            inode = int(st.st_ino)
+            end = _complete_end(f, int(st.st_size))
+            if end <= 0:
+                return out
+
+            self._check_inode(kind, str(path), inode)
+
+            first = max(0, end - max(0, int(max_bytes))) // step
+            last = (end - 1) // step
+            seg_start = _line_start_at_or_after(f, first * step)
+            self._drop_before(kind, str(path), inode, seg_start)
+            for k in range(first, last + 1):
+                seg_end = min(end, _line_start_at_or_after(f, (k + 1) * step))
+                if seg_start < seg_end:
+                    out.extend(
+                        self._get_segment(
+                            f, kind, str(path), inode, seg_start, seg_end, parse_line
+                        )
+                    )
+                seg_start = max(seg_start, seg_end)
+
+        return out
+
+    def _check_inode(self, kind: str, path: str, inode: int) -> None:
+        with self._lock:
+            previous = self._inodes.get((kind, path))
+            if previous is None or previous == inode:
+                self._inodes[(kind, path)] = inode
+                return
+
+            for key in [k for k in self._segments if k[0] == kind and k[1] == path]:
+                self._pop_segment(key)
+            self._inodes[(kind, path)] = inode
+
+    def _drop_before(self, kind: str, path: str, inode: int, start: int) -> None:
+        """Drop the segments of a file that end at or before ``start``."""
+        with self._lock:
+            for key in [
+                k
+                for k in self._segments
+                if k[:3] == (kind, path, inode) and k[4] <= start
+            ]:
+                self._pop_segment(key)
+
+    def _pop_segment(self, key: SegmentKey) -> list[Any] | None:
+        """Remove a segment and its bookkeeping (caller holds the lock)."""
+        messages = self._segments.pop(key, None)
+        if messages is None:
+            return None
+        self._message_count -= len(messages)
+        self._byte_count -= key[4] - key[3]
+        if self._open_ends.get(key[:4]) == key[4]:
+            del self._open_ends[key[:4]]
+        return messages
+
+    def _get_segment(
+        self,
+        f: Any,
+        kind: str,
+        path: str,
+        inode: int,
+        start: int,
+        end: int,
+        parse_line: Callable[[str], Any | None],
+    ) -> list[Any]:
+        key: SegmentKey = (kind, path, inode, start, end)
+        open_key = (kind, path, inode, start)
+
+        with self._lock:
+            cached = self._segments.get(key)
+            if cached is not None:
+                self._segments.move_to_end(key)
+                self.hits += 1
+                return cached
+
+            prefix: list[Any] = []
+            parse_from = start
+            prev_end = self._open_ends.get(open_key)
+            if prev_end is not None and prev_end < end:
+                prev = self._pop_segment((kind, path, inode, start, prev_end))
+                if prev is not None:
+                    prefix = prev
+                    parse_from = prev_end
+            self.misses += 1
+
+        f.seek(parse_from)
+        data = f.read(end - parse_from)
+        parsed = [
+            msg
+            for raw in data.split(b"\n")
+            if raw and (msg := parse_line(raw.decode("utf-8", errors="replace")))
+        ]
+        messages = prefix + parsed
+
+        with self._lock:
+            self.parsed_bytes += len(data)
+            self._pop_segment(key)
+            self._segments[key] = messages
+            self._open_ends[open_key] = end
+            self._message_count += len(messages)
+            self._byte_count += end - start
+            while self._byte_count > self._max_bytes and len(self._segments) > 1:
+                self._pop_segment(next(iter(self._segments)))
+
+        return messages
+
+
+_cache = ParsedSegmentCache()
+
+
+def get_parsed_segment_cache() -> ParsedSegmentCache:
+    """Return the process-wide parsed segment cache."""
+    return _cache
@@ -0,0 +1,239 @@
+"""Incremental, resumable log search for the Ramses Debugger.
+
+:func:`~.log_backend.search_with_context` returns the whole result at once
+(blocks plus ``plain`` and ``markdown`` renderings). :class:`LogSearchStream`
+produces the same context blocks incrementally so a WebSocket handler can
+push them in small events as they are found, keeping memory flat regardless
+of the result size.
+
+A search can be suspended at any point and resumed later from an opaque
+cursor holding the file id, a byte offset and the line number at that
+offset. Cursors always point at a line boundary outside any block, so a
+resumed search never repeats a block that was already delivered.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import re
+from collections import deque
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from .log_backend import LogBlock
+
+# A block that grows past this many lines is closed early so a burst of
+# adjacent matches cannot build one unbounded block.
+MAX_BLOCK_LINES = 2000
+
+
+def encode_search_cursor(file_id: str, offset: int, line: int) -> str:
+    """Return an opaque cursor for resuming a search.
+
+    :param file_id: Searched file id.
+    :param offset: Byte offset of the next line to scan (uncompressed).
+    :param line: Number of lines before ``offset``.
+    """
+
+    raw = json.dumps({"f": file_id, "o": int(offset), "l": int(line)})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_search_cursor(cursor: str) -> tuple[str, int, int]:
+    """Decode a cursor created by :func:`encode_search_cursor`.
+
+    :return: ``(file_id, offset, line)``.
+    :raises ValueError: If the cursor is malformed.
+    """
+
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        file_id, offset, line = data["f"], int(data["o"]), int(data["l"])
+    except (ValueError, TypeError, KeyError, UnicodeError) as exc:
+        raise ValueError("Invalid search cursor") from exc
+    if not isinstance(file_id, str) or offset < 0 or line < 0:
+        raise ValueError("Invalid search cursor")
+    return file_id, offset, line
+
+
+class LogSearchStream:
+    """Search one log file incrementally, yielding context blocks.
+
+    Blocks are built like in :func:`~.log_backend.search_with_context`:
+    overlapping or adjacent context windows are merged, and a block is only
+    emitted once no later match can extend it.
+
+    :param path: Log file path (plain or ``.gz``).
+    :param pattern: Compiled search pattern.
+    :param before: Context lines before each match.
+    :param after: Context lines after each match.
+    :param offset: Byte offset to resume from (uncompressed for gzip).
+    :param line: Number of lines before ``offset``.
+    :raises OSError: If the file cannot be opened.
+    :raises ValueError: If ``offset`` lies past the end of the file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        pattern: re.Pattern[str],
+        before: int = 3,
+        after: int = 3,
+        offset: int = 0,
+        line: int = 0,
+    ) -> None:
+        self.path = path
+        self._search = pattern.search
+        self._before = max(0, min(int(before), 200))
+        self._after = max(0, min(int(after), 200))
+
+        self._f: BinaryIO = (
+            gzip.open(path, "rb") if path.suffix == ".gz" else path.open("rb")
+        )
+        try:
+            if offset:
+                self._f.seek(offset)
+                if self._f.tell() != offset or (
+                    path.suffix != ".gz" and offset > path.stat().st_size
+                ):
+                    raise ValueError("Search cursor is past the end of the file")
+        except BaseException:
+            self._f.close()
+            raise
+
+        self._pos = int(offset)
+        self._idx = int(line)
+        # Lines at or before this one were delivered by an earlier page.
+        self._first_line = int(line) + 1
+        # Last line of the last block that was returned.
+        self._delivered_end = int(line)
+        # (line, text, start offset) of the previous ``before`` lines.
+        self._history: deque[tuple[int, str, int]] = deque(maxlen=self._before)
+
+        self._lines: list[str] | None = None
+        self._start = self._end = self._last_line = 0
+        self._start_pos = 0
+
+        self.done = False
+        self.matches = 0
+        self.scan_lines = 0
+        self.scan_bytes = 0
+
+    @property
+    def position(self) -> tuple[int, int]:
+        """Return ``(offset, line)`` to resume from without losing a block."""
+        if self._lines is not None:
+            return self._start_pos, self._start - 1
+        # Back up over history lines a later match could still use as
+        # leading context.
+        for prev_idx, _, prev_pos in self._history:
+            if prev_idx > self._delivered_end:
+                return prev_pos, prev_idx - 1
+        return self._pos, self._idx
+
+    def close(self) -> None:
+        """Release the underlying file."""
+        self._f.close()
+
+    def _close_block(self) -> LogBlock | None:
+        lines, self._lines = self._lines, None
+        if not lines:
+            return None
+        self._delivered_end = self._last_line
+        return LogBlock(
+            file_id=self.path.name,
+            start_line=self._start,
+            end_line=self._end,
+            lines=lines,
+        )
+
+    def read(self, *, max_blocks: int, max_bytes: int) -> list[LogBlock]:
+        """Scan forward until ``max_blocks`` blocks are complete.
+
+        Scanning also stops after roughly ``max_bytes`` bytes so callers can
+        report progress on sparse results. At EOF the open block is flushed
+        and :attr:`done` is set.
+
+        :param max_blocks: Maximum blocks returned.
+        :param max_bytes: Byte budget for this call.
+        """
+
+        out: list[LogBlock] = []
+        if self.done:
+            return out
+
+        before, after = self._before, self._after
+        search = self._search
+        budget = self._pos + max(1, int(max_bytes))
+
+        while len(out) < max_blocks and self._pos < budget:
+            raw = self._f.readline()
+            if not raw:
+                block = self._close_block()
+                if block is not None:
+                    out.append(block)
+                self.done = True
+                break
+
+            line_pos = self._pos
+            self._pos += len(raw)
+            self._idx += 1
+            idx = self._idx
+            self.scan_lines += 1
+            self.scan_bytes += len(raw)
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+
+            if search(line):
+                self.matches += 1
+                match_start = max(self._first_line, idx - before)
+                if self._lines is None or match_start > self._end + 1:
+                    block = self._close_block()
+                    if block is not None:
+                        out.append(block)
+                    self._start = match_start
+                    self._start_pos = line_pos
+                    self._lines = []
+                    self._last_line = match_start - 1
+                    for prev_idx, _, prev_pos in self._history:
+                        if prev_idx >= match_start:
+                            self._start_pos = prev_pos
+                            break
+                self._end = max(self._end, idx + after)
+
+                for prev_idx, prev, _ in self._history:
+                    if prev_idx > self._last_line:
+                        self._lines.append(prev)
+                        self._last_line = prev_idx
+
+            if self._lines is not None:
+                if idx <= self._end:
+                    self._lines.append(line)
+                    self._last_line = idx
+                    if len(self._lines) >= MAX_BLOCK_LINES:
+                        self._end = idx
+                        block = self._close_block()
+                        if block is not None:
+                            out.append(block)
+                        self._first_line = idx + 1
+                elif idx > self._end + before:
+                    block = self._close_block()
+                    if block is not None:
+                        out.append(block)
+
+            if before:
+                self._history.append((idx, line, line_pos))
+
+        return out
+
+
+def block_to_dict(block: LogBlock) -> dict[str, Any]:
+    """Return the WebSocket representation of a search block."""
+    return {
+        "file_id": block.file_id,
+        "start_line": block.start_line,
+        "end_line": block.end_line,
+        "lines": block.lines,
+    }
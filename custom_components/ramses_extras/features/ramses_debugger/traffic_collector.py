@@ -7,24 +7,60 @@ into *flows*.
 
 A *flow* is a unique ``(src, dst)`` pair observed in the incoming message
 stream.
+
+With ``persist=True`` the collector keeps its flows, counters and newest
+buffered messages in an HA ``Store`` (one ``.storage`` file), so a restart
+does not wipe the traffic history. Changes are written with
+``async_delay_save``, which HA also flushes on shutdown, and the stored state
+is merged back on :meth:`~TrafficCollector.start`.
 """
 
 from __future__ import annotations
 
+import heapq
 import logging
-from collections import Counter
+import time
+from collections import Counter, OrderedDict, deque
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.storage import Store
 
 from ...framework.helpers.ramses_message_stream import get_ramses_message_stream
 from .messages_provider import TrafficBufferProvider
+from .traffic_intervals import InterArrivalStats
+from .traffic_latency import LatencyTracker
+from .traffic_rates import TrafficRates
 
 _LOGGER = logging.getLogger(__name__)
 
+SNAPSHOT_STORAGE_KEY = "ramses_extras_traffic_stats"
+SNAPSHOT_VERSION = 1
+# Newest buffered messages kept in the persisted state.
+SNAPSHOT_MAX_EVENTS = 1000
+# Seconds between the first change and the write that persists it.
+SNAPSHOT_SAVE_DELAY_S = 60.0
+
+# Evictions remembered for incremental stats views. A view that falls
+# further behind than this gets a full snapshot instead of a delta.
+_EVICTION_LOG_SIZE = 4096
+
+# Maximum tracked ``(src, code)`` inter-arrival series; least recently seen
+# series are dropped first.
+_MAX_INTERVAL_SERIES = 4096
+
+
+def _message_ts(dtm: str | None) -> float:
+    if dtm:
+        try:
+            return datetime.fromisoformat(dtm).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
 
 @dataclass
 class TrafficFlowStats:
@@ -42,6 +78,8 @@ class TrafficFlowStats:
     last_seen: str | None = None
     verbs_counter: Counter[str] = field(default_factory=Counter)
     codes_counter: Counter[str] = field(default_factory=Counter)
+    # Collector version of the last message counted in this flow.
+    version: int = field(default=0, compare=False, repr=False)
 
     def add_message(
         self, *, verb: str | None, code: str | None, dtm: str | None
@@ -61,6 +99,47 @@ class TrafficFlowStats:
         if dtm:
             self.last_seen = dtm
 
+    def as_dict(self) -> dict[str, Any]:
+        """Return the WebSocket representation of this flow."""
+        return {
+            "src": self.src,
+            "dst": self.dst,
+            "count_total": self.count_total,
+            "last_seen": self.last_seen,
+            "verbs": dict(self.verbs_counter),
+            "codes": dict(self.codes_counter),
+        }
+
+
+def flow_matches(
+    flow: TrafficFlowStats,
+    *,
+    device_id: str | None = None,
+    src: str | None = None,
+    dst: str | None = None,
+    code: str | None = None,
+    verb: str | None = None,
+) -> bool:
+    """Return whether a flow passes the stats filters.
+
+    :param flow: Flow to test.
+    :param device_id: Device that must be the flow's src or dst.
+    :param src: Required src.
+    :param dst: Required dst.
+    :param code: Code the flow must have observed.
+    :param verb: Verb the flow must have observed.
+    """
+
+    if device_id and device_id not in (flow.src, flow.dst):
+        return False
+    if src and flow.src != src:
+        return False
+    if dst and flow.dst != dst:
+        return False
+    if code and flow.codes_counter.get(code, 0) == 0:
+        return False
+    return not (verb and flow.verbs_counter.get(verb, 0) == 0)
+
 
 class TrafficCollector:
     """Collect traffic statistics from the shared message stream.
@@ -69,21 +148,47 @@ class TrafficCollector:
     per-flow counters. It also feeds a shared
     :class:`~custom_components.ramses_extras.features.ramses_debugger.messages_provider.TrafficBufferProvider`
     so the debugger can query recent messages.
+
+    :param hass: Home Assistant instance.
+    :param persist: Persist the collector state across restarts.
     """
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(self, hass: HomeAssistant, *, persist: bool = False) -> None:
         self._hass = hass
+        self._store: Store[dict[str, Any]] | None = (
+            Store(hass, SNAPSHOT_VERSION, SNAPSHOT_STORAGE_KEY) if persist else None
+        )
+        self._restored = False
+        self._save_scheduled = False
         self._stream_unsub: CALLBACK_TYPE | None = None
         self._subscribers: dict[int, Callable[[dict[str, Any]], None]] = {}
         self._next_subscription_id = 0
 
-        self._flows: dict[tuple[str, str], TrafficFlowStats] = {}
+        # Least recently seen flow first; touched flows move to the end.
+        self._flows: OrderedDict[tuple[str, str], TrafficFlowStats] = OrderedDict()
         self._max_flows: int = 2000
         self._total_count = 0
         self._by_code: Counter[str] = Counter()
         self._by_verb: Counter[str] = Counter()
         self._started_at: str = datetime.now().isoformat(timespec="seconds")
 
+        # Change tracking for incremental stats views: ``_version`` counts
+        # ingested messages, ``_epoch`` counts resets.
+        self._version = 0
+        self._epoch = 0
+        self._evicted: deque[tuple[int, tuple[str, str]]] = deque(
+            maxlen=_EVICTION_LOG_SIZE
+        )
+        self._evicted_floor = 0
+
+        # Rolling per-minute counts for the last 24 hours.
+        self._rates = TrafficRates()
+        # Inter-arrival statistics per ``(src, code)``, least recently seen
+        # first.
+        self._intervals: OrderedDict[tuple[str, str], InterArrivalStats] = OrderedDict()
+        # Request/reply correlation and round-trip times.
+        self._latency = LatencyTracker()
+
         self._buffer_provider = TrafficBufferProvider()
 
     def configure(
@@ -91,54 +196,27 @@ class TrafficCollector:
         *,
         max_flows: int | None = None,
         buffer_max_global: int | None = None,
-        buffer_max_per_flow: int | None = None,
-        buffer_max_flows: int | None = None,
     ) -> None:
         """Update flow and buffer caps.
 
         :param max_flows: Maximum number of unique ``(src, dst)`` flow entries.
         :param buffer_max_global: Maximum retained messages across all flows.
-        :param buffer_max_per_flow: Maximum retained messages per flow.
-        :param buffer_max_flows: Maximum flows tracked by the message buffer.
         """
 
         if max_flows is not None:
             self._max_flows = max(1, int(max_flows))
 
-        self._buffer_provider.configure(
-            max_global=buffer_max_global,
-            max_per_flow=buffer_max_per_flow,
-            max_flows=buffer_max_flows,
-        )
+        self._buffer_provider.configure(max_global=buffer_max_global)
 
         self._evict_flows_if_needed()
 
     def _evict_flows_if_needed(self) -> None:
         while len(self._flows) > self._max_flows:
-            oldest_key: tuple[str, str] | None = None
-            oldest_dtm: str | None = None
-            for k, flow in self._flows.items():
-                if oldest_key is None:
-                    oldest_key = k
-                    oldest_dtm = flow.last_seen
-                    continue
-
-                dtm = flow.last_seen
-                if oldest_dtm is None:
-                    if dtm is not None:
-                        oldest_key = k
-                        oldest_dtm = dtm
-                    continue
-
-                if dtm is None or dtm < oldest_dtm:
-                    oldest_key = k
-                    oldest_dtm = dtm
-
-            if oldest_key is None:
-                break
-
-            self._flows.pop(oldest_key, None)
-            self._buffer_provider.evict_flow(oldest_key)
+            oldest_key, _ = self._flows.popitem(last=False)
+            self._rates.drop_flow(oldest_key)
+            if len(self._evicted) == self._evicted.maxlen:
+                self._evicted_floor = self._evicted[0][0]
+            self._evicted.append((self._version, oldest_key))
 
     def start(self) -> None:
         """Start listening for processed RAMSES messages."""
@@ -147,6 +225,10 @@ class TrafficCollector:
         stream = get_ramses_message_stream(self._hass)
         stream.start()
         self._stream_unsub = stream.subscribe(self._ingest_message)
+        if self._store is not None and not self._restored:
+            self._hass.async_create_background_task(
+                self.async_restore(), "ramses_debugger_traffic_restore"
+            )
         _LOGGER.debug("TrafficCollector started")
 
     def stop(self) -> None:
@@ -156,13 +238,116 @@ class TrafficCollector:
             self._stream_unsub = None
         _LOGGER.debug("TrafficCollector stopped")
 
+    def _schedule_save(self) -> None:
+        # ``async_delay_save`` restarts its timer on every call, so only the
+        # first change after a write schedules one; steady traffic would
+        # otherwise postpone it indefinitely.
+        if self._store is None or self._save_scheduled:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY_S)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_scheduled = False
+        return self.snapshot_state()
+
+    async def async_save(self) -> None:
+        """Write the pending changes now instead of after the save delay."""
+        if self._store is None or not self._save_scheduled:
+            return
+        await self._store.async_save(self._data_to_save())
+
+    async def async_restore(self) -> None:
+        """Merge the persisted state into the collector (once)."""
+        if self._restored or self._store is None:
+            return
+        self._restored = True
+        try:
+            state = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.debug("Ignoring unreadable traffic snapshot: %s", err)
+            return
+        if isinstance(state, dict):
+            self.restore_state(state)
+
+    def snapshot_state(self) -> dict[str, Any]:
+        """Return the JSON-serializable state persisted across restarts."""
+        return {
+            "started_at": self._started_at,
+            "total_count": self._total_count,
+            "by_code": dict(self._by_code),
+            "by_verb": dict(self._by_verb),
+            # Least recently seen first, as in the flow table.
+            "flows": [
+                [
+                    flow.src,
+                    flow.dst,
+                    flow.count_total,
+                    flow.last_seen,
+                    dict(flow.verbs_counter),
+                    dict(flow.codes_counter),
+                ]
+                for flow in self._flows.values()
+            ],
+            "events": self._buffer_provider.snapshot_events(SNAPSHOT_MAX_EVENTS),
+        }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        """Merge a state from :meth:`snapshot_state` into the collector.
+
+        Persisted flows and counters are added to whatever was collected
+        since startup, with the persisted flows ordered as older. Persisted
+        messages are only restored into an empty buffer.
+
+        :param state: Decoded snapshot state.
+        """
+
+        try:
+            started_at = state.get("started_at")
+            if isinstance(started_at, str) and started_at < self._started_at:
+                self._started_at = started_at
+            self._total_count += int(state.get("total_count", 0))
+            self._by_code.update(state.get("by_code", {}))
+            self._by_verb.update(state.get("by_verb", {}))
+
+            for src, dst, count, last_seen, verbs, codes in reversed(
+                state.get("flows", [])
+            ):
+                key = (src, dst)
+                flow = self._flows.get(key)
+                if flow is None:
+                    flow = TrafficFlowStats(src=src, dst=dst, last_seen=last_seen)
+                    self._flows[key] = flow
+                    self._flows.move_to_end(key, last=False)
+                flow.count_total += int(count)
+                flow.verbs_counter.update(verbs)
+                flow.codes_counter.update(codes)
+
+            if not len(self._buffer_provider):
+                self._buffer_provider.restore_events(state.get("events", []))
+        except (TypeError, ValueError, AttributeError) as err:
+            _LOGGER.debug("Ignoring malformed traffic snapshot: %s", err)
+
+        # Incremental stats views resync from a full snapshot.
+        self._epoch += 1
+        self._evicted.clear()
+        self._evicted_floor = self._version
+        self._evict_flows_if_needed()
+
     def reset(self) -> None:
         """Clear all collected counters and restart the session start time."""
         self._flows.clear()
         self._total_count = 0
         self._by_code.clear()
         self._by_verb.clear()
+        self._rates.reset()
+        self._intervals.clear()
+        self._latency.reset()
         self._started_at = datetime.now().isoformat(timespec="seconds")
+        self._epoch += 1
+        self._evicted.clear()
+        self._evicted_floor = self._version
+        self._schedule_save()
 
     def get_stats(
         self,
@@ -185,40 +370,149 @@ class TrafficCollector:
         :return: Stats payload suitable for WebSocket responses.
         """
 
-        flows: list[TrafficFlowStats] = []
-        for flow in self._flows.values():
-            if device_id and device_id not in (flow.src, flow.dst):
-                continue
-            if src and flow.src != src:
-                continue
-            if dst and flow.dst != dst:
-                continue
-            if code and flow.codes_counter.get(code, 0) == 0:
-                continue
-            if verb and flow.verbs_counter.get(verb, 0) == 0:
-                continue
-            flows.append(flow)
-
+        flows = [
+            flow
+            for flow in self._flows.values()
+            if flow_matches(
+                flow, device_id=device_id, src=src, dst=dst, code=code, verb=verb
+            )
+        ]
         flows.sort(key=lambda f: f.count_total, reverse=True)
 
+        return {
+            **self.get_totals(),
+            "flows": [f.as_dict() for f in flows[: max(0, limit)]],
+            "intervals": self.get_intervals(
+                device_id=device_id, src=src, code=code, limit=limit
+            ),
+        }
+
+    def get_intervals(
+        self,
+        *,
+        device_id: str | None = None,
+        src: str | None = None,
+        code: str | None = None,
+        limit: int = 200,
+    ) -> list[dict[str, Any]]:
+        """Return inter-arrival statistics per ``(src, code)``.
+
+        :param device_id: Filter for series sent by this device.
+        :param src: Filter for a specific src.
+        :param code: Filter for a specific code.
+        :param limit: Maximum series returned (sorted by message count).
+        :return: Series with the inferred period, jitter, p95 gap and missed
+            interval count.
+        """
+
+        matches = [
+            (key, stats)
+            for key, stats in self._intervals.items()
+            if (not device_id or key[0] == device_id)
+            and (not src or key[0] == src)
+            and (not code or key[1] == code)
+        ]
+        matches.sort(key=lambda item: item[1].count, reverse=True)
+        return [
+            {"src": key[0], "code": key[1], **stats.as_dict()}
+            for key, stats in matches[: max(0, limit)]
+        ]
+
+    def get_totals(self) -> dict[str, Any]:
+        """Return the session start time and global counters."""
         return {
             "started_at": self._started_at,
             "total_count": self._total_count,
             "by_code": dict(self._by_code),
             "by_verb": dict(self._by_verb),
-            "flows": [
-                {
-                    "src": f.src,
-                    "dst": f.dst,
-                    "count_total": f.count_total,
-                    "last_seen": f.last_seen,
-                    "verbs": dict(f.verbs_counter),
-                    "codes": dict(f.codes_counter),
-                }
-                for f in flows[: max(0, limit)]
-            ],
         }
 
+    def get_rates(
+        self,
+        *,
+        code: str | None = None,
+        verb: str | None = None,
+        src: str | None = None,
+        dst: str | None = None,
+        window_minutes: int = 60,
+    ) -> dict[str, Any]:
+        """Return per-minute message counts over a recent window.
+
+        :param code: Return only this code's series.
+        :param verb: Return only this verb's series.
+        :param src: Together with ``dst``, return only this flow's series.
+        :param dst: Together with ``src``, return only this flow's series.
+        :param window_minutes: Window length (1 to 1440 minutes).
+        :return: Rates payload suitable for WebSocket responses.
+        """
+
+        flow = (src, dst) if src and dst else None
+        return self._rates.get_rates(
+            code=code, verb=verb, flow=flow, window_minutes=window_minutes
+        )
+
+    def get_latency(
+        self,
+        *,
+        device_id: str | None = None,
+        code: str | None = None,
+        limit: int = 200,
+    ) -> dict[str, Any]:
+        """Return request/reply round-trip stats per device and code.
+
+        :param device_id: Filter for a specific responding device.
+        :param code: Filter for a specific code.
+        :param limit: Maximum entries returned (sorted by request count).
+        :return: Latency payload suitable for WebSocket responses.
+        """
+
+        return self._latency.get_latency(device_id=device_id, code=code, limit=limit)
+
+    @property
+    def version(self) -> int:
+        """Number of messages ingested so far (never reset)."""
+        return self._version
+
+    @property
+    def epoch(self) -> int:
+        """Number of times the counters were reset."""
+        return self._epoch
+
+    def flows_changed_since(self, version: int) -> list[TrafficFlowStats]:
+        """Return flows that counted a message after ``version``.
+
+        The flow table is ordered by recency, so this only walks the changed
+        tail of it.
+
+        :param version: A previous value of :attr:`version`.
+        :return: Changed flows, most recently changed first.
+        """
+
+        changed: list[TrafficFlowStats] = []
+        for flow in reversed(self._flows.values()):
+            if flow.version <= version:
+                break
+            changed.append(flow)
+        return changed
+
+    def evicted_since(self, version: int) -> list[tuple[str, str]] | None:
+        """Return flow keys evicted after ``version``.
+
+        :param version: A previous value of :attr:`version`.
+        :return: Evicted keys, oldest first, or None if the eviction log no
+            longer reaches back to ``version``.
+        """
+
+        if version < self._evicted_floor:
+            return None
+        evicted: list[tuple[str, str]] = []
+        for evicted_at, key in reversed(self._evicted):
+            if evicted_at <= version:
+                break
+            evicted.append(key)
+        evicted.reverse()
+        return evicted
+
     def get_buffer_provider(self) -> TrafficBufferProvider:
         """Return the TrafficBufferProvider for message queries."""
         return self._buffer_provider
@@ -269,13 +563,158 @@ class TrafficCollector:
         if verb:
             self._by_verb[verb] += 1
 
+        self._version += 1
+        self._schedule_save()
         key = (src, dst)
         flow = self._flows.get(key)
         if flow is None:
             flow = TrafficFlowStats(src=src, dst=dst)
             self._flows[key] = flow
+        else:
+            self._flows.move_to_end(key)
 
         flow.add_message(verb=verb, code=code, dtm=dtm)
+        flow.version = self._version
+        self._rates.add(code=code, verb=verb, flow=key)
+
+        ts = _message_ts(dtm)
+        self._latency.add(
+            src=src, dst=dst, verb=verb, code=code, payload=data.get("payload"), ts=ts
+        )
+
+        if code:
+            interval_key = (src, code)
+            intervals = self._intervals.get(interval_key)
+            if intervals is None:
+                intervals = InterArrivalStats()
+                self._intervals[interval_key] = intervals
+                if len(self._intervals) > _MAX_INTERVAL_SERIES:
+                    self._intervals.popitem(last=False)
+            else:
+                self._intervals.move_to_end(interval_key)
+            intervals.add(ts, dtm)
 
         self._evict_flows_if_needed()
         self._notify_subscribers(data)
+
+
+class TrafficStatsView:
+    """A filtered top-K view of the collector's flows for one subscriber.
+
+    :meth:`snapshot` returns the same payload as
+    :meth:`TrafficCollector.get_stats`. After that, :meth:`delta` only
+    reports what changed: the current totals, the flows of the top-K that
+    counted new messages, and the keys that left the top-K (evicted from the
+    collector or overtaken). The top-K is maintained incrementally from the
+    collector's changed flows, so a delta costs O(changed flows).
+
+    A full snapshot is sent instead when the counters were reset, when the
+    view fell behind the collector's eviction log, or when a flow left a full
+    top-K and the next best flow is unknown.
+
+    :param collector: Source collector.
+    :param limit: Maximum flows in the view.
+    """
+
+    def __init__(
+        self,
+        collector: TrafficCollector,
+        *,
+        device_id: str | None = None,
+        src: str | None = None,
+        dst: str | None = None,
+        code: str | None = None,
+        verb: str | None = None,
+        limit: int = 200,
+    ) -> None:
+        self._collector = collector
+        self._filters = {
+            "device_id": device_id,
+            "src": src,
+            "dst": dst,
+            "code": code,
+            "verb": verb,
+        }
+        self._limit = max(0, int(limit))
+        self._version = -1
+        self._epoch = -1
+        self._top: dict[tuple[str, str], int] = {}
+        # Min-heap of (count, key); entries go stale when a count changes.
+        self._heap: list[tuple[int, tuple[str, str]]] = []
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a full stats payload and restart change tracking."""
+        stats = self._collector.get_stats(**self._filters, limit=self._limit)
+        self._version = self._collector.version
+        self._epoch = self._collector.epoch
+        self._top = {(f["src"], f["dst"]): f["count_total"] for f in stats["flows"]}
+        self._heap = [(count, key) for key, count in self._top.items()]
+        heapq.heapify(self._heap)
+        return {**stats, "delta": False}
+
+    def _min_entry(self) -> tuple[int, tuple[str, str]]:
+        heap, top = self._heap, self._top
+        while heap[0][1] not in top or top[heap[0][1]] != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def _set_count(self, key: tuple[str, str], count: int) -> None:
+        self._top[key] = count
+        heapq.heappush(self._heap, (count, key))
+        if len(self._heap) > 4 * len(self._top) + 64:
+            self._heap = [(c, k) for k, c in self._top.items()]
+            heapq.heapify(self._heap)
+
+    def delta(self) -> dict[str, Any] | None:
+        """Return the changes since the last snapshot or delta.
+
+        :return: A delta payload, a full snapshot (see the class docs), or
+            None if no message was counted since the last call.
+        """
+
+        collector = self._collector
+        if collector.epoch != self._epoch:
+            return self.snapshot()
+        if collector.version == self._version:
+            return None
+        evicted = collector.evicted_since(self._version)
+        if evicted is None:
+            return self.snapshot()
+
+        was_full = len(self._top) >= self._limit
+        removed: dict[tuple[str, str], None] = {}
+        for key in evicted:
+            if self._top.pop(key, None) is not None:
+                removed[key] = None
+        if removed and was_full:
+            return self.snapshot()
+
+        changed = collector.flows_changed_since(self._version)
+        self._version = collector.version
+
+        updated: dict[tuple[str, str], TrafficFlowStats] = {}
+        for flow in reversed(changed):
+            key = (flow.src, flow.dst)
+            if key in self._top:
+                self._set_count(key, flow.count_total)
+            elif not flow_matches(flow, **self._filters) or self._limit == 0:
+                continue
+            elif len(self._top) < self._limit:
+                self._set_count(key, flow.count_total)
+            else:
+                min_count, min_key = self._min_entry()
+                if flow.count_total <= min_count:
+                    continue
+                del self._top[min_key]
+                updated.pop(min_key, None)
+                removed[min_key] = None
+                self._set_count(key, flow.count_total)
+            removed.pop(key, None)
+            updated[key] = flow
+
+        return {
+            **collector.get_totals(),
+            "delta": True,
+            "flows": [flow.as_dict() for flow in updated.values()],
+            "removed": [list(key) for key in removed],
+        }
@@ -0,0 +1,175 @@
+"""Streaming inter-arrival statistics for the Ramses Debugger.
+
+Most RAMSES devices announce codes such as ``31DA``, ``1298`` or ``12A0`` on a
+fixed period. :class:`InterArrivalStats` tracks the gaps between consecutive
+messages of one ``(src, code)`` pair in constant memory and O(1) per message:
+
+- the inferred period, as the running median of the gaps
+- an EWMA of the gaps and of their deviation from the period (jitter)
+- the 95th percentile gap
+- the number of intervals that were missed, i.e. how many messages are
+  missing inside gaps well beyond the period
+
+Quantiles are estimated with the P² algorithm (Jain & Chlamtac, 1985), which
+keeps five markers per quantile instead of the observations themselves.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right, insort
+from typing import Any
+
+# Gaps shorter than this are repeats of the same announcement, not intervals.
+MIN_GAP_S = 1.0
+# A gap longer than this many periods counts the periods in between as missed.
+MISSED_FACTOR = 1.5
+# Gaps needed before the period is trusted for missed counting.
+MIN_SAMPLES = 5
+EWMA_ALPHA = 0.1
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile using the P² algorithm.
+
+    :param p: Quantile to estimate, between 0 and 1.
+    """
+
+    __slots__ = ("_dn", "_n", "_np", "_q", "p")
+
+    def __init__(self, p: float) -> None:
+        self.p = p
+        self._q: list[float] = []
+        self._n = [0, 1, 2, 3, 4]
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        """Add an observation."""
+        q = self._q
+        if len(q) < 5:
+            insort(q, x)
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect_right(q, x) - 1
+
+        n = self._n
+        for i in range(k + 1, 5):
+            n[i] += 1
+        np_ = self._np
+        for i in range(5):
+            np_[i] += self._dn[i]
+
+        for i in (1, 2, 3):
+            d = np_[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                qp = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = qp
+                n[i] += step
+
+    def value(self) -> float | None:
+        """Return the current estimate, or None without observations."""
+        q = self._q
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[round(self.p * (len(q) - 1))]
+        return q[2]
+
+
+class InterArrivalStats:
+    """Inter-arrival estimators for one ``(src, code)`` pair."""
+
+    __slots__ = (
+        "_median",
+        "_p95",
+        "count",
+        "ewma_gap",
+        "jitter",
+        "last_seen",
+        "last_ts",
+        "missed",
+        "samples",
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.samples = 0
+        self.missed = 0
+        self.last_ts: float | None = None
+        self.last_seen: str | None = None
+        self.ewma_gap: float | None = None
+        self.jitter: float | None = None
+        self._median = P2Quantile(0.5)
+        self._p95 = P2Quantile(0.95)
+
+    @property
+    def period(self) -> float | None:
+        """Inferred period in seconds (running median gap)."""
+        return self._median.value()
+
+    def add(self, ts: float, dtm: str | None = None) -> None:
+        """Record a message.
+
+        :param ts: Message time in epoch seconds.
+        :param dtm: Message timestamp string, kept as ``last_seen``.
+        """
+
+        self.count += 1
+        if dtm:
+            self.last_seen = dtm
+        last_ts, self.last_ts = self.last_ts, ts
+        if last_ts is None:
+            return
+        gap = ts - last_ts
+        if gap < MIN_GAP_S:
+            return
+
+        period = self._median.value()
+        self.samples += 1
+        self._median.add(gap)
+        self._p95.add(gap)
+
+        if period and self.samples > MIN_SAMPLES and gap > MISSED_FACTOR * period:
+            self.missed += max(0, round(gap / period) - 1)
+            return
+
+        if self.ewma_gap is None:
+            self.ewma_gap = gap
+        else:
+            self.ewma_gap += EWMA_ALPHA * (gap - self.ewma_gap)
+        if period:
+            deviation = abs(gap - period)
+            if self.jitter is None:
+                self.jitter = deviation
+            else:
+                self.jitter += EWMA_ALPHA * (deviation - self.jitter)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the WebSocket representation (times in seconds)."""
+
+        def _round(value: float | None) -> float | None:
+            return None if value is None else round(value, 3)
+
+        return {
+            "count": self.count,
+            "samples": self.samples,
+            "period_s": _round(self.period),
+            "ewma_gap_s": _round(self.ewma_gap),
+            "jitter_s": _round(self.jitter),
+            "p95_gap_s": _round(self._p95.value()),
+            "missed": self.missed,
+            "last_seen": self.last_seen,
+        }
@@ -0,0 +1,215 @@
+"""Request/reply correlation and round-trip latency for the Ramses Debugger.
+
+:class:`LatencyTracker` pairs requests with their replies as messages arrive
+on the shared stream:
+
+- ``RQ`` from A to B is answered by ``RP`` from B to A with the same code
+- ``W`` from A to B is acknowledged by ``I`` from B to A with the same code
+
+Requests are keyed by ``(src, dst, code, context)``, where the context is the
+first payload byte (the zone/domain index of most indexed codes), so
+concurrent requests for different zones are told apart. A repeated request
+with the same key is a retry and keeps the time of the first attempt.
+
+Requests without a reply within :data:`REPLY_TIMEOUT_S` (in stream time, i.e.
+measured against later message timestamps) count as unanswered. Pending
+requests and per-device stats live in size-capped ordered dicts, so the
+matching state stays bounded however many devices are seen.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any
+
+REPLY_TIMEOUT_S = 3.0
+# Upper bounds (ms) of the round-trip histogram buckets; the last bucket
+# holds everything slower.
+RTT_BUCKETS_MS = (25, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_MAX_PENDING = 1024
+_MAX_DEVICE_STATS = 4096
+
+_REPLY_VERBS = {"RP": "RQ", "I": "W"}
+_REQUEST_VERBS = frozenset(_REPLY_VERBS.values())
+
+PendingKey = tuple[str, str, str, str]
+
+
+def _context(payload: Any) -> str:
+    return payload[:2].upper() if isinstance(payload, str) else ""
+
+
+class LatencyStats:
+    """Round-trip counters for one ``(device, code)`` pair."""
+
+    __slots__ = (
+        "answered",
+        "histogram",
+        "requests",
+        "retries",
+        "rtt_max",
+        "rtt_min",
+        "rtt_sum",
+        "unanswered",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.answered = 0
+        self.unanswered = 0
+        self.rtt_sum = 0.0
+        self.rtt_min: float | None = None
+        self.rtt_max: float | None = None
+        self.histogram = [0] * (len(RTT_BUCKETS_MS) + 1)
+
+    def add_rtt(self, rtt_ms: float) -> None:
+        """Record an answered request."""
+        self.answered += 1
+        self.rtt_sum += rtt_ms
+        if self.rtt_min is None or rtt_ms < self.rtt_min:
+            self.rtt_min = rtt_ms
+        if self.rtt_max is None or rtt_ms > self.rtt_max:
+            self.rtt_max = rtt_ms
+        self.histogram[bisect_left(RTT_BUCKETS_MS, rtt_ms)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the WebSocket representation (times in milliseconds)."""
+        mean = self.rtt_sum / self.answered if self.answered else None
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "answered": self.answered,
+            "unanswered": self.unanswered,
+            "rtt_min_ms": None if self.rtt_min is None else round(self.rtt_min, 1),
+            "rtt_max_ms": None if self.rtt_max is None else round(self.rtt_max, 1),
+            "rtt_mean_ms": None if mean is None else round(mean, 1),
+            "histogram": list(self.histogram),
+        }
+
+
+class LatencyTracker:
+    """Match requests to replies and keep per-device round-trip stats.
+
+    :param timeout_s: Seconds after which a request counts as unanswered.
+    """
+
+    def __init__(self, timeout_s: float = REPLY_TIMEOUT_S) -> None:
+        self.timeout_s = timeout_s
+        # Oldest request first, mapped to the time of its first attempt.
+        self._pending: OrderedDict[PendingKey, float] = OrderedDict()
+        self._stats: OrderedDict[tuple[str, str], LatencyStats] = OrderedDict()
+        self._dropped = 0
+        self._now = 0.0
+
+    def reset(self) -> None:
+        """Drop pending requests and stats."""
+        self._pending.clear()
+        self._stats.clear()
+        self._dropped = 0
+
+    def _device_stats(self, device: str, code: str) -> LatencyStats:
+        key = (device, code)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = LatencyStats()
+            self._stats[key] = stats
+            if len(self._stats) > _MAX_DEVICE_STATS:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        return stats
+
+    def _expire(self) -> None:
+        deadline = self._now - self.timeout_s
+        while self._pending:
+            key, ts = next(iter(self._pending.items()))
+            if ts > deadline:
+                break
+            del self._pending[key]
+            self._device_stats(key[1], key[2]).unanswered += 1
+
+    def add(
+        self,
+        *,
+        src: str,
+        dst: str,
+        verb: str | None,
+        code: str | None,
+        payload: Any,
+        ts: float,
+    ) -> None:
+        """Feed one message from the stream.
+
+        :param src: Source device id.
+        :param dst: Destination device id.
+        :param verb: Ramses verb.
+        :param code: Ramses code.
+        :param payload: Raw hex payload, used as request context.
+        :param ts: Message time in epoch seconds.
+        """
+
+        if ts > self._now:
+            self._now = ts
+            self._expire()
+        if not verb or not code:
+            return
+
+        verb = verb.strip()
+        if verb in _REQUEST_VERBS:
+            key = (src, dst, code, _context(payload))
+            stats = self._device_stats(dst, code)
+            if key in self._pending:
+                stats.retries += 1
+                return
+            stats.requests += 1
+            self._pending[key] = ts
+            if len(self._pending) > _MAX_PENDING:
+                self._pending.popitem(last=False)
+                self._dropped += 1
+            return
+
+        if verb not in _REPLY_VERBS:
+            return
+        # Prefer the request for the same zone/domain, else any request
+        # without a payload context.
+        for context in (_context(payload), ""):
+            sent = self._pending.pop((dst, src, code, context), None)
+            if sent is not None:
+                stats = self._device_stats(src, code)
+                stats.add_rtt(max(0.0, ts - sent) * 1000.0)
+                return
+
+    def get_latency(
+        self,
+        *,
+        device_id: str | None = None,
+        code: str | None = None,
+        limit: int = 200,
+    ) -> dict[str, Any]:
+        """Return round-trip stats per responding device and code.
+
+        :param device_id: Filter for a specific responding device.
+        :param code: Filter for a specific code.
+        :param limit: Maximum entries returned (sorted by request count).
+        :return: Latency payload suitable for WebSocket responses.
+        """
+
+        entries = [
+            (key, stats)
+            for key, stats in self._stats.items()
+            if (not device_id or key[0] == device_id) and (not code or key[1] == code)
+        ]
+        entries.sort(key=lambda item: item[1].requests, reverse=True)
+        return {
+            "timeout_s": self.timeout_s,
+            "bucket_bounds_ms": list(RTT_BUCKETS_MS),
+            "pending": len(self._pending),
+            "dropped": self._dropped,
+            "devices": [
+                {"device_id": key[0], "code": key[1], **stats.as_dict()}
+                for key, stats in entries[: max(0, limit)]
+            ],
+        }
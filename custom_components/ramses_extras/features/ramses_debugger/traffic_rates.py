@@ -0,0 +1,199 @@
+"""Rolling per-minute traffic rates for the Ramses Debugger.
+
+:class:`TrafficRates` counts messages per minute for the last 24 hours,
+overall and per code, verb and flow, so windowed rates ("messages per minute
+for 31DA over the last hour") can be answered without reading the logs.
+
+Each series is sparse: it only stores the minutes in which it saw traffic,
+as two flat arrays (minute number, count). Counting a message touches the
+last entry or appends one, so ingest is O(1). Entries older than the window
+are dropped as the series is touched, and an hourly sweep drops idle series,
+so memory stays bounded regardless of uptime.
+"""
+
+from __future__ import annotations
+
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any
+
+BUCKET_SECONDS = 60
+WINDOW_BUCKETS = 24 * 60
+# Drop idle series once per this many buckets.
+_SWEEP_BUCKETS = 60
+
+RateKey = tuple[str, Any]
+
+
+class RateSeries:
+    """Per-minute counts of one series, oldest first."""
+
+    __slots__ = ("_counts", "_head", "_minutes")
+
+    def __init__(self) -> None:
+        self._minutes = array("q")
+        self._counts = array("I")
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._minutes) - self._head
+
+    @property
+    def last_minute(self) -> int | None:
+        """The newest minute with a count, or None if the series is empty."""
+        return self._minutes[-1] if len(self) else None
+
+    def add(self, minute: int, count: int = 1) -> None:
+        """Count messages in ``minute`` (which must not go backwards)."""
+        if len(self) and self._minutes[-1] >= minute:
+            self._counts[-1] += count
+        else:
+            self._minutes.append(minute)
+            self._counts.append(count)
+
+    def trim(self, first_minute: int) -> None:
+        """Drop the minutes before ``first_minute``."""
+        head = bisect_left(self._minutes, first_minute, self._head)
+        if head == self._head:
+            return
+        self._head = head
+        if self._head >= 64 and self._head * 2 >= len(self._minutes):
+            del self._minutes[: self._head]
+            del self._counts[: self._head]
+            self._head = 0
+
+    def window(self, first_minute: int, buckets: int) -> list[int]:
+        """Return dense counts for ``buckets`` minutes from ``first_minute``."""
+        counts = [0] * buckets
+        start = bisect_left(self._minutes, first_minute, self._head)
+        for i in range(start, len(self._minutes)):
+            offset = self._minutes[i] - first_minute
+            if offset >= buckets:
+                break
+            counts[offset] = self._counts[i]
+        return counts
+
+
+class TrafficRates:
+    """Rolling per-minute message counts by code, verb and flow.
+
+    :param clock: Returns the current time in epoch seconds.
+    """
+
+    def __init__(self, clock: Any = time.time) -> None:
+        self._clock = clock
+        self._series: dict[RateKey, RateSeries] = {}
+        self._last_sweep = 0
+
+    def _minute(self) -> int:
+        return int(self._clock() // BUCKET_SECONDS)
+
+    def reset(self) -> None:
+        """Drop all series."""
+        self._series.clear()
+
+    def _count(self, key: RateKey, minute: int) -> None:
+        series = self._series.get(key)
+        if series is None:
+            self._series[key] = series = RateSeries()
+        elif series.last_minute is not None and series.last_minute != minute:
+            series.trim(minute - WINDOW_BUCKETS + 1)
+        series.add(minute)
+
+    def add(
+        self,
+        *,
+        code: str | None,
+        verb: str | None,
+        flow: tuple[str, str] | None,
+    ) -> None:
+        """Count one message at the current time."""
+        minute = self._minute()
+        self._count(("all", None), minute)
+        if code:
+            self._count(("code", code), minute)
+        if verb:
+            self._count(("verb", verb), minute)
+        if flow:
+            self._count(("flow", flow), minute)
+
+        if minute - self._last_sweep >= _SWEEP_BUCKETS:
+            self._last_sweep = minute
+            self._sweep(minute)
+
+    def _sweep(self, minute: int) -> None:
+        first = minute - WINDOW_BUCKETS + 1
+        for key, series in list(self._series.items()):
+            series.trim(first)
+            if not len(series):
+                del self._series[key]
+
+    def drop_flow(self, flow: tuple[str, str]) -> None:
+        """Forget the series of an evicted flow."""
+        self._series.pop(("flow", flow), None)
+
+    def get_rates(
+        self,
+        *,
+        code: str | None = None,
+        verb: str | None = None,
+        flow: tuple[str, str] | None = None,
+        window_minutes: int = 60,
+    ) -> dict[str, Any]:
+        """Return per-minute counts for the last ``window_minutes``.
+
+        Without a ``code``, ``verb`` or ``flow`` filter every code and verb
+        series is returned, along with the overall series.
+
+        :param code: Return only this code's series.
+        :param verb: Return only this verb's series.
+        :param flow: Return only this ``(src, dst)`` flow's series.
+        :param window_minutes: Window length (1 to 1440 minutes).
+        :return: Window metadata and a ``series`` list of ``kind``, ``key``,
+            ``counts`` (oldest minute first, current minute last), ``total``
+            and ``per_minute``.
+        """
+
+        buckets = max(1, min(int(window_minutes), WINDOW_BUCKETS))
+        minute = self._minute()
+        first = minute - buckets + 1
+
+        if code or verb or flow:
+            keys: list[RateKey] = []
+            if code:
+                keys.append(("code", code))
+            if verb:
+                keys.append(("verb", verb))
+            if flow:
+                keys.append(("flow", flow))
+        else:
+            keys = [("all", None)] + sorted(
+                (k for k in self._series if k[0] in ("code", "verb")),
+                key=lambda k: (k[0], k[1]),
+            )
+
+        series_out: list[dict[str, Any]] = []
+        for kind, key in keys:
+            series = self._series.get((kind, key))
+            counts = series.window(first, buckets) if series else [0] * buckets
+            total = sum(counts)
+            series_out.append(
+                {
+                    "kind": kind,
+                    "key": list(key) if kind == "flow" else key,
+                    "counts": counts,
+                    "total": total,
+                    "per_minute": round(total / buckets, 3),
+                }
+            )
+
+        return {
+            "bucket_seconds": BUCKET_SECONDS,
+            "window_minutes": buckets,
+            "start": datetime.fromtimestamp(first * BUCKET_SECONDS).isoformat(
+                timespec="seconds"
+            ),
+            "series": series_out,
+        }
@@ -0,0 +1,468 @@
+"""Columnar in-memory traffic buffer for the Ramses Debugger.
+
+:class:`TrafficStore` keeps the most recent live messages in a fixed-size
+ring. Rather than retaining every event dict, each field lives in its own
+column:
+
+- ``src`` / ``dst`` / ``verb`` / ``code`` as ids into a reference-counted
+  symbol table (device ids and codes repeat constantly)
+- the timestamp as epoch seconds in a float array
+- the raw frame as a single string; ``frame``, ``packet`` and ``payload``
+  are derived from it when they match, which is the normal case for live
+  traffic
+- a flags byte, plus a small side table for anything that does not fit
+  (other keys, timezone-aware timestamps, non-string values)
+
+``decoded_payload`` is not retained: the store only remembers that the event
+had one (or, for a lazily decoded stream message, could have one) and
+returns it as None, leaving the caller to rebuild it off the event loop.
+Events are materialized back into dicts only when a query returns them.
+
+Every message gets a monotonically increasing sequence number, and
+secondary indexes map each ``src``, ``dst``, ``verb`` and ``code`` symbol to
+the sequence numbers carrying it. Index entries are appended in sequence
+order, so evicting the oldest message only ever advances the head of its
+index arrays: both append and eviction are amortized O(1). A filtered query
+bisects the smallest matching index to the start of the window and walks it
+from there, so it costs O(log n + matches) rather than O(buffer size).
+
+A time column holds the running maximum of the message timestamps, which is
+non-decreasing even if messages arrive slightly out of order, so ``since``
+can always be bisected. ``until`` is bisected too while the retained window
+is in timestamp order.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+_SYMBOL_FIELDS = ("src", "dst", "verb", "code")
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Per-event flags.
+_HAS_FRAME = 1  # ``frame`` equals the stored raw frame
+_HAS_PACKET = 2  # ``packet`` equals the stored raw frame
+_PAYLOAD_IN_FRAME = 4  # ``payload`` is the last token of the raw frame
+_HAS_DECODED = 8  # the event carried a ``decoded_payload``
+_HAS_DTM = 16  # ``dtm`` is stored in the timestamp column
+
+
+def event_dtm(event: dict[str, Any]) -> str | None:
+    """Return the timestamp of a traffic event (``time_fired`` or ``dtm``)."""
+    dtm = event.get("time_fired")
+    if not isinstance(dtm, str):
+        dtm = event.get("dtm")
+    return dtm if isinstance(dtm, str) else None
+
+
+def _to_epoch(dtm: str) -> float | None:
+    try:
+        dt = datetime.fromisoformat(dtm)
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        return None
+    return (dt - _EPOCH).total_seconds()
+
+
+def encode_dtm(dtm: str) -> float | None:
+    """Return a naive ISO timestamp as epoch seconds, or None.
+
+    Only ``YYYY-MM-DDTHH:MM:SS.ffffff`` timestamps are encoded. A double
+    holds those to the microsecond for centuries around the epoch, so
+    :func:`decode_dtm` gives back exactly the same string.
+    """
+    if len(dtm) != 26 or dtm[10] != "T" or dtm[19] != ".":
+        return None
+    return _to_epoch(dtm)
+
+
+def decode_dtm(ts: float) -> str:
+    """Return the ISO timestamp encoded by :func:`encode_dtm`."""
+    return (_EPOCH + timedelta(seconds=ts)).isoformat(timespec="microseconds")
+
+
+def _frame_payload(frame: str) -> str | None:
+    parts = frame.split("#", 1)[0].split()
+    return parts[-1] if parts else None
+
+
+class _SeqIndex:
+    """Ascending sequence numbers of the events carrying one symbol.
+
+    Stored in a flat array with a moving head, so an entry costs 8 bytes
+    and both append and popping the oldest entry are amortized O(1).
+    """
+
+    __slots__ = ("_head", "_seqs")
+
+    def __init__(self) -> None:
+        self._seqs = array("q")
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._seqs) - self._head
+
+    def append(self, seq: int) -> None:
+        self._seqs.append(seq)
+
+    def first(self) -> int:
+        return self._seqs[self._head]
+
+    def popleft(self) -> None:
+        self._head += 1
+        if self._head >= 64 and self._head * 2 >= len(self._seqs):
+            del self._seqs[: self._head]
+            self._head = 0
+
+    def iter_from(self, seq: int) -> Iterator[int]:
+        """Yield the entries ``>= seq`` in ascending order."""
+        seqs = self._seqs
+        for i in range(bisect_left(seqs, seq, self._head), len(seqs)):
+            yield seqs[i]
+
+
+class _TimeColumn(Sequence[float]):
+    """Read-only view of the ring's time column in sequence order."""
+
+    def __init__(self, store: TrafficStore, lo: int, hi: int) -> None:
+        self._store = store
+        self._lo = lo
+        self._hi = hi
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __getitem__(self, i: Any) -> Any:
+        return self._store._times[(self._lo + i) % self._store.max_size]
+
+
+class TrafficStore:
+    """Fixed-size columnar ring of traffic events with secondary indexes.
+
+    :param max_size: Maximum number of retained events.
+    """
+
+    def __init__(self, max_size: int = 5000) -> None:
+        self.max_size = max(1, int(max_size))
+        self._reset()
+
+    def _reset(self) -> None:
+        size = self.max_size
+        self._fields: dict[str, array[int]] = {
+            name: array("i", [-1]) * size for name in _SYMBOL_FIELDS
+        }
+        self._ts = array("d", [0.0]) * size
+        self._times = array("d", [0.0]) * size
+        self._flags = array("B", [0]) * size
+        self._frames: list[str | None] = [None] * size
+        self._extras: dict[int, dict[str, Any]] = {}
+
+        self._symbols: list[str | None] = []
+        self._symbol_ids: dict[str, int] = {}
+        self._symbol_refs: list[int] = []
+        self._free_symbols: list[int] = []
+
+        self._head = 0  # sequence number of the oldest retained event
+        self._next = 0  # sequence number of the next event
+        self._max_ts = 0.0
+        # Sequence number of the newest event older than its predecessor.
+        self._last_unordered = -1
+        # Sequence number of the newest event whose timestamp is not encoded.
+        self._last_unencoded = -1
+        self._indexes: dict[str, dict[int, _SeqIndex]] = {
+            name: {} for name in _SYMBOL_FIELDS
+        }
+
+    def __len__(self) -> int:
+        return self._next - self._head
+
+    def _intern(self, value: str) -> int:
+        sid = self._symbol_ids.get(value)
+        if sid is None:
+            if self._free_symbols:
+                sid = self._free_symbols.pop()
+                self._symbols[sid] = value
+            else:
+                sid = len(self._symbols)
+                self._symbols.append(value)
+                self._symbol_refs.append(0)
+            self._symbol_ids[value] = sid
+        self._symbol_refs[sid] += 1
+        return sid
+
+    def _release(self, sid: int) -> None:
+        self._symbol_refs[sid] -= 1
+        if self._symbol_refs[sid] == 0:
+            value = self._symbols[sid]
+            if value is not None:
+                del self._symbol_ids[value]
+            self._symbols[sid] = None
+            self._free_symbols.append(sid)
+
+    def events(self) -> Iterator[dict[str, Any]]:
+        """Yield the retained events, oldest first."""
+        for seq in range(self._head, self._next):
+            yield self._materialize(seq)
+
+    def snapshot(self, limit: int) -> list[dict[str, Any]]:
+        """Return the newest ``limit`` events for persisting, oldest first.
+
+        ``decoded_payload`` is not decoded: events that had one carry
+        ``True`` instead, which :meth:`append` records the same way.
+        """
+        return [
+            self._materialize(seq, decoded=True)
+            for seq in range(max(self._head, self._next - max(0, limit)), self._next)
+        ]
+
+    def resize(self, max_size: int) -> None:
+        """Change the capacity, keeping the newest events.
+
+        :param max_size: New maximum number of retained events.
+        """
+        max_size = max(1, int(max_size))
+        kept = [
+            self._materialize(seq, decoded=True)
+            for seq in range(max(self._head, self._next - max_size), self._next)
+        ]
+
+        self.max_size = max_size
+        self._reset()
+        for event in kept:
+            self.append(event)
+
+    def append(self, event: dict[str, Any]) -> int:
+        """Store an event, evicting the oldest one if the ring is full.
+
+        :param event: Traffic event dict.
+        :return: Sequence number assigned to the event.
+        """
+        if len(self) >= self.max_size:
+            self._evict_oldest()
+
+        seq = self._next
+        self._next += 1
+        slot = seq % self.max_size
+
+        frame = event.get("frame")
+        if not isinstance(frame, str):
+            frame = event.get("packet")
+            if not isinstance(frame, str):
+                frame = None
+
+        flags = 0
+        extras: dict[str, Any] = {}
+        fields = self._fields
+        for key, value in event.items():
+            if key in fields and isinstance(value, str):
+                sid = self._intern(value)
+                fields[key][slot] = sid
+                index = self._indexes[key]
+                seqs = index.get(sid)
+                if seqs is None:
+                    index[sid] = seqs = _SeqIndex()
+                seqs.append(seq)
+            elif key == "frame" and frame is not None and value == frame:
+                flags |= _HAS_FRAME
+            elif key == "packet" and frame is not None and value == frame:
+                flags |= _HAS_PACKET
+            elif (
+                key == "payload"
+                and isinstance(value, str)
+                and frame is not None
+                and _frame_payload(frame) == value
+            ):
+                flags |= _PAYLOAD_IN_FRAME
+            elif key == "decoded_payload" and value is not None:
+                flags |= _HAS_DECODED
+            elif (
+                key == "dtm"
+                and isinstance(value, str)
+                and "time_fired" not in event
+                and (ts := encode_dtm(value)) is not None
+            ):
+                flags |= _HAS_DTM
+                self._ts[slot] = ts
+            else:
+                extras[key] = value
+
+        # Live stream messages decode lazily; remember that one is available
+        # without forcing the decode on ingest.
+        if getattr(event, "decode_pending", False):
+            flags |= _HAS_DECODED
+
+        self._frames[slot] = frame if flags & (_HAS_FRAME | _HAS_PACKET) else None
+        self._flags[slot] = flags
+        if extras:
+            self._extras[seq] = extras
+
+        if flags & _HAS_DTM:
+            ts = self._ts[slot]
+            if ts < self._max_ts:
+                self._last_unordered = seq
+            else:
+                self._max_ts = ts
+        elif event_dtm(event) is not None:
+            self._last_unencoded = seq
+        self._times[slot] = self._max_ts
+        return seq
+
+    def _evict_oldest(self) -> None:
+        seq = self._head
+        slot = seq % self.max_size
+        self._head += 1
+        self._frames[slot] = None
+        self._extras.pop(seq, None)
+        for name, column in self._fields.items():
+            sid = column[slot]
+            if sid < 0:
+                continue
+            column[slot] = -1
+            index = self._indexes[name]
+            seqs = index.get(sid)
+            if seqs and seqs.first() == seq:
+                seqs.popleft()
+                if not seqs:
+                    del index[sid]
+            self._release(sid)
+
+    def _materialize(self, seq: int, *, decoded: Any = None) -> dict[str, Any]:
+        slot = seq % self.max_size
+        flags = self._flags[slot]
+        frame = self._frames[slot]
+        event: dict[str, Any] = {}
+        for name, column in self._fields.items():
+            sid = column[slot]
+            if sid >= 0:
+                event[name] = self._symbols[sid]
+        if frame is not None:
+            if flags & _HAS_FRAME:
+                event["frame"] = frame
+            if flags & _HAS_PACKET:
+                event["packet"] = frame
+            if flags & _PAYLOAD_IN_FRAME:
+                event["payload"] = _frame_payload(frame)
+        if flags & _HAS_DTM:
+            event["dtm"] = decode_dtm(self._ts[slot])
+        extras = self._extras.get(seq)
+        if extras:
+            event.update(extras)
+        if flags & _HAS_DECODED:
+            event["decoded_payload"] = decoded
+        return event
+
+    def _seq_range(
+        self, since_ts: float | None, until_ts: float | None
+    ) -> tuple[int, int]:
+        lo, hi = self._head, self._next
+        if self._last_unencoded >= lo:
+            return lo, hi
+        column = _TimeColumn(self, lo, hi)
+        start, end = 0, len(column)
+        if since_ts is not None:
+            start = bisect_left(column, since_ts)
+        if until_ts is not None and self._last_unordered < lo:
+            end = bisect_right(column, until_ts)
+        return lo + start, lo + max(start, end)
+
+    def _in_time_range(
+        self,
+        seq: int,
+        since: str | None,
+        until: str | None,
+        since_ts: float | None,
+        until_ts: float | None,
+    ) -> bool:
+        slot = seq % self.max_size
+        if (
+            self._flags[slot] & _HAS_DTM
+            and (not since or since_ts is not None)
+            and (not until or until_ts is not None)
+        ):
+            ts = self._ts[slot]
+            return (since_ts is None or ts >= since_ts) and (
+                until_ts is None or ts <= until_ts
+            )
+
+        if self._flags[slot] & _HAS_DTM:
+            dtm: str | None = decode_dtm(self._ts[slot])
+        else:
+            extras = self._extras.get(seq)
+            dtm = event_dtm(extras) if extras else None
+        if dtm is None:
+            return False
+        if since and dtm < since:
+            return False
+        return not (until and dtm > until)
+
+    def query(
+        self,
+        *,
+        src: str | None = None,
+        dst: str | None = None,
+        verb: str | None = None,
+        code: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 200,
+    ) -> list[dict[str, Any]]:
+        """Return matching events, oldest first.
+
+        Events that had a ``decoded_payload`` carry None for it; the caller
+        decodes them again if it needs the value.
+
+        :param src: Optional filter by source device id.
+        :param dst: Optional filter by destination device id.
+        :param verb: Optional filter by verb.
+        :param code: Optional filter by code.
+        :param since: Optional lower bound timestamp filter.
+        :param until: Optional upper bound timestamp filter.
+        :param limit: Maximum events returned.
+        """
+        since_ts = _to_epoch(since) if since else None
+        until_ts = _to_epoch(until) if until else None
+        lo, hi = self._seq_range(since_ts, until_ts)
+        if lo >= hi:
+            return []
+
+        filters: list[tuple[array[int], int]] = []
+        candidates: list[_SeqIndex] = []
+        for name, value in (("src", src), ("dst", dst), ("verb", verb), ("code", code)):
+            if not value:
+                continue
+            sid = self._symbol_ids.get(value)
+            found = self._indexes[name].get(sid) if sid is not None else None
+            if not found or sid is None:
+                return []
+            filters.append((self._fields[name], sid))
+            candidates.append(found)
+
+        seqs: Iterable[int]
+        if candidates:
+            smallest = min(candidates, key=len)
+            seqs = smallest.iter_from(lo)
+        else:
+            seqs = range(lo, hi)
+
+        size = self.max_size
+        out: list[dict[str, Any]] = []
+        for seq in seqs:
+            if seq >= hi:
+                break
+            slot = seq % size
+            if any(column[slot] != sid for column, sid in filters):
+                continue
+            if (since or until) and not self._in_time_range(
+                seq, since, until, since_ts, until_ts
+            ):
+                continue
+            out.append(self._materialize(seq))
+            if len(out) >= limit:
+                break
+        return out
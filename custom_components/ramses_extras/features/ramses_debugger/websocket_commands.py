@@ -13,7 +13,6 @@ to de-duplicate expensive work across multiple card instances.
 """
 
 import logging
-from collections import Counter
 from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, cast
@@ -26,20 +25,29 @@ from custom_components.ramses_extras.const import DOMAIN
 from custom_components.ramses_extras.framework.helpers.config.export import (
     export_config_to_yaml,
 )
+from custom_components.ramses_extras.framework.helpers.ramses_decode_cache import (
+    get_decode_cache,
+)
 
 from .const import DOMAIN as RAMSES_DEBUGGER_DOMAIN
 from .debugger_cache import DebuggerCache, freeze_for_key
 from .log_backend import (
+    compile_search_pattern,
+    count_file_lines,
     discover_log_files,
     get_configured_log_path,
     get_configured_packet_log_path,
     read_file_lines,
+    read_tail_lines,
     resolve_log_file_id,
     search_with_context,
     tail_text,
 )
-from .messages_provider import get_messages_from_sources
-from .traffic_collector import TrafficCollector
+from .log_stats import TrafficAggregate, get_log_traffic_stats
+from .messages_provider import NormalizedMessage, get_messages_from_sources
+from .packet_log_follower import get_packet_log_follower
+from .parallel_search import async_search_files_with_context
+from .traffic_collector import TrafficCollector, TrafficStatsView
 
 if TYPE_CHECKING:
     from homeassistant.components.websocket_api import WebSocket
@@ -167,17 +175,6 @@ async def ws_traffic_get_stats(
         connection.send_result(msg["id"], _inject_version(hass, stats))
         return
 
-    if traffic_source == "packet_log":
-        sources = ["packet_log"]
-    elif traffic_source == "ha_log":
-        sources = ["ha_log"]
-    else:
-        sources = ["traffic_buffer"]
-
-    # For log sources, `limit` is the number of flows to return, not how many
-    # messages we should scan to build the stats.
-    message_limit = 20_000
-
     cache = _get_cache(hass)
     backing_path: Path | None = None
     if traffic_source == "packet_log":
@@ -187,95 +184,28 @@ async def ws_traffic_get_stats(
     state = _file_state(backing_path) if isinstance(backing_path, Path) else None
 
     async def _build_stats() -> dict[str, Any]:
-        messages = await get_messages_from_sources(
-            hass,
-            sources,
-            src=msg.get("src"),
-            dst=msg.get("dst"),
-            verb=msg.get("verb"),
-            code=msg.get("code"),
-            limit=message_limit,
-            dedupe=True,
-        )
-
-        by_code: Counter[str] = Counter()
-        by_verb: Counter[str] = Counter()
-        flows: dict[tuple[str, str], dict[str, Any]] = {}
-        started_at: str | None = None
-        total_count = 0
-
-        for m in messages:
-            src_ = m.get("src")
-            dst_ = m.get("dst")
-            if not isinstance(src_, str) or not isinstance(dst_, str):
-                continue
-
-            if (
-                isinstance(device_id, str)
-                and device_id
-                and device_id not in (src_, dst_)
-            ):
-                continue
-
-            total_count += 1
-
-            dtm = m.get("dtm")
-            if isinstance(dtm, str) and dtm:
-                started_at = dtm if started_at is None else min(started_at, dtm)
-
-            code_ = m.get("code")
-            if isinstance(code_, str) and code_:
-                by_code[code_] += 1
-
-            verb_ = m.get("verb")
-            if isinstance(verb_, str) and verb_:
-                by_verb[verb_] += 1
-
-            key = (src_, dst_)
-            flow = flows.get(key)
-            if flow is None:
-                flow = {
-                    "src": src_,
-                    "dst": dst_,
-                    "count_total": 0,
-                    "last_seen": None,
-                    "verbs": Counter(),
-                    "codes": Counter(),
-                }
-                flows[key] = flow
-
-            flow["count_total"] += 1
-
-            if isinstance(dtm, str) and dtm:
-                last_seen = flow.get("last_seen")
-                if not isinstance(last_seen, str) or dtm > last_seen:
-                    flow["last_seen"] = dtm
-
-            if isinstance(verb_, str) and verb_:
-                flow["verbs"][verb_] += 1
-            if isinstance(code_, str) and code_:
-                flow["codes"][code_] += 1
-
-        flow_list = list(flows.values())
-        flow_list.sort(key=lambda f: int(f.get("count_total", 0)), reverse=True)
-
-        return {
-            "started_at": started_at or "",
-            "total_count": total_count,
-            "by_code": dict(by_code),
-            "by_verb": dict(by_verb),
-            "flows": [
-                {
-                    "src": f.get("src", ""),
-                    "dst": f.get("dst", ""),
-                    "count_total": f.get("count_total", 0),
-                    "last_seen": f.get("last_seen"),
-                    "verbs": dict(f.get("verbs", {})),
-                    "codes": dict(f.get("codes", {})),
-                }
-                for f in flow_list[: max(0, int(limit))]
-            ],
-        }
+        # Whole-file stats, streamed from checkpointed per-range aggregates.
+        if isinstance(backing_path, Path):
+            try:
+                return cast(
+                    dict[str, Any],
+                    await hass.async_add_executor_job(
+                        partial(
+                            get_log_traffic_stats,
+                            backing_path,
+                            kind=traffic_source,
+                            device_id=device_id,
+                            src=msg.get("src"),
+                            dst=msg.get("dst"),
+                            verb=msg.get("verb"),
+                            code=msg.get("code"),
+                            limit=limit,
+                        )
+                    ),
+                )
+            except OSError as exc:
+                _LOGGER.warning("Could not aggregate %s: %s", backing_path, exc)
+        return TrafficAggregate().to_stats(limit=limit)
 
     cache_key = (
         "traffic_get_stats",
@@ -290,7 +220,6 @@ async def ws_traffic_get_stats(
                 "verb": msg.get("verb"),
                 "code": msg.get("code"),
                 "limit": int(limit),
-                "message_limit": int(message_limit),
             }
         ),
     )
@@ -332,6 +261,76 @@ async def ws_traffic_reset_stats(
     connection.send_result(msg["id"], _inject_version(hass, {"success": True}))
 
 
+@websocket_api.websocket_command(  # type: ignore[untyped-decorator]
+    {
+        vol.Required("type"): "ramses_extras/ramses_debugger/traffic/get_rates",
+        vol.Optional("code"): str,
+        vol.Optional("verb"): str,
+        vol.Optional("src"): str,
+        vol.Optional("dst"): str,
+        vol.Optional("window_minutes", default=60): vol.All(
+            int, vol.Range(min=1, max=1440)
+        ),
+    }
+)
+@websocket_api.async_response  # type: ignore[untyped-decorator]
+async def ws_traffic_get_rates(
+    hass: HomeAssistant,
+    connection: WebSocket,
+    msg: dict[str, Any],
+) -> None:
+    """Return per-minute live message counts over a recent window."""
+    collector = _get_traffic_collector(hass)
+    if collector is None:
+        connection.send_error(
+            msg["id"],
+            "collector_not_ready",
+            "Traffic collector is not available (is the feature enabled?)",
+        )
+        return
+
+    rates = collector.get_rates(
+        code=msg.get("code"),
+        verb=msg.get("verb"),
+        src=msg.get("src"),
+        dst=msg.get("dst"),
+        window_minutes=msg.get("window_minutes", 60),
+    )
+    connection.send_result(msg["id"], _inject_version(hass, rates))
+
+
+@websocket_api.websocket_command(  # type: ignore[untyped-decorator]
+    {
+        vol.Required("type"): "ramses_extras/ramses_debugger/traffic/get_latency",
+        vol.Optional("device_id"): str,
+        vol.Optional("code"): str,
+        vol.Optional("limit", default=200): vol.All(int, vol.Range(min=0, max=5000)),
+    }
+)
+@websocket_api.async_response  # type: ignore[untyped-decorator]
+async def ws_traffic_get_latency(
+    hass: HomeAssistant,
+    connection: WebSocket,
+    msg: dict[str, Any],
+) -> None:
+    """Return request/reply round-trip stats for live traffic."""
+    collector = _get_traffic_collector(hass)
+    if collector is None:
+        connection.send_error(
+            msg["id"],
+            "collector_not_ready",
+            "Traffic collector is not available (is the feature enabled?)",
+        )
+        return
+
+    latency = collector.get_latency(
+        device_id=msg.get("device_id"),
+        code=msg.get("code"),
+        limit=msg.get("limit", 200),
+    )
+    connection.send_result(msg["id"], _inject_version(hass, latency))
+
+
 @websocket_api.websocket_command(  # type: ignore[untyped-decorator]
     {
         vol.Required("type"): "ramses_extras/ramses_debugger/traffic/subscribe_stats",
@@ -345,6 +344,7 @@ async def ws_traffic_reset_stats(
             int,
             vol.Range(min=0, max=30000),
         ),
+        vol.Optional("delta", default=False): bool,
     }
 )
 @websocket_api.async_response  # type: ignore[untyped-decorator]
@@ -369,12 +369,11 @@ async def ws_traffic_subscribe_stats(
     verb = msg.get("verb")
     limit = msg.get("limit", 200)
     throttle_ms = msg.get("throttle_ms", 1000)
-
-    throttle_s = max(0.0, float(throttle_ms) / 1000.0)
-    last_sent: float = 0.0
-
-    def _send_snapshot() -> None:
-        snapshot = collector.get_stats(
+    # With ``delta`` the first event is a full snapshot and later events
+    # only carry what changed (see TrafficStatsView).
+    view = (
+        TrafficStatsView(
+            collector,
             device_id=device_id,
             src=src,
             dst=dst,
@@ -382,7 +381,28 @@ async def ws_traffic_subscribe_stats(
             verb=verb,
             limit=limit,
         )
-        connection.send_message(websocket_api.event_message(msg["id"], snapshot))
+        if msg.get("delta", False)
+        else None
+    )
+
+    throttle_s = max(0.0, float(throttle_ms) / 1000.0)
+    last_sent: float = 0.0
+
+    def _send_snapshot() -> None:
+        if view is not None:
+            payload = view.delta()
+            if payload is None:
+                return
+        else:
+            payload = collector.get_stats(
+                device_id=device_id,
+                src=src,
+                dst=dst,
+                code=code,
+                verb=verb,
+                limit=limit,
+            )
+        connection.send_message(websocket_api.event_message(msg["id"], payload))
 
     def _on_message(payload: dict[str, Any]) -> None:
         nonlocal last_sent
@@ -556,12 +576,13 @@ async def ws_packet_log_get_messages(
             limit=msg.get("limit", 200),
         )
 
-        message_dicts = [m.__dict__ for m in messages]
+        # Copy: parsed messages are shared with the segment cache tier.
+        message_dicts = [dict(m.__dict__) for m in messages]
         if decode:
-            from .messages_provider import decode_message_with_ramses_rf
+            from .messages_provider import async_decode_messages
 
-            for message in message_dicts:
-                decoded = decode_message_with_ramses_rf(message)
+            decoded_list = await async_decode_messages(hass, message_dicts)
+            for message, decoded in zip(message_dicts, decoded_list, strict=True):
                 if decoded is not None:
                     message["decoded"] = decoded
 
@@ -598,6 +619,61 @@ async def ws_packet_log_get_messages(
     connection.send_result(msg["id"], _inject_version(hass, result))
 
 
+@websocket_api.websocket_command(  # type: ignore[untyped-decorator]
+    {
+        vol.Required("type"): "ramses_extras/ramses_debugger/packet_log/subscribe",
+        vol.Optional("device_id"): str,
+        vol.Optional("src"): str,
+        vol.Optional("dst"): str,
+        vol.Optional("verb"): str,
+        vol.Optional("code"): str,
+    }
+)
+@websocket_api.async_response  # type: ignore[untyped-decorator]
+async def ws_packet_log_subscribe(
+    hass: HomeAssistant,
+    connection: WebSocket,
+    msg: dict[str, Any],
+) -> None:
+    follower = get_packet_log_follower(hass)
+    if follower is None:
+        connection.send_error(
+            msg["id"],
+            "follower_not_ready",
+            "Packet log follower is not available (is the feature enabled?)",
+        )
+        return
+
+    device_id = msg.get("device_id")
+    src = msg.get("src")
+    dst = msg.get("dst")
+    verb = msg.get("verb")
+    code = msg.get("code")
+
+    def _on_messages(messages: list[NormalizedMessage]) -> None:
+        selected = [
+            dict(m.__dict__)
+            for m in messages
+            if (not device_id or device_id in (m.src, m.dst))
+            and (not src or m.src == src)
+            and (not dst or m.dst == dst)
+            and (not verb or m.verb == verb)
+            and (not code or m.code == code)
+        ]
+        if selected:
+            connection.send_message(
+                websocket_api.event_message(msg["id"], {"messages": selected})
+            )
+
+    unsub = follower.subscribe(_on_messages)
+
+    if not hasattr(connection, "subscriptions"):
+        connection.subscriptions = {}
+    connection.subscriptions[msg["id"]] = unsub
+
+    connection.send_result(msg["id"], _inject_version(hass, {"success": True}))
+
+
 @websocket_api.websocket_command(  # type: ignore[untyped-decorator]
     {
         vol.Required("type"): "ramses_extras/ramses_debugger/log/get_tail",
@@ -646,21 +722,18 @@ async def ws_log_get_tail(
 
     async def _read_tail() -> str:
         if offset_lines:
-            text = cast(
+            return cast(
                 str,
                 await hass.async_add_executor_job(
                     partial(
-                        tail_text,
+                        read_tail_lines,
                         path,
-                        max_lines=max_lines + offset_lines,
+                        max_lines=max_lines,
+                        offset_lines=offset_lines,
                         max_chars=max_chars,
                     )
                 ),
             )
-            lines = text.splitlines(keepends=True)
-            if offset_lines >= len(lines):
-                return ""
-            return "".join(lines[:-offset_lines])
 
         return cast(
             str,
@@ -688,12 +761,9 @@ async def ws_log_get_tail(
     else:
         text = await _read_tail()
 
-    # Calculate line numbers for the tail
-    def _count_lines() -> int:
-        return sum(1 for _ in path.open("r", encoding="utf-8", errors="replace"))
-
+    # Calculate line numbers for the tail (served by the shared line index)
     lines = text.splitlines()
-    total_lines = await hass.async_add_executor_job(_count_lines)
+    total_lines = await hass.async_add_executor_job(count_file_lines, path)
     # Account for offset: if offset is 50, we show lines ending 50 before EOF
     end_line = total_lines - offset_lines
     start_line = max(1, end_line - len(lines) + 1)
@@ -762,8 +832,9 @@ async def ws_messages_get_messages(
         )
 
         if decode:
-            from .messages_provider import decode_message_with_ramses_rf
+            from .messages_provider import async_decode_messages
 
+            pending: list[dict[str, Any]] = []
             for m in messages:
                 # If the traffic buffer already has a decoded payload
                 # from ramses_rf, use it directly instead of re-decoding.
@@ -772,7 +843,10 @@ async def ws_messages_get_messages(
                         "payload": m["decoded_payload"],
                     }
                     continue
-                decoded = decode_message_with_ramses_rf(m)
+                pending.append(m)
+
+            decoded_list = await async_decode_messages(hass, pending)
+            for m, decoded in zip(pending, decoded_list, strict=True):
                 if decoded is not None:
                     m["decoded"] = decoded
 
@@ -798,6 +872,8 @@ async def ws_messages_get_messages(
             vol.Range(min=0, max=2_000_000),
         ),
         vol.Optional("case_sensitive", default=False): bool,
+        vol.Optional("include_rotated", default=False): bool,
+        vol.Optional("regex", default=False): bool,
     }
 )
 @websocket_api.async_response  # type: ignore[untyped-decorator]
@@ -831,11 +907,41 @@ async def ws_log_search(
     max_matches = msg.get("max_matches", 200)
     max_chars = msg.get("max_chars", 400_000)
     case_sensitive = bool(msg.get("case_sensitive", False))
+    include_rotated = bool(msg.get("include_rotated", False))
+    regex = bool(msg.get("regex", False))
+
+    try:
+        compile_search_pattern(query, case_sensitive=case_sensitive, regex=regex)
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_query", str(err))
+        return
 
     cache = _get_cache(hass)
-    state = _file_state(path)
+    state: Any = _file_state(path)
+
+    paths = [path]
+    if include_rotated:
+        # Search the base log and all rotated siblings in parallel.
+        files = await hass.async_add_executor_job(discover_log_files, base)
+        paths = [f.path for f in files] or [path]
+        state = tuple(_file_state(p) for p in paths)
+        if None in state:
+            state = None
 
     async def _do_search() -> dict[str, Any]:
+        if include_rotated:
+            return await async_search_files_with_context(
+                hass,
+                paths,
+                query=query,
+                before=before,
+                after=after,
+                max_matches=max_matches,
+                max_chars=max_chars,
+                case_sensitive=case_sensitive,
+                regex=regex,
+            )
+
         return cast(
             dict[str, Any],
             await hass.async_add_executor_job(
@@ -848,6 +954,7 @@ async def ws_log_search(
                     max_matches=max_matches,
                     max_chars=max_chars,
                     case_sensitive=case_sensitive,
+                    regex=regex,
                 )
             ),
         )
@@ -858,12 +965,14 @@ async def ws_log_search(
         state,
         freeze_for_key(
             {
+                "include_rotated": include_rotated,
                 "query": query,
                 "before": int(before),
                 "after": int(after),
                 "max_matches": int(max_matches),
                 "max_chars": int(max_chars),
                 "case_sensitive": bool(case_sensitive),
+                "regex": regex,
             }
         ),
     )
@@ -886,6 +995,165 @@ async def ws_log_search(
     )
 
 
+# Bytes scanned per executor job while streaming a search; bounds the delay
+# between progress events on sparse results.
+_SEARCH_STREAM_BATCH_BYTES = 4 * 1024 * 1024
+
+
+@websocket_api.websocket_command(  # type: ignore[untyped-decorator]
+    {
+        vol.Required("type"): "ramses_extras/ramses_debugger/log/search_stream",
+        vol.Required("file_id"): str,
+        vol.Required("query"): str,
+        vol.Optional("before", default=3): vol.All(int, vol.Range(min=0, max=200)),
+        vol.Optional("after", default=3): vol.All(int, vol.Range(min=0, max=200)),
+        vol.Optional("case_sensitive", default=False): bool,
+        vol.Optional("regex", default=False): bool,
+        vol.Optional("cursor"): str,
+        vol.Optional("page_blocks", default=200): vol.All(
+            int,
+            vol.Range(min=1, max=5000),
+        ),
+        vol.Optional("chunk_blocks", default=20): vol.All(
+            int,
+            vol.Range(min=1, max=500),
+        ),
+    }
+)
+@websocket_api.async_response  # type: ignore[untyped-decorator]
+async def ws_log_search_stream(
+    hass: HomeAssistant,
+    connection: WebSocket,
+    msg: dict[str, Any],
+) -> None:
+    """Stream search blocks as events, ending with a resume cursor.
+
+    Each event carries at most ``chunk_blocks`` blocks. After ``page_blocks``
+    blocks (or at EOF) a final event with ``done`` and ``cursor`` is sent;
+    ``cursor`` is None once the whole file has been searched.
+    """
+    from .search_stream import (
+        LogSearchStream,
+        block_to_dict,
+        decode_search_cursor,
+        encode_search_cursor,
+    )
+
+    file_id = msg.get("file_id")
+    if not isinstance(file_id, str) or not file_id:
+        connection.send_error(msg["id"], "invalid_file_id", "Missing file_id")
+        return
+
+    base = get_configured_log_path(hass)
+    path = await hass.async_add_executor_job(resolve_log_file_id, base, file_id)
+    if path is None:
+        connection.send_error(
+            msg["id"],
+            "file_not_allowed",
+            "Requested file_id is not available",
+        )
+        return
+
+    query = msg.get("query")
+    try:
+        pattern = compile_search_pattern(
+            query if isinstance(query, str) else "",
+            case_sensitive=bool(msg.get("case_sensitive", False)),
+            regex=bool(msg.get("regex", False)),
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_query", str(err))
+        return
+    if pattern is None:
+        connection.send_error(msg["id"], "invalid_query", "Missing query")
+        return
+
+    offset = line = 0
+    cursor = msg.get("cursor")
+    try:
+        if cursor:
+            cursor_file_id, offset, line = decode_search_cursor(cursor)
+            if cursor_file_id != path.name:
+                raise ValueError("Search cursor belongs to another file")
+        stream = await hass.async_add_executor_job(
+            partial(
+                LogSearchStream,
+                path,
+                pattern=pattern,
+                before=msg.get("before", 3),
+                after=msg.get("after", 3),
+                offset=offset,
+                line=line,
+            )
+        )
+    except ValueError as err:
+        connection.send_error(msg["id"], "invalid_cursor", str(err))
+        return
+    except OSError as err:
+        connection.send_error(msg["id"], "read_failed", str(err))
+        return
+
+    cancelled = False
+
+    def _cancel() -> None:
+        nonlocal cancelled
+        cancelled = True
+
+    if not hasattr(connection, "subscriptions"):
+        connection.subscriptions = {}
+    connection.subscriptions[msg["id"]] = _cancel
+
+    connection.send_result(msg["id"], _inject_version(hass, {"success": True}))
+
+    page_blocks = int(msg.get("page_blocks", 200))
+    chunk_blocks = int(msg.get("chunk_blocks", 20))
+    sent_blocks = 0
+    try:
+        while not cancelled and not stream.done and sent_blocks < page_blocks:
+            blocks = await hass.async_add_executor_job(
+                partial(
+                    stream.read,
+                    max_blocks=min(chunk_blocks, page_blocks - sent_blocks),
+                    max_bytes=_SEARCH_STREAM_BATCH_BYTES,
+                )
+            )
+            if cancelled:
+                break
+            sent_blocks += len(blocks)
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {
+                        "blocks": [block_to_dict(b) for b in blocks],
+                        "matches": stream.matches,
+                        "scan_bytes": stream.scan_bytes,
+                    },
+                )
+            )
+
+        if not cancelled:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"],
+                    {
+                        "done": True,
+                        "file_id": path.name,
+                        "cursor": (
+                            None
+                            if stream.done
+                            else encode_search_cursor(path.name, *stream.position)
+                        ),
+                        "blocks": [],
+                        "matches": stream.matches,
+                        "scan_lines": stream.scan_lines,
+                        "scan_bytes": stream.scan_bytes,
+                    },
+                )
+            )
+    finally:
+        stream.close()
+
+
 @websocket_api.websocket_command(  # type: ignore[untyped-decorator]
     {
         vol.Required("type"): "ramses_extras/ramses_debugger/log/get_lines",
@@ -959,6 +1227,7 @@ async def ws_cache_get_stats(
                 {
                     "available": False,
                     "stats": None,
+                    "decode_cache": get_decode_cache().stats(),
                 },
             ),
         )
@@ -971,6 +1240,7 @@ async def ws_cache_get_stats(
             {
                 "available": True,
                 "stats": cache.stats(),
+                "decode_cache": get_decode_cache().stats(),
             },
         ),
     )
@@ -320,6 +320,33 @@ class RamsesTrafficAnalyserCard extends RamsesBaseCard {
     }, safeInterval);
   }
 
+  _applyStatsEvent(payload) {
+    // Delta events only carry changed flows and the keys that left the view;
+    // merge them into the last full snapshot.
+    if (!payload?.delta || !this._stats) {
+      return payload;
+    }
+
+    const flows = new Map(
+      (this._stats.flows || []).map((flow) => [`${flow.src}|${flow.dst}`, flow])
+    );
+    for (const [src, dst] of payload.removed || []) {
+      flows.delete(`${src}|${dst}`);
+    }
+    for (const flow of payload.flows || []) {
+      flows.set(`${flow.src}|${flow.dst}`, flow);
+    }
+
+    return {
+      ...this._stats,
+      started_at: payload.started_at,
+      total_count: payload.total_count,
+      by_code: payload.by_code,
+      by_verb: payload.by_verb,
+      flows: [...flows.values()],
+    };
+  }
+
   _startSubscription() {
     // Subscription is preferred for live traffic to reduce periodic polling
     // overhead. If subscription fails, users can enable polling as a fallback.
@@ -334,11 +361,12 @@ class RamsesTrafficAnalyserCard extends RamsesBaseCard {
       type: 'ramses_extras/ramses_debugger/traffic/subscribe_stats',
       ...this._buildFiltersFromConfig({ includeTrafficSource: false }),
       throttle_ms: safeThrottleMs,
+      delta: true,
     };
 
     this._wsUnsubPromise = this._hass.connection
       .subscribeMessage((msg) => {
-        const eventPayload = msg?.event || msg;
+        const eventPayload = this._applyStatsEvent(msg?.event || msg);
 
         // Only render if stats actually changed to avoid unnecessary scroll jumps
         const statsChanged = JSON.stringify(this._stats) !== JSON.stringify(eventPayload);
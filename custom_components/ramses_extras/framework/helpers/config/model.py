@@ -28,8 +28,6 @@ RAMSES_DEBUGGER_FRAMEWORK_OPTION_MAP: dict[str, str] = {
     "ramses_debugger_cache_max_entries": "cache_max_entries",
     "ramses_debugger_max_flows": "max_flows",
     "ramses_debugger_buffer_max_global": "buffer_max_global",
-    "ramses_debugger_buffer_max_per_flow": "buffer_max_per_flow",
-    "ramses_debugger_buffer_max_flows": "buffer_max_flows",
     "ramses_debugger_default_poll_ms": "default_poll_ms",
 }
 SENSOR_CONTROL_SOURCES_KEY = "sources"
@@ -0,0 +1,150 @@
+"""Shared memo of ramses_rf payload decodes.
+
+Decoding a frame with ramses_rf (building a ``Packet`` and ``Message`` and
+running the code's payload parser) is by far the most expensive step in
+handling a message, and most traffic repeats exactly: steady-state ``31DA``
+or ``1298`` broadcasts carry the same payload for hours. Both the live
+:class:`~RamsesMessageStream` and the Ramses Debugger log providers therefore
+go through one process-wide :class:`DecodeCache`, so a frame is decoded once
+and every later copy, live or read back from a log, is a dictionary lookup.
+
+Entries are keyed by :func:`decode_key`: verb, code and payload hex, plus the
+frame addresses, because several ramses_rf parsers (and the decoded
+``src``/``dst`` ids) depend on the device types involved. Only successful
+decodes are cached. Cached values are shared between callers and must be
+treated as read-only.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+DECODE_CACHE_MAX_ENTRIES = 4096
+
+DecodeKey = tuple[str, str, str, str, str, str]
+
+_MISSING = object()
+
+
+def decode_key(
+    verb: str,
+    code: str,
+    payload: str,
+    src: str = "",
+    dst: str = "",
+    via: str = "",
+) -> DecodeKey:
+    """Return the cache key for a frame.
+
+    :param verb: Ramses verb (padding is ignored).
+    :param code: Ramses code.
+    :param payload: Payload hex (without the length prefix).
+    :param src: Source address.
+    :param dst: Destination address.
+    :param via: Third address of the frame.
+    """
+    return (
+        verb.strip().upper(),
+        code.upper(),
+        payload.upper(),
+        src,
+        dst,
+        via,
+    )
+
+
+def decoded_fields(message: Any) -> dict[str, Any]:
+    """Return the cached fields of a decoded ramses_rf ``Message``.
+
+    :param message: ramses_rf ``Message``.
+    :return: ``src``, ``dst``, ``verb``, ``code`` and the parsed ``payload``.
+    """
+    return {
+        "src": message.src.id,
+        "dst": message.dst.id,
+        "verb": message.verb.strip(),
+        "code": str(message.code),
+        "payload": message.payload,
+    }
+
+
+class DecodeCache:
+    """Bounded LRU of decode results with hit/miss counters.
+
+    Safe to use from the event loop and executor threads at the same time;
+    the decoder itself runs outside the lock.
+
+    :param max_entries: Maximum number of cached decodes.
+    """
+
+    def __init__(self, max_entries: int = DECODE_CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[DecodeKey, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_decode(self, key: DecodeKey, decode: Callable[[], Any]) -> Any:
+        """Return the cached decode for ``key``, decoding it on a miss.
+
+        :param key: Key from :func:`decode_key`.
+        :param decode: Returns the decoded value, or None if the frame
+            could not be decoded (which is not cached).
+        :return: The decoded value, or None.
+        """
+
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = decode()
+        if value is None:
+            return None
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit/miss counters for diagnostics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+_DECODE_CACHE = DecodeCache()
+
+
+def get_decode_cache() -> DecodeCache:
+    """Return the process-wide decode cache."""
+    return _DECODE_CACHE
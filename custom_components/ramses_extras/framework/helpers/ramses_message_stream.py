@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Callable
+import re
+from collections.abc import Callable, Iterable
 from datetime import datetime
+from functools import partial
 from typing import Any
 
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant
 
 from ...const import DOMAIN
 from .ramses_commands import RamsesCommands
+from .ramses_decode_cache import decode_key, decoded_fields, get_decode_cache
 
 try:
     from ramses_rf.messages import Message
@@ -22,12 +25,138 @@ except ImportError:  # ramses_rf not available at import time
 
 _LOGGER = logging.getLogger(__name__)
 
+_ADDR_RE = re.compile(r"^(--:------|\d{2}:\d{6})$")
+
+_DECODED_PAYLOAD = "decoded_payload"
+
+
+class RamsesStreamMessage(dict[str, Any]):
+    """Message dict whose ``decoded_payload`` is decoded on first read.
+
+    Decoding a packet with ramses_rf is the expensive part of handling it,
+    and many subscribers never look at the decoded payload (transport
+    monitoring, code-filtered cards). The stream therefore hands out this
+    dict with a pending decoder instead of a decoded payload: reading
+    ``decoded_payload`` through ``[]``, ``get()`` or ``in`` runs the decoder
+    once and stores the result, which all later readers share. If decoding
+    fails the key stays absent.
+
+    Iterating, copying or serializing the dict does not decode; call
+    :meth:`resolve` first when the decoded payload must be included.
+    """
+
+    __slots__ = ("_decoder",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._decoder: Callable[[dict[str, Any]], Any] | None = None
+
+    @property
+    def decode_pending(self) -> bool:
+        """Whether a decoder is set and has not run yet."""
+        return self._decoder is not None
+
+    def set_decoder(self, decoder: Callable[[dict[str, Any]], Any]) -> None:
+        """Set the callback computing ``decoded_payload`` from this message.
+
+        The decoder gets the message itself (so it holds no reference to it)
+        and returns None if the payload cannot be decoded.
+        """
+        self._decoder = decoder
+
+    def resolve(self) -> RamsesStreamMessage:
+        """Run the pending decoder, if any, and return self."""
+        decoder, self._decoder = self._decoder, None
+        if decoder is not None:
+            decoded = decoder(self)
+            if decoded is not None:
+                self[_DECODED_PAYLOAD] = decoded
+        return self
+
+    def __missing__(self, key: str) -> Any:
+        if key == _DECODED_PAYLOAD and self._decoder is not None:
+            self.resolve()
+            if key in self:
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == _DECODED_PAYLOAD:
+            self.resolve()
+        return super().get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        if key == _DECODED_PAYLOAD:
+            self.resolve()
+        return super().__contains__(key)
+
+
+def _filter_set(values: Iterable[str] | None) -> frozenset[str] | None:
+    if values is None:
+        return None
+    return frozenset(v.strip().upper() for v in values if v) or None
+
+
+class _Subscription:
+    """A stream subscriber and its declarative filters.
+
+    Each filter is a set of accepted values, or None to accept anything.
+    """
+
+    __slots__ = ("callback", "codes", "devices", "dsts", "srcs", "verbs")
+
+    def __init__(
+        self,
+        callback: Callable[[dict[str, Any]], None],
+        *,
+        codes: frozenset[str] | None = None,
+        verbs: frozenset[str] | None = None,
+        srcs: frozenset[str] | None = None,
+        dsts: frozenset[str] | None = None,
+        devices: frozenset[str] | None = None,
+    ) -> None:
+        self.callback = callback
+        self.codes = codes
+        self.verbs = verbs
+        self.srcs = srcs
+        self.dsts = dsts
+        self.devices = devices
+
+    def device_keys(self) -> frozenset[str]:
+        """Device ids this subscription is indexed under (empty if none)."""
+        keys: frozenset[str] = frozenset()
+        for values in (self.srcs, self.dsts, self.devices):
+            if values is not None:
+                keys |= values
+        return keys
+
+    def matches(self, data: dict[str, Any]) -> bool:
+        """Return whether a message passes every filter."""
+        if self.codes is not None:
+            if str(data.get("code") or "").upper() not in self.codes:
+                return False
+        if self.verbs is not None:
+            if str(data.get("verb") or "").strip().upper() not in self.verbs:
+                return False
+        src = data.get("src")
+        dst = data.get("dst")
+        if self.srcs is not None and src not in self.srcs:
+            return False
+        if self.dsts is not None and dst not in self.dsts:
+            return False
+        return self.devices is None or src in self.devices or dst in self.devices
+
 
 class RamsesMessageStream:
     def __init__(self, hass: HomeAssistant) -> None:
         self._hass = hass
         self._msg_handler_unsub: CALLBACK_TYPE | None = None
-        self._subscribers: dict[int, Callable[[dict[str, Any]], None]] = {}
+        self._subscribers: dict[int, _Subscription] = {}
+        # Dispatch indexes: subscribers filtering on codes are found by code,
+        # those filtering only on devices by src/dst, the rest always.
+        self._by_code: dict[str, dict[int, _Subscription]] = {}
+        self._by_device: dict[str, dict[int, _Subscription]] = {}
+        self._unindexed: dict[int, _Subscription] = {}
         self._next_subscription_id = 0
         self._attach_task: asyncio.Task[None] | None = None
 
@@ -48,16 +177,68 @@ class RamsesMessageStream:
             attach_task.cancel()
         self._attach_task = None
 
-    def subscribe(self, callback: Callable[[dict[str, Any]], None]) -> CALLBACK_TYPE:
+    def subscribe(
+        self,
+        callback: Callable[[dict[str, Any]], None],
+        *,
+        codes: Iterable[str] | None = None,
+        verbs: Iterable[str] | None = None,
+        srcs: Iterable[str] | None = None,
+        dsts: Iterable[str] | None = None,
+        devices: Iterable[str] | None = None,
+    ) -> CALLBACK_TYPE:
+        """Subscribe to stream messages, optionally filtered.
+
+        Filters are combined with AND; an omitted or empty filter accepts
+        anything. The stream indexes subscribers by code and device, so a
+        message is only offered to subscribers whose filters can match it.
+
+        :param callback: Called with each matching message dict.
+        :param codes: Accepted message codes (e.g. ``["31DA", "10D0"]``).
+        :param verbs: Accepted verbs (``I``, ``RQ``, ``RP``, ``W``).
+        :param srcs: Accepted source device ids.
+        :param dsts: Accepted destination device ids.
+        :param devices: Device ids accepted as either source or destination.
+        :return: Callback removing the subscription.
+        """
         subscription_id = self._next_subscription_id
         self._next_subscription_id += 1
-        self._subscribers[subscription_id] = callback
+        sub = _Subscription(
+            callback,
+            codes=_filter_set(codes),
+            verbs=_filter_set(verbs),
+            srcs=_filter_set(srcs),
+            dsts=_filter_set(dsts),
+            devices=_filter_set(devices),
+        )
+        self._subscribers[subscription_id] = sub
+        for index, keys in self._index_keys(sub):
+            for key in keys:
+                index.setdefault(key, {})[subscription_id] = sub
+        if sub.codes is None and not sub.device_keys():
+            self._unindexed[subscription_id] = sub
 
         def _unsub() -> None:
-            self._subscribers.pop(subscription_id, None)
+            if self._subscribers.pop(subscription_id, None) is None:
+                return
+            self._unindexed.pop(subscription_id, None)
+            for index, keys in self._index_keys(sub):
+                for key in keys:
+                    bucket = index.get(key)
+                    if bucket is not None:
+                        bucket.pop(subscription_id, None)
+                        if not bucket:
+                            del index[key]
 
         return _unsub
 
+    def _index_keys(
+        self, sub: _Subscription
+    ) -> list[tuple[dict[str, dict[int, _Subscription]], frozenset[str]]]:
+        if sub.codes is not None:
+            return [(self._by_code, sub.codes)]
+        return [(self._by_device, sub.device_keys())]
+
     def _resolve_add_msg_handler(self, coordinator: Any) -> Callable[..., Any] | None:
         if coordinator is None:
             return None
@@ -113,8 +294,32 @@ class RamsesMessageStream:
         self._notify_subscribers(data)
 
     def _notify_subscribers(self, data: dict[str, Any]) -> None:
-        for callback in list(self._subscribers.values()):
-            callback(data)
+        buckets = [self._unindexed] if self._unindexed else []
+        code = data.get("code")
+        if isinstance(code, str) and self._by_code:
+            bucket = self._by_code.get(code.upper())
+            if bucket:
+                buckets.append(bucket)
+        if self._by_device:
+            for key in ("src", "dst"):
+                device = data.get(key)
+                if isinstance(device, str) and (bucket := self._by_device.get(device)):
+                    buckets.append(bucket)
+
+        if not buckets:
+            return
+        if len(buckets) == 1:
+            candidates = list(buckets[0].values())
+        else:
+            # Keep subscription order; a device subscriber can be found twice.
+            merged: dict[int, _Subscription] = {}
+            for bucket in buckets:
+                merged.update(bucket)
+            candidates = [merged[i] for i in sorted(merged)]
+
+        for sub in candidates:
+            if sub.matches(data):
+                sub.callback(data)
 
     def _frame_from_dict(self, data: dict[str, Any]) -> str | None:
         for key in ("frame", "raw", "msg", "packet"):
@@ -182,20 +387,33 @@ class RamsesMessageStream:
             return dto_value
         return None
 
-    def _parse_payload(self, data: dict[str, Any]) -> None:
-        """Enrich ``data["decoded_payload"]`` with a parsed dict if possible.
+    def _frame_via(self, data: dict[str, Any]) -> str:
+        frame = data.get("frame")
+        if isinstance(frame, str):
+            addrs = [t for t in frame.split("#", 1)[0].split() if _ADDR_RE.match(t)]
+            if len(addrs) >= 3:
+                return addrs[2]
+        return data.get("src") if data.get("dst") == "--:------" else "--:------"
 
-        If the payload is a raw hex string, try to parse it via
-        ramses_rf's Message parser and store the result in
-        ``data["decoded_payload"]``.  ``data["payload"]`` is left as the
-        raw hex string so it remains hashable and decodable.
+    def _decode(self, data: dict[str, Any], msg: Any = None) -> Any:
+        """Return the ramses_rf decode of a packet, or None.
+
+        Decodes are memoized in the shared decode cache, so a repeated frame
+        is only parsed once.  ``msg`` (the ramses_rf message, if any) is
+        tried first, then a ``PacketDTO`` rebuilt from ``data``.
         """
+        if Message is None:
+            return None
         payload = data.get("payload")
-        if payload is None or isinstance(payload, dict):
-            return
 
-        # payload is a raw hex string — try to parse it via ramses_rf
-        if Message is not None and PacketDTO is not None:
+        def _decode_packet() -> dict[str, Any] | None:
+            if msg is not None:
+                try:
+                    return decoded_fields(Message(msg))
+                except (PacketInvalid, Exception):
+                    pass
+            if PacketDTO is None:
+                return None
             try:
                 from datetime import UTC
                 from datetime import datetime as dt
@@ -212,14 +430,25 @@ class RamsesMessageStream:
                     length=f"{len(str(payload)) // 2:03d}",
                     payload=str(payload),
                 )
-                parsed_msg = Message(dto)
-                data["decoded_payload"] = parsed_msg.payload
-                return
+                return decoded_fields(Message(dto))
             except (PacketInvalid, Exception):
-                pass
+                return None
+
+        if not isinstance(payload, str):
+            return _decode_packet()
+        key = decode_key(
+            str(data.get("verb") or ""),
+            str(data.get("code") or ""),
+            payload,
+            str(data.get("src") or ""),
+            str(data.get("dst") or ""),
+            str(self._frame_via(data) or ""),
+        )
+        return get_decode_cache().get_or_decode(key, _decode_packet)
 
-        # Keep payload as string if we couldn't parse
-        data["payload"] = str(payload) if payload is not None else None
+    def _decoded_payload(self, data: dict[str, Any], msg: Any = None) -> Any:
+        decoded = self._decode(data, msg)
+        return decoded["payload"] if decoded is not None else None
 
     def _handle_msg(self, msg: Any, *args: Any, **kwargs: Any) -> None:
         pkt = getattr(msg, "_pkt", None)
@@ -232,12 +461,15 @@ class RamsesMessageStream:
         raw_payload = getattr(pkt, "payload", None)
         if raw_payload is None:
             raw_payload = getattr(msg, "payload", None)
-        data: dict[str, Any] = parsed or {
-            "src": self._extract_msg_addr(msg, "src", "addr1"),
-            "dst": self._extract_msg_addr(msg, "dst", "addr2"),
-            "verb": str(getattr(msg, "verb", "")) or None,
-            "code": str(getattr(msg, "code", "")) or None,
-        }
+        data = RamsesStreamMessage(
+            parsed
+            or {
+                "src": self._extract_msg_addr(msg, "src", "addr1"),
+                "dst": self._extract_msg_addr(msg, "dst", "addr2"),
+                "verb": str(getattr(msg, "verb", "")) or None,
+                "code": str(getattr(msg, "code", "")) or None,
+            }
+        )
         data["payload"] = raw_payload
 
         if "frame" not in data:
@@ -249,17 +481,14 @@ class RamsesMessageStream:
             data["packet"] = packet
             data.setdefault("frame", packet)
 
-        # Parse raw hex payload into a dict via ramses_rf's Message parser.
-        # Store the parsed result separately so data["payload"] stays as
+        # The raw payload is parsed via ramses_rf's Message parser only when
+        # a subscriber reads data["decoded_payload"]; data["payload"] stays
         # the raw hex string (needed for dedupe keys and decode).
-        if Message is not None and raw_payload is not None:
-            try:
-                parsed_msg = Message(msg)
-                data["decoded_payload"] = parsed_msg.payload
-            except (PacketInvalid, Exception):
-                self._parse_payload(data)
-        else:
-            self._parse_payload(data)
+        if raw_payload is not None:
+            if not isinstance(raw_payload, dict):
+                data["payload"] = str(raw_payload)
+            if Message is not None:
+                data.set_decoder(partial(self._decoded_payload, msg=msg))
 
         dtm = getattr(msg, "dtm", None)
         if dtm is None:
@@ -272,6 +501,88 @@ class RamsesMessageStream:
         self._notify_subscribers(data)
 
 
+class MessageBatcher:
+    """Collect stream messages and hand them on in batches.
+
+    A batch is flushed ``batch_ms`` after its first message arrives, or as
+    soon as it holds ``max_batch`` messages. With ``coalesce`` only the
+    newest message per ``(src, code)`` is kept, for consumers that only
+    show current state; superseded messages are counted, not delivered.
+    Pending decodes are resolved at flush time, so superseded messages are
+    never decoded.
+
+    :param hass: Home Assistant instance (its loop runs the flush timer).
+    :param flush: Called with the batched messages, oldest first, and the
+        number of messages dropped by coalescing.
+    :param batch_ms: Longest a message waits before its batch is flushed.
+    :param max_batch: Batch size that triggers an immediate flush.
+    :param coalesce: Keep only the newest message per ``(src, code)``.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        flush: Callable[[list[dict[str, Any]], int], None],
+        *,
+        batch_ms: int,
+        max_batch: int = 100,
+        coalesce: bool = False,
+    ) -> None:
+        self._hass = hass
+        self._flush_cb = flush
+        self._delay_s = max(0, batch_ms) / 1000
+        self._max_batch = max(1, max_batch)
+        self._coalesce = coalesce
+        self._pending: dict[Any, dict[str, Any]] = {}
+        self._next_key = 0
+        self._coalesced = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, data: dict[str, Any]) -> None:
+        """Queue a message, flushing if the batch is full."""
+        if self._coalesce:
+            key: Any = (data.get("src"), data.get("code"))
+            if self._pending.pop(key, None) is not None:
+                self._coalesced += 1
+        else:
+            key = self._next_key
+            self._next_key += 1
+        self._pending[key] = data
+
+        if len(self._pending) >= self._max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self._hass.loop.call_later(self._delay_s, self.flush)
+
+    def flush(self) -> None:
+        """Hand on the pending messages now."""
+        self._cancel_timer()
+        if not self._pending:
+            return
+        messages = list(self._pending.values())
+        coalesced = self._coalesced
+        self._pending.clear()
+        self._coalesced = 0
+        for data in messages:
+            if isinstance(data, RamsesStreamMessage):
+                data.resolve()
+        self._flush_cb(messages, coalesced)
+
+    def cancel(self) -> None:
+        """Drop pending messages without flushing them."""
+        self._cancel_timer()
+        self._pending.clear()
+        self._coalesced = 0
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
 def get_ramses_message_stream(hass: HomeAssistant) -> RamsesMessageStream:
     registry = hass.data.setdefault(DOMAIN, {})
     stream = registry.get("ramses_message_stream")
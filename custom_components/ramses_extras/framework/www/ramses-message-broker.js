@@ -10,6 +10,9 @@ import * as logger from './logger.js';
 
 const WS_SUBSCRIBE_TYPE = 'ramses_extras/subscribe_messages';
 const DEDUP_TTL_MS = 5000;
+// Messages are pushed in batches: one WS event per window instead of per packet.
+const WS_BATCH_MS = 100;
+const WS_MAX_BATCH = 50;
 
 class RamsesMessageBroker {
     constructor() {
@@ -62,12 +65,18 @@ class RamsesMessageBroker {
     _subscribeToMessages(conn) {
         conn.subscribeMessage(
             (event) => {
+                if (event?.event_type === 'ramses_message_batch') {
+                    for (const data of event.messages || []) {
+                        if (data) this._handleMessage(data);
+                    }
+                    return;
+                }
                 if (event?.event_type !== 'ramses_message') return;
                 const data = event?.data;
                 if (!data) return;
                 this._handleMessage(data);
             },
-            { type: WS_SUBSCRIBE_TYPE }
+            { type: WS_SUBSCRIBE_TYPE, batch_ms: WS_BATCH_MS, max_batch: WS_MAX_BATCH }
         ).then(() => {
             this._wsActive = true;
             logger.debug('RamsesMessageBroker: Subscribed to ramses_extras/subscribe_messages (WS path)');
@@ -1,5 +1,6 @@
 """Tests for default feature WebSocket commands."""
 
+import asyncio
 from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
@@ -27,8 +28,12 @@ from custom_components.ramses_extras.features.default.websocket_commands import
     ws_get_zones,
     ws_run_zone_actuation,
     ws_set_zone_demand,
+    ws_subscribe_messages,
     ws_websocket_info,
 )
+from custom_components.ramses_extras.framework.helpers.ramses_message_stream import (
+    RamsesMessageStream,
+)
 
 # Unwrap decorators for testing
 ws_get_enabled_features = ws_get_enabled_features.__wrapped__
@@ -1420,3 +1425,51 @@ async def test_ws_clear_zone_demand(connection):
             "cleared": True,
         },
     )
+
+
+async def test_ws_subscribe_messages_batches_and_coalesces(hass, connection):
+    """Batched subscriptions push one coalesced event per window."""
+    hass.loop = asyncio.get_running_loop()
+    stream = RamsesMessageStream(hass)
+    connection.subscriptions = {}
+    msg = {
+        "id": 7,
+        "type": "ramses_extras/subscribe_messages",
+        "codes": ["31da"],
+        "batch_ms": 10,
+        "max_batch": 100,
+        "coalesce": True,
+    }
+
+    with (
+        patch(
+            "custom_components.ramses_extras.framework.helpers.ramses_message_stream.get_ramses_message_stream",
+            return_value=stream,
+        ),
+        patch.object(stream, "start"),
+    ):
+        ws_subscribe_messages(hass, connection, msg)
+
+    older = {"src": "32:153289", "code": "31DA", "payload": "00"}
+    newer = {"src": "32:153289", "code": "31DA", "payload": "01"}
+    stream.inject(older)
+    stream.inject({"src": "32:153289", "code": "1298", "payload": "02"})
+    stream.inject(newer)
+    connection.send_message.assert_not_called()
+
+    await asyncio.sleep(0.05)
+
+    connection.send_message.assert_called_once_with(
+        websocket_api.event_message(
+            7,
+            {
+                "event_type": "ramses_message_batch",
+                "messages": [newer],
+                "coalesced": 1,
+            },
+        )
+    )
+    connection.send_result.assert_called_once_with(7, {"success": True})
+
+    connection.subscriptions[7]()
+    assert stream._subscribers == {}
@@ -0,0 +1,166 @@
+"""Unit tests for the ramses_debugger sparse line index."""
+
+from __future__ import annotations
+
+import gzip
+import os
+from pathlib import Path
+
+import pytest
+
+from custom_components.ramses_extras.features.ramses_debugger import log_backend
+from custom_components.ramses_extras.features.ramses_debugger.log_index import (
+    GzipLineIndex,
+    LineIndex,
+    clear_line_indexes,
+    get_line_index,
+    supports_line_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_registry() -> None:
+    clear_line_indexes()
+
+
+def _write_lines(path: Path, count: int, *, start: int = 1) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        for i in range(start, start + count):
+            f.write(f"line {i:06d} {'x' * (i % 37)}\n")
+
+
+def test_line_index_counts_and_reads_ranges(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    _write_lines(path, 5000)
+
+    index = LineIndex(path, checkpoint_bytes=1024)
+    index.refresh()
+
+    assert index.line_count == 5000
+    assert index.checkpoints > 10
+
+    lines = index.read_lines(4321, 4323)
+    assert [line.split()[1] for line in lines] == ["004321", "004322", "004323"]
+    assert index.read_lines(1, 1)[0].startswith("line 000001")
+    assert index.read_lines(5000, 6000)[0].startswith("line 005000")
+    assert index.read_lines(10, 5) == []
+
+
+def test_line_index_extends_incrementally_on_append(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    _write_lines(path, 100)
+
+    index = LineIndex(path, checkpoint_bytes=1024)
+    index.refresh()
+    checkpoints = index.checkpoints
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write("partial")
+    index.refresh()
+    assert index.line_count == 101
+    assert index.read_lines(101, 101) == ["partial"]
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write(" done\n")
+    _write_lines(path, 400, start=102)
+    index.refresh()
+
+    assert index.line_count == 501
+    assert index.checkpoints > checkpoints
+    assert index.read_lines(101, 102)[0] == "partial done"
+    assert index.read_lines(501, 501)[0].startswith("line 000501")
+
+
+def test_line_index_rebuilds_on_rotation(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    _write_lines(path, 300)
+
+    index = get_line_index(path)
+    assert index.line_count == 300
+
+    os.replace(path, tmp_path / "home-assistant.log.1")
+    path.write_text("fresh 1\nfresh 2\n", encoding="utf-8")
+
+    index = get_line_index(path)
+    assert index.line_count == 2
+    assert index.read_lines(1, 2) == ["fresh 1", "fresh 2"]
+
+
+def test_supports_line_index_regular_files_only(tmp_path: Path) -> None:
+    plain = tmp_path / "home-assistant.log"
+    plain.write_text("a\n", encoding="utf-8")
+    gz = tmp_path / "home-assistant.log.1.gz"
+    with gzip.open(gz, "wt", encoding="utf-8") as f:
+        f.write("a\n")
+
+    assert supports_line_index(plain) is True
+    assert supports_line_index(gz) is True
+    assert supports_line_index(tmp_path / "missing.log") is False
+    assert supports_line_index(tmp_path) is False
+
+
+def test_gzip_line_index_resumes_from_checkpoints(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log.1.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for i in range(1, 20001):
+            f.write(f"line {i:06d} {'y' * (i % 53)}\n")
+
+    index = GzipLineIndex(path, checkpoint_bytes=16 * 1024)
+    index.refresh()
+
+    assert index.line_count == 20000
+    assert index.checkpoints > 2
+    checkpoint_line, _ = index.locate(19000)
+    assert checkpoint_line > 1
+
+    lines = index.read_lines(18999, 19001)
+    assert [line.split()[1] for line in lines] == ["018999", "019000", "019001"]
+    assert index.read_lines(20000, 20005)[0].startswith("line 020000")
+    assert index.read_lines(1, 1)[0] == "line 000001 y"
+
+
+def test_gzip_line_index_multi_member_and_partial_last_line(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log.2.gz"
+    path.write_bytes(gzip.compress(b"a1\na2\n") + gzip.compress(b"b1\nb2\nno-newline"))
+
+    index = get_line_index(path)
+
+    assert isinstance(index, GzipLineIndex)
+    assert index.line_count == 5
+    assert index.read_lines(1, 5) == ["a1", "a2", "b1", "b2", "no-newline"]
+    assert log_backend.tail_text(path, max_lines=2) == "b2\nno-newline\n"
+
+
+def test_gzip_line_index_checkpoints_stay_bounded(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log.1.gz"
+    with gzip.open(path, "wb", compresslevel=1) as f:
+        f.write(os.urandom(3 * 1024 * 1024).hex().encode() + b"\n")
+
+    index = GzipLineIndex(path, checkpoint_bytes=1024)
+    index.refresh()
+
+    assert 1 < index.checkpoints <= 64
+    assert index.line_count == 1
+
+
+def test_read_tail_lines_pages_back_from_eof(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    _write_lines(path, 2000)
+
+    text = log_backend.read_tail_lines(path, max_lines=3, offset_lines=10)
+    assert [line.split()[1] for line in text.splitlines()] == [
+        "001988",
+        "001989",
+        "001990",
+    ]
+    assert log_backend.read_tail_lines(path, max_lines=3, offset_lines=2000) == ""
+    assert log_backend.count_file_lines(path) == 2000
+
+
+def test_read_tail_lines_gzip(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log.1.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("a\nb\nc\nd\n")
+
+    assert log_backend.read_tail_lines(path, max_lines=2, offset_lines=1) == "b\nc\n"
+    assert log_backend.count_file_lines(path) == 4
@@ -0,0 +1,197 @@
+"""Unit tests for ramses_debugger streaming log traffic stats."""
+
+from __future__ import annotations
+
+import gzip
+import os
+from pathlib import Path
+
+import pytest
+
+from custom_components.ramses_extras.features.ramses_debugger import log_stats
+from custom_components.ramses_extras.features.ramses_debugger.log_stats import (
+    LogStatsIndex,
+    clear_log_stats_indexes,
+    get_log_traffic_stats,
+)
+from custom_components.ramses_extras.features.ramses_debugger.packet_log_parse import (  # noqa: E501
+    message_key,
+    parse_packet_log_line,
+)
+
+_DEVICES = ("32:153289", "37:169161", "18:000730", "01:000000")
+_CODES = ("31DA", "22F1", "1298", "0006")
+_VERBS = ("RQ", "RP", "I", "W")
+
+
+def _line(i: int) -> str:
+    src = _DEVICES[i % 4]
+    dst = _DEVICES[(i * 7 + 1) % 4]
+    return (
+        f"2026-01-20T10:{i // 60000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:06d} "
+        f"000 {_VERBS[i % 3]:>2} --- {src} {dst} --:------ {_CODES[i % 4]} 001 00\n"
+    )
+
+
+def _naive_stats(lines: list[str], **filters: str | None) -> dict:
+    """Reference stats computed message by message."""
+    total = 0
+    by_code: dict[str, int] = {}
+    flows: dict[tuple[str, str], int] = {}
+    for line in lines:
+        msg = parse_packet_log_line(line)
+        assert msg is not None
+        device_id = filters.get("device_id")
+        if device_id and device_id not in (msg.src, msg.dst):
+            continue
+        if filters.get("code") and msg.code != filters["code"]:
+            continue
+        if filters.get("verb") and msg.verb != filters["verb"]:
+            continue
+        total += 1
+        by_code[msg.code] = by_code.get(msg.code, 0) + 1
+        flows[(msg.src, msg.dst)] = flows.get((msg.src, msg.dst), 0) + 1
+    return {"total_count": total, "by_code": by_code, "flows": flows}
+
+
+@pytest.fixture(autouse=True)
+def _clear_indexes():
+    clear_log_stats_indexes()
+    yield
+    clear_log_stats_indexes()
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [{}, {"device_id": "32:153289"}, {"code": "22F1", "verb": "RQ"}],
+)
+def test_log_stats_match_message_by_message_counts(
+    tmp_path: Path, filters: dict
+) -> None:
+    lines = [_line(i) for i in range(3000)]
+    path = tmp_path / "packet.log"
+    path.write_text("".join(lines))
+
+    stats = get_log_traffic_stats(path, kind="packet_log", limit=1000, **filters)
+    expected = _naive_stats(lines, **filters)
+
+    assert stats["total_count"] == expected["total_count"]
+    assert stats["by_code"] == expected["by_code"]
+    assert {(f["src"], f["dst"]): f["count_total"] for f in stats["flows"]} == (
+        expected["flows"]
+    )
+    assert stats["started_at"] <= stats["flows"][0]["last_seen"]
+
+
+def test_log_stats_parse_only_appended_ranges(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(log_stats, "CHECKPOINT_BYTES", 8 * 1024)
+    monkeypatch.setattr(log_stats, "_READ_BYTES", 1024)
+    parsed: list[str] = []
+
+    def _parse(line: str):
+        parsed.append(line)
+        return parse_packet_log_line(line)
+
+    path = tmp_path / "packet.log"
+    path.write_text("".join(_line(i) for i in range(500)))
+    index = LogStatsIndex(path, parse_line=_parse)
+    assert len(index.aggregate().counts) > 0
+    assert len(parsed) == 500
+    assert len(index.checkpoints) >= 4
+
+    # A partial trailing line waits until it is complete.
+    with path.open("a") as f:
+        f.write("".join(_line(i) for i in range(500, 600)))
+        f.write(_line(600)[:20])
+    parsed.clear()
+    agg = index.aggregate()
+    assert len(parsed) == 100
+    assert sum(entry[0] for entry in agg.counts.values()) == 600
+
+    with path.open("a") as f:
+        f.write(_line(600)[20:])
+    parsed.clear()
+    agg = index.aggregate()
+    assert len(parsed) == 1
+    assert sum(entry[0] for entry in agg.counts.values()) == 601
+
+    # Truncation keeps the checkpoints that still fit and re-reads the rest.
+    cut = index.checkpoints[1][1]
+    os.truncate(path, cut + 100)
+    parsed.clear()
+    agg = index.aggregate()
+    assert index.checkpoints[-1][1] == cut
+    assert len(parsed) < 100
+    assert index.indexed_bytes <= cut + 100
+
+    # A rewritten file (different head) is aggregated from scratch.
+    path.write_text("".join(_line(i) for i in range(1000, 1010)))
+    parsed.clear()
+    agg = index.aggregate()
+    assert len(parsed) == 10
+    assert sum(entry[0] for entry in agg.counts.values()) == 10
+
+
+def test_log_stats_dedupes_and_reads_gzip(tmp_path: Path) -> None:
+    lines = [_line(i) for i in range(50)]
+    doubled = [line for line in lines for _ in range(2)]
+    plain = tmp_path / "packet.log"
+    plain.write_text("".join(doubled))
+    packed = tmp_path / "packet.log.1.gz"
+    with gzip.open(packed, "wt") as f:
+        f.write("".join(doubled))
+
+    for path in (plain, packed):
+        stats = get_log_traffic_stats(path, kind="packet_log")
+        assert stats["total_count"] == 50
+
+    # Unchanged gzip files are not decompressed again.
+    index = log_stats.get_log_stats_index(packed, kind="packet_log")
+    identity = index._identity
+    index.aggregate()
+    assert index._identity == identity
+
+
+def test_log_stats_dedupe_matches_message_key(tmp_path: Path) -> None:
+    line = _line(1)
+    lines = [
+        line,
+        line.rstrip("\n") + "  # annotated\n",
+        # No payload length: rejected by both the fast path and the parser.
+        line.replace(" 001 00\n", "\n"),
+        # Older layout, parsed by the full parser.
+        "2026-01-20T10:00:00.000001 RP 37:169161 01:000000 --:------ 22F1 001 00\n",
+        "2026-01-20T10:00:00.000001 RP 37:169161 01:000000 --:------ 22F1 001 00\n",
+        "2026-01-20T10:00:00.000001 RP 37:169161 01:000000 --:------ 22F1 001 01\n",
+    ]
+    path = tmp_path / "packet.log"
+    path.write_text("".join(lines))
+
+    keys = set()
+    for text in lines:
+        msg = parse_packet_log_line(text)
+        if msg is None:
+            continue
+        keys.add(
+            message_key(
+                msg.dtm, msg.src, msg.dst, msg.verb, msg.code, msg.packet, msg.payload
+            )
+        )
+
+    assert len(keys) == 3
+    assert get_log_traffic_stats(path, kind="packet_log")["total_count"] == 3
+
+
+def test_ha_log_stats_skip_unmarked_lines(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    path.write_text(
+        "2026-01-20 10:00:00.000 DEBUG (MainThread) [ramses_cc] "
+        '{"src": "32:153289", "dst": "37:169161", "verb": "I", "code": "31DA"}\n'
+        '2026-01-20 10:00:01.000 INFO (MainThread) [other] {"src": "a", "dst": "b"}\n'
+    )
+
+    stats = get_log_traffic_stats(path, kind="ha_log")
+    assert stats["total_count"] == 1
+    assert stats["by_verb"] == {"I": 1}
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import gzip
 import logging
+import os
 import sys
+import threading
 import types
 from datetime import datetime
 from pathlib import Path
@@ -18,12 +21,19 @@ from custom_components.ramses_extras.features.ramses_debugger.messages_provider
     PacketLogParser,
     PacketLogProvider,
     TrafficBufferProvider,
-    _parse_ha_log_line,
-    _parse_packet_log_line,
     _silence_loggers,
+    async_decode_messages,
     decode_message_with_ramses_rf,
+    decode_messages_with_ramses_rf,
     get_messages_from_sources,
 )
+from custom_components.ramses_extras.features.ramses_debugger.packet_log_parse import (
+    parse_ha_log_line,
+    parse_packet_log_line,
+)
+from custom_components.ramses_extras.framework.helpers.ramses_decode_cache import (
+    DecodeCache,
+)
 
 
 @pytest.fixture
@@ -112,6 +122,22 @@ class TestTrafficBufferProvider:
         msgs = await provider.get_messages(hass, limit=1)
         assert len(msgs) == 1
 
+    @pytest.mark.asyncio
+    async def test_get_messages_time_range(self, hass, sample_traffic_buffer):
+        """Test since/until bounds and eviction from the global buffer."""
+        provider = TrafficBufferProvider(max_global=2)
+        for event in sample_traffic_buffer:
+            provider.ingest_event(event)
+
+        msgs = await provider.get_messages(hass, since="2026-01-20T10:00:00.5")
+        assert [m.verb for m in msgs] == ["RP"]
+        msgs = await provider.get_messages(hass, until="2026-01-20T10:00:00.5")
+        assert [m.verb for m in msgs] == ["RQ"]
+
+        provider.ingest_event({**sample_traffic_buffer[1], "dtm": "2026-01-20T11"})
+        assert await provider.get_messages(hass, verb="RQ") == []
+        assert len(await provider.get_messages(hass, code="31DA")) == 2
+
 
 class TestPacketLogParser:
     """Test PacketLogParser."""
@@ -120,7 +146,7 @@ class TestPacketLogParser:
     async def test_parse_packet_log_line(self):
         """Test parsing individual packet log lines."""
         line = "2026-01-20T10:00:00.000000 RQ 32:153289 37:169161 --:------ 31DA 003 123ABC"  # noqa: E501
-        msg = _parse_packet_log_line(line)
+        msg = parse_packet_log_line(line)
         assert msg is not None
         assert msg.dtm == "2026-01-20T10:00:00.000000"
         assert msg.verb == "RQ"
@@ -136,7 +162,7 @@ class TestPacketLogParser:
     async def test_parse_packet_log_line_invalid(self):
         """Test parsing invalid line."""
         line = "invalid line"
-        msg = _parse_packet_log_line(line)
+        msg = parse_packet_log_line(line)
         assert msg is None
 
     @pytest.mark.asyncio
@@ -145,7 +171,7 @@ class TestPacketLogParser:
             "2026-01-20T13:55:54.869729 I 31DA 32:153289 --:------ Y 030 "
             "00EF007FFF3C39028A03B603B603B602756800001814140000EFEF033E033E00"
         )
-        msg = _parse_packet_log_line(line)
+        msg = parse_packet_log_line(line)
         assert msg is not None
         assert msg.dtm == "2026-01-20T13:55:54.869729"
         assert msg.verb == "I"
@@ -159,7 +185,7 @@ class TestPacketLogParser:
     async def test_parse_packet_log_line_compact_malformed(self):
         # Missing destination address ("---" instead of an address)
         line = "2026-01-20T13:56:38.130940 RQ 0418 18:149488 01:000000 003 000000"
-        msg = _parse_packet_log_line(line)
+        msg = parse_packet_log_line(line)
         assert msg is not None
         assert msg.verb == "RQ"
         assert msg.src == "18:149488"
@@ -173,7 +199,7 @@ class TestPacketLogParser:
             "2026-01-20T13:27:05.670350 ... RP --- 32:153289 18:149488 --:------ "
             "10D0 006 0038B43E0000 # 10D0|RP|32:153289"
         )
-        msg = _parse_packet_log_line(line)
+        msg = parse_packet_log_line(line)
         assert msg is not None
         assert msg.verb == "RP"
         assert msg.src == "32:153289"
@@ -187,7 +213,7 @@ class TestPacketLogParser:
             "2026-01-20T13:27:05.672863 ... I 245 32:153289 --:------ 32:153289 "
             "31D9 017 000A050020202020202020202020202008"
         )
-        msg = _parse_packet_log_line(line)
+        msg = parse_packet_log_line(line)
         assert msg is not None
         assert msg.verb == "I"
         assert msg.src == "32:153289"
@@ -201,13 +227,13 @@ class TestPacketLogParser:
         """Test packet log parsing with simple mock."""
         # Mock the entire get_messages function to just test parsing
         from custom_components.ramses_extras.features.ramses_debugger.messages_provider import (  # noqa: E501
-            _parse_packet_log_line,
+            parse_packet_log_line,
         )
 
         # Test parsing directly
         msgs = []
         for line in sample_packet_log_lines:
-            msg = _parse_packet_log_line(line)
+            msg = parse_packet_log_line(line)
             if msg:
                 msgs.append(msg)
 
@@ -278,20 +304,211 @@ class TestPacketLogParser:
         assert only_src
 
 
-def test_silence_loggers_restores_state() -> None:
+@pytest.mark.asyncio
+async def test_packet_log_parser_since_until_spans_rotated_files(
+    tmp_path: Path,
+) -> None:
+    hass = MagicMock(spec=HomeAssistant)
+
+    async def _run_executor(fn):
+        return fn()
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run_executor)
+
+    def _lines(day: int) -> str:
+        return "".join(
+            f"2026-01-{day:02d}T{h:02d}:00:00.000000 000 I --- 01:111111 "
+            f"--:------ 01:111111 1F09 003 FF00{h:02d}\n"
+            for h in range(24)
+        )
+
+    base = tmp_path / "packet_log.log"
+    rotated = tmp_path / "packet_log.log.1.gz"
+    with gzip.open(rotated, "wt", encoding="utf-8") as f:
+        f.write(_lines(19))
+    base.write_text(_lines(20), encoding="utf-8")
+    os.utime(rotated, (1_000_000, 1_000_000))
+
+    with patch(
+        "custom_components.ramses_extras.features.ramses_debugger.messages_provider.get_configured_packet_log_path",
+        return_value=base,
+    ):
+        msgs = await PacketLogParser.get_messages(
+            hass,
+            since="2026-01-19T22:00",
+            until="2026-01-20T01:00:00.000000",
+            limit=10,
+        )
+        limited = await PacketLogParser.get_messages(
+            hass, since="2026-01-19T22:00", limit=2
+        )
+
+    assert [m.dtm[:13] for m in msgs] == [
+        "2026-01-20T01",
+        "2026-01-20T00",
+        "2026-01-19T23",
+        "2026-01-19T22",
+    ]
+    assert [m.dtm[:13] for m in limited] == ["2026-01-20T23", "2026-01-20T22"]
+
+    # An explicit file only reads that file.
+    only_rotated = await PacketLogParser.get_messages(
+        hass, log_path=rotated, since="2026-01-19T23", limit=10
+    )
+    assert [m.dtm[:13] for m in only_rotated] == ["2026-01-19T23"]
+
+
+@pytest.mark.asyncio
+async def test_traffic_buffer_since_until(hass, sample_traffic_buffer) -> None:
+    provider = TrafficBufferProvider()
+    for event in sample_traffic_buffer:
+        provider.ingest_event(event)
+
+    msgs = await provider.get_messages(hass, since="2026-01-20T10:00:01")
+    assert [m.dtm for m in msgs] == ["2026-01-20T10:00:01.000000"]
+
+    msgs = await provider.get_messages(hass, until="2026-01-20T10:00:00.5")
+    assert [m.dtm for m in msgs] == ["2026-01-20T10:00:00.000000"]
+
+
+@pytest.mark.asyncio
+async def test_traffic_buffer_decodes_payloads_in_executor(hass) -> None:
+    provider = TrafficBufferProvider()
+    provider.ingest_event(
+        {
+            "dtm": "2026-01-20T10:00:00.000000",
+            "src": "32:153289",
+            "dst": "37:169161",
+            "verb": "RQ",
+            "code": "31DA",
+            "payload": "00",
+            "decoded_payload": {"fan_mode": "00"},
+        }
+    )
+    provider.ingest_event(
+        {
+            "dtm": "2026-01-20T10:00:01.000000",
+            "src": "37:169161",
+            "dst": "32:153289",
+            "verb": "RP",
+            "code": "31DA",
+            "payload": "01",
+        }
+    )
+    hass.async_add_executor_job = AsyncMock(side_effect=lambda fn, batch: fn(batch))
+
+    with patch(
+        "custom_components.ramses_extras.features.ramses_debugger.messages_provider.decode_messages_with_ramses_rf",
+        side_effect=lambda batch: [{"payload": {"fan_mode": "00"}} for _ in batch],
+    ) as decode:
+        msgs = await provider.get_messages(hass)
+
+    decode.assert_called_once()
+    assert [m["payload"] for m in decode.call_args.args[0]] == ["00"]
+    assert [m.decoded_payload for m in msgs] == [{"fan_mode": "00"}, None]
+
+
+def test_silence_loggers_only_silences_current_thread() -> None:
     name = "custom_components.ramses_extras.tests.silence"
     log = logging.getLogger(name)
-    log.disabled = False
     log.setLevel(logging.INFO)
-
-    with _silence_loggers([name]):
-        assert log.disabled is True
-        assert log.level > logging.CRITICAL
-
+    records: list[str] = []
+    handler = logging.Handler()
+    handler.emit = lambda record: records.append(record.getMessage())  # type: ignore[method-assign]
+    log.addHandler(handler)
+    try:
+        with _silence_loggers([name]):
+            log.info("decoding")
+            worker = threading.Thread(target=log.info, args=("live",))
+            worker.start()
+            worker.join()
+        log.info("after")
+    finally:
+        log.removeHandler(handler)
+
+    assert records == ["live", "after"]
     assert log.disabled is False
     assert log.level == logging.INFO
 
 
+def test_decode_messages_with_ramses_rf_batch(monkeypatch) -> None:
+    frames: list[str] = []
+
+    class DummyPacket:
+        def __init__(self, dtm: datetime, frame: str) -> None:
+            frames.append(frame)
+            tokens = frame.split()
+            self.dtm = dtm
+            self.src = types.SimpleNamespace(id=tokens[3])
+            self.dst = types.SimpleNamespace(id=tokens[4])
+            self.verb = tokens[1]
+            self.code = tokens[6]
+            self.payload = {"hex": tokens[8]}
+
+    class DummyMessage:
+        @staticmethod
+        def _from_packet(pkt: DummyPacket) -> DummyPacket:
+            logging.getLogger("ramses_tx.parsers").warning("noisy parser")
+            return pkt
+
+    mod_ramses_rf = types.ModuleType("ramses_rf")
+    mod_ramses_rf.__dict__["Message"] = DummyMessage
+    mod_ramses_rf.__dict__["Packet"] = DummyPacket
+    monkeypatch.setitem(sys.modules, "ramses_rf", mod_ramses_rf)
+    from custom_components.ramses_extras.features.ramses_debugger import (
+        messages_provider,
+    )
+
+    monkeypatch.setattr(messages_provider, "get_decode_cache", DecodeCache)
+    records: list[str] = []
+    handler = logging.Handler()
+    handler.emit = lambda record: records.append(record.getMessage())  # type: ignore[method-assign]
+    parser_log = logging.getLogger("ramses_tx.parsers")
+    parser_log.addHandler(handler)
+
+    base = {"src": "01:111111", "dst": "02:222222", "verb": "RQ", "code": "31DA"}
+    msgs = [
+        {**base, "dtm": "2026-01-20T10:00:00", "payload": "003 010203"},
+        {**base, "dtm": "bad", "payload": "003 010203"},
+        {**base, "dtm": "2026-01-20T10:00:01", "payload": "001 04"},
+    ]
+
+    try:
+        decoded = decode_messages_with_ramses_rf(msgs)
+    finally:
+        parser_log.removeHandler(handler)
+
+    assert records == []
+    assert len(frames) == 2
+    assert [d and d["payload"] for d in decoded] == [
+        {"hex": "010203"},
+        None,
+        {"hex": "04"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_decode_messages_runs_batches_in_executor(hass) -> None:
+    calls: list[int] = []
+
+    def _run(fn, batch):
+        calls.append(len(batch))
+        return fn(batch)
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run)
+    msgs = [{"payload": str(i)} for i in range(5)]
+
+    with patch(
+        "custom_components.ramses_extras.features.ramses_debugger.messages_provider.decode_messages_with_ramses_rf",
+        side_effect=lambda batch: [{"n": m["payload"]} for m in batch],
+    ):
+        decoded = await async_decode_messages(hass, msgs, batch_size=2)
+        assert await async_decode_messages(hass, []) == []
+
+    assert calls == [2, 2, 1]
+    assert [d["n"] for d in decoded] == ["0", "1", "2", "3", "4"]
+
+
 def test_decode_message_with_ramses_rf_missing_module(monkeypatch) -> None:
     # Ensure import fails
     monkeypatch.setitem(sys.modules, "ramses_rf", None)
@@ -345,7 +562,7 @@ def test_parse_ha_log_line_nested_payload():
             ),
         ]
     )
-    msg = _parse_ha_log_line(line)
+    msg = parse_ha_log_line(line)
     assert msg is not None
     assert msg.src == "32:153289"
     assert msg.dst == "37:169161"
@@ -358,7 +575,7 @@ def test_parse_ha_log_line_no_json():
         "2026-01-20 10:00:00 DEBUG (MainThread) [custom_components.ramses_cc] "
         "not json here"
     )
-    assert _parse_ha_log_line(line) is None
+    assert parse_ha_log_line(line) is None
 
 
 def test_parse_ha_log_line_nested_generic():
@@ -371,7 +588,7 @@ def test_parse_ha_log_line_nested_generic():
             ),
         ]
     )
-    msg = _parse_ha_log_line(line)
+    msg = parse_ha_log_line(line)
     assert msg is not None
     assert msg.src == "11:111111"
     assert msg.dst == "22:222222"
@@ -407,6 +624,39 @@ async def test_ha_log_provider_filters_by_src(hass) -> None:
     assert msgs[0].src == "32:AAAAAA"
 
 
+@pytest.mark.asyncio
+async def test_ha_log_provider_reads_only_marked_lines(hass, tmp_path: Path) -> None:
+    log_path = tmp_path / "home-assistant.log"
+    lines = []
+    for i in range(50):
+        lines.append(f"2026-01-20 10:00:{i:02d} INFO (MainThread) [other] {{'n': {i}}}")
+        src = "32:AAAAAA" if i % 2 else "32:BBBBBB"
+        lines.append(
+            f"2026-01-20 10:00:{i:02d} DEBUG (MainThread) [ramses_cc] "
+            f'{{"src": "{src}", "dst": "37:CCCCCC", "verb": "RQ", "code": "31DA"}}'
+        )
+    log_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    async def _run_executor(fn, *args):
+        return fn(*args)
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run_executor)
+
+    with patch(
+        "custom_components.ramses_extras.features.ramses_debugger.messages_provider.get_configured_log_path",
+        return_value=log_path,
+    ):
+        provider = HALogProvider()
+        msgs = await provider.get_messages(hass, src="32:AAAAAA", limit=3)
+
+    assert [m.dtm for m in msgs] == [
+        "2026-01-20 10:00:49",
+        "2026-01-20 10:00:47",
+        "2026-01-20 10:00:45",
+    ]
+    assert {m.src for m in msgs} == {"32:AAAAAA"}
+
+
 def test_decode_message_with_ramses_rf_payload_length_mismatch(monkeypatch) -> None:
     monkeypatch.setitem(sys.modules, "ramses_tx", None)
     msg = {
@@ -605,6 +855,58 @@ def test_decode_message_with_ramses_rf_success(monkeypatch) -> None:
     assert decoded["payload"] == {"ok": True}
 
 
+def test_decode_message_with_ramses_rf_memoizes_repeated_frames(monkeypatch) -> None:
+    from custom_components.ramses_extras.features.ramses_debugger import (
+        messages_provider,
+    )
+
+    frames: list[str] = []
+
+    class DummyPacket:
+        def __init__(self, dtm: datetime, frame: str) -> None:
+            frames.append(frame)
+            tokens = frame.split()
+            self.dtm = dtm
+            self.src = types.SimpleNamespace(id=tokens[3])
+            self.dst = types.SimpleNamespace(id=tokens[4])
+            self.verb = tokens[1]
+            self.code = tokens[6]
+            self.payload = {"hex": tokens[8]}
+
+    class DummyMessage:
+        @staticmethod
+        def _from_packet(pkt: DummyPacket) -> DummyPacket:
+            return pkt
+
+    mod_ramses_rf = types.ModuleType("ramses_rf")
+    mod_ramses_rf.__dict__["Message"] = DummyMessage
+    mod_ramses_rf.__dict__["Packet"] = DummyPacket
+    monkeypatch.setitem(sys.modules, "ramses_rf", mod_ramses_rf)
+    cache = DecodeCache()
+    monkeypatch.setattr(messages_provider, "get_decode_cache", lambda: cache)
+
+    base = {
+        "src": "32:153289",
+        "dst": "--:------",
+        "verb": "I",
+        "code": "31DA",
+        "payload": "003 00EF00",
+    }
+    first = decode_message_with_ramses_rf({**base, "dtm": "2026-01-20T10:00:00"})
+    second = decode_message_with_ramses_rf({**base, "dtm": "2026-01-20T10:05:00"})
+    other = decode_message_with_ramses_rf(
+        {**base, "dtm": "2026-01-20T10:05:00", "payload": "003 00EF01"}
+    )
+
+    assert len(frames) == 2
+    assert first is not None and second is not None and other is not None
+    assert first["dtm"] == "2026-01-20T10:00:00.000000"
+    assert second["dtm"] == "2026-01-20T10:05:00.000000"
+    assert second["payload"] == first["payload"] == {"hex": "00EF00"}
+    assert other["payload"] == {"hex": "00EF01"}
+    assert cache.stats()["hits"] == 1
+
+
 class TestHALogProvider:
     """Test HALogProvider."""
 
@@ -612,7 +914,7 @@ class TestHALogProvider:
     async def test_parse_ha_log_line(self):
         """Test parsing HA log line with JSON."""
         line = '2026-01-20 10:00:00 DEBUG (MainThread) [custom_components.ramses_cc] {"src": "32:153289", "dst": "37:169161", "verb": "RQ", "code": "31DA"}'  # noqa: E501
-        msg = _parse_ha_log_line(line)
+        msg = parse_ha_log_line(line)
         assert msg is not None
         assert msg.dtm == "2026-01-20 10:00:00"
         assert msg.src == "32:153289"
@@ -626,7 +928,7 @@ class TestHALogProvider:
     async def test_parse_ha_log_line_invalid(self):
         """Test parsing invalid HA log line."""
         line = "2026-01-20 10:00:00 DEBUG (MainThread) [custom_components.ramses_cc] no json here"  # noqa: E501
-        msg = _parse_ha_log_line(line)
+        msg = parse_ha_log_line(line)
         assert msg is None
 
     @pytest.mark.asyncio
@@ -634,12 +936,12 @@ class TestHALogProvider:
         """Test HA log parsing with simple mock."""
         # Test parsing directly
         from custom_components.ramses_extras.features.ramses_debugger.messages_provider import (  # noqa: E501
-            _parse_ha_log_line,
+            parse_ha_log_line,
         )
 
         msgs = []
         for line in sample_ha_log_lines:
-            msg = _parse_ha_log_line(line)
+            msg = parse_ha_log_line(line)
             if msg:
                 msgs.append(msg)
 
@@ -0,0 +1,283 @@
+"""Unit tests for the ramses_debugger live packet log follower."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.ramses_extras.const import DOMAIN
+from custom_components.ramses_extras.features.ramses_debugger.const import (
+    DOMAIN as RAMSES_DEBUGGER_DOMAIN,
+)
+from custom_components.ramses_extras.features.ramses_debugger.messages_provider import (
+    PacketLogParser,
+)
+from custom_components.ramses_extras.features.ramses_debugger.packet_log_follower import (  # noqa: E501
+    PacketLogFollower,
+)
+
+_PATH_GETTER = (
+    "custom_components.ramses_extras.features.ramses_debugger."
+    "packet_log_follower.get_configured_packet_log_path"
+)
+
+
+def _line(i: int, src: str = "01:111111") -> str:
+    return (
+        f"2026-01-20T10:{i // 60 % 60:02d}:{i % 60:02d}.000000 000  I --- {src} "
+        f"--:------ {src} 1F09 003 FF{i % 256:02X}00\n"
+    )
+
+
+def _write(path: Path, start: int, count: int) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.writelines(_line(i) for i in range(start, start + count))
+
+
+@pytest.fixture
+def hass() -> Iterator[MagicMock]:
+    mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.data = {}
+
+    def _run_executor(fn, *args):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(fn(*args))
+        return future
+
+    def _create_task(coro, name, *args, **kwargs):
+        # Keep file releases for the test to run; swallow the poll loop.
+        if name == "ramses_debugger_packet_log_release":
+            mock_hass.releases.append(coro)
+        else:
+            coro.close()
+        return MagicMock()
+
+    mock_hass.releases = []
+    mock_hass.async_add_executor_job = MagicMock(side_effect=_run_executor)
+    mock_hass.async_create_background_task = MagicMock(side_effect=_create_task)
+    yield mock_hass
+    for coro in mock_hass.releases:
+        coro.close()
+
+
+async def _run_releases(hass: MagicMock) -> None:
+    while hass.releases:
+        await hass.releases.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_follower_parses_only_appended_lines(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 10)
+
+    follower = PacketLogFollower(hass)
+    received: list[list[str]] = []
+    unsub = follower.subscribe(lambda msgs: received.append([m.dtm for m in msgs]))
+
+    with patch(_PATH_GETTER, return_value=path):
+        # The backlog fills the window but is not pushed as new lines.
+        assert await follower.async_poll() == []
+        assert follower.stats()["messages"] == 10
+        read = follower.read_bytes
+
+        _write(path, 10, 2)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(_line(12).rstrip("\n"))
+        new = await follower.async_poll()
+        assert [m.dtm[14:19] for m in new] == ["00:10", "00:11"]
+        assert follower.read_bytes - read == len(_line(10) + _line(11))
+
+        with path.open("a", encoding="utf-8") as f:
+            f.write("\n")
+        assert len(await follower.async_poll()) == 1
+
+        unsub()
+        _write(path, 13, 1)
+        await follower.async_poll()
+
+    assert [len(batch) for batch in received] == [2, 1]
+    assert follower.stats()["messages"] == 14
+
+
+@pytest.mark.asyncio
+async def test_follower_polls_only_while_subscribed(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 10)
+
+    follower = PacketLogFollower(hass)
+    hass.async_create_background_task.assert_not_called()
+
+    unsub_a = follower.subscribe(lambda msgs: None)
+    unsub_b = follower.subscribe(lambda msgs: None)
+    hass.async_create_background_task.assert_called_once()
+    task = follower._task
+
+    with patch(_PATH_GETTER, return_value=path):
+        await follower.async_poll()
+    assert follower.get_messages(limit=5) is not None
+
+    unsub_a()
+    unsub_a()
+    task.cancel.assert_not_called()
+
+    unsub_b()
+    task.cancel.assert_called_once()
+    assert follower.stats()["path"] is None
+    assert follower.get_messages(limit=5) is None
+    await _run_releases(hass)
+    assert follower._fh is None
+    assert follower.stats()["messages"] == 0
+
+    follower.subscribe(lambda msgs: None)
+    assert hass.async_create_background_task.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_follower_resubscribe_does_not_replay_backlog(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 10)
+
+    follower = PacketLogFollower(hass)
+    received: list[int] = []
+    with patch(_PATH_GETTER, return_value=path):
+        unsub = follower.subscribe(lambda msgs: received.append(len(msgs)))
+        await follower.async_poll()
+        unsub()
+        await _run_releases(hass)
+
+        follower.subscribe(lambda msgs: received.append(len(msgs)))
+        assert await follower.async_poll() == []
+        _write(path, 10, 2)
+        assert len(await follower.async_poll()) == 2
+
+    assert received == [2]
+
+
+@pytest.mark.asyncio
+async def test_follower_stale_release_keeps_resumed_file(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 10)
+
+    follower = PacketLogFollower(hass)
+    received: list[int] = []
+    with patch(_PATH_GETTER, return_value=path):
+        unsub = follower.subscribe(lambda msgs: received.append(len(msgs)))
+        await follower.async_poll()
+        fh = follower._fh
+
+        # Resubscribe before the release queued by the unsubscribe runs.
+        unsub()
+        follower.subscribe(lambda msgs: received.append(len(msgs)))
+        await _run_releases(hass)
+        assert follower._fh is fh
+
+        _write(path, 10, 2)
+        assert len(await follower.async_poll()) == 2
+
+    assert received == [2]
+    assert follower.path == path
+    assert follower.stats()["messages"] == 12
+
+
+@pytest.mark.asyncio
+async def test_follower_stale_read_does_not_reopen_file(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 10)
+
+    follower = PacketLogFollower(hass)
+    generation = follower._generation
+    follower.stop()
+
+    # A read queued before stop() ran must not reopen the file afterwards.
+    assert follower._read_appended(path, generation) == ([], False, [], False)
+    assert follower._fh is None
+
+
+@pytest.mark.asyncio
+async def test_follower_drains_rotated_file_and_handles_truncation(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 5)
+
+    follower = PacketLogFollower(hass)
+    with patch(_PATH_GETTER, return_value=path):
+        await follower.async_poll()
+
+        _write(path, 5, 2)
+        os.replace(path, tmp_path / "packet_log.log.1")
+        _write(path, 100, 3)
+
+        new = await follower.async_poll()
+        assert [m.dtm[14:19] for m in new] == [
+            "00:05",
+            "00:06",
+            "01:40",
+            "01:41",
+            "01:42",
+        ]
+        assert len(follower.get_messages(limit=100) or []) == 3
+
+        path.write_text(_line(200), encoding="utf-8")
+        new = await follower.async_poll()
+        assert [m.dtm[14:19] for m in new] == ["03:20"]
+        assert len(follower.get_messages(limit=100) or []) == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_window_answers_only_complete_queries(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 50)
+
+    follower = PacketLogFollower(hass, initial_bytes=len(_line(0)) * 20)
+    with patch(_PATH_GETTER, return_value=path):
+        await follower.async_poll()
+
+    assert follower.path == path
+    newest = follower.get_messages(limit=5)
+    assert newest is not None
+    assert newest[0].dtm[14:19] == "00:49"
+
+    # The window starts mid-file: older data is not in memory.
+    assert follower.get_messages(limit=100) is None
+    assert follower.get_messages(since="2026-01-20T10:00:10", limit=100) is None
+    recent = follower.get_messages(since="2026-01-20T10:00:40", limit=100)
+    assert recent is not None
+    assert len(recent) == 10
+
+
+@pytest.mark.asyncio
+async def test_packet_log_parser_serves_from_follower(
+    hass: MagicMock, tmp_path: Path
+) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 30)
+
+    follower = PacketLogFollower(hass)
+    with patch(_PATH_GETTER, return_value=path):
+        await follower.async_poll()
+    hass.data = {DOMAIN: {RAMSES_DEBUGGER_DOMAIN: {"packet_log_follower": follower}}}
+    hass.async_add_executor_job.reset_mock()
+
+    msgs = await PacketLogParser.get_messages(hass, log_path=path, limit=3)
+
+    assert [m.dtm[14:19] for m in msgs] == ["00:29", "00:28", "00:27"]
+    hass.async_add_executor_job.assert_not_called()
@@ -0,0 +1,207 @@
+"""Unit tests for the ramses_debugger packet log inverted index."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.ramses_extras.features.ramses_debugger import (
+    messages_provider,
+)
+from custom_components.ramses_extras.features.ramses_debugger import (
+    packet_log_index as packet_log_index_module,
+)
+from custom_components.ramses_extras.features.ramses_debugger.messages_provider import (
+    PacketLogParser,
+)
+from custom_components.ramses_extras.features.ramses_debugger.packet_log_index import (
+    PacketLogIndex,
+    clear_packet_log_indexes,
+    flush_packet_log_indexes,
+    get_packet_log_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_registry() -> None:
+    clear_packet_log_indexes()
+
+
+def _line(minute: int, verb: str, src: str, dst: str, code: str) -> str:
+    return (
+        f"2026-01-20T10:{minute:02d}:00.000000 000 {verb:>2} --- {src} {dst} "
+        f"--:------ {code} 003 0000{minute:02d}\n"
+    )
+
+
+def _write(path: Path, lines: list[str]) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def _offsets_of(path: Path, needle: str) -> list[int]:
+    offsets: list[int] = []
+    pos = 0
+    with path.open("rb") as f:
+        for raw in f:
+            if needle.encode() in raw:
+                offsets.append(pos)
+            pos += len(raw)
+    return offsets
+
+
+def test_packet_log_index_lookup_and_append(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(
+        path,
+        [
+            _line(0, "RQ", "32:153289", "37:169161", "31DA"),
+            _line(1, "RP", "37:169161", "32:153289", "31DA"),
+            "not a packet line\n",
+            _line(2, "I", "32:153289", "--:------", "22F1"),
+        ],
+    )
+
+    index = PacketLogIndex(path)
+    index.refresh()
+
+    assert index.indexed_lines == 3
+    assert index.lookup(src="32:153289", code="31DA") == _offsets_of(path, ":00:00")
+    assert index.lookup(device_id="32:153289") == [
+        *_offsets_of(path, ":00:00"),
+        *_offsets_of(path, ":01:00"),
+        *_offsets_of(path, ":02:00"),
+    ]
+    assert index.lookup(verb="W") == []
+    assert index.lookup() == []
+
+    # A partial line is only indexed once it is complete.
+    with path.open("a", encoding="utf-8") as f:
+        f.write(_line(3, "RQ", "32:153289", "37:169161", "31DA").rstrip("\n"))
+    index.refresh()
+    assert len(index.lookup(code="31DA")) == 2
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write("\n")
+    index.refresh()
+    assert (
+        index.lookup(src="32:153289", code="31DA")[-1] == _offsets_of(path, ":03:00")[0]
+    )
+
+    bounded = index.lookup(code="31DA", start=1, end=_offsets_of(path, ":03:00")[0])
+    assert bounded == _offsets_of(path, ":01:00")
+
+
+def test_packet_log_index_rebuilds_on_rotation(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, [_line(m, "I", "01:111111", "--:------", "1F09") for m in range(5)])
+
+    index = get_packet_log_index(path)
+    assert len(index.lookup(code="1F09")) == 5
+
+    os.replace(path, tmp_path / "packet_log.log.1")
+    _write(path, [_line(0, "I", "02:222222", "--:------", "3150")])
+
+    index = get_packet_log_index(path)
+    assert index.lookup(code="1F09") == []
+    assert index.lookup(code="3150") == [0]
+
+
+def test_packet_log_index_persists_snapshot(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    storage = tmp_path / ".storage"
+    _write(
+        path,
+        [_line(m % 60, "I", "01:111111", "--:------", "1F09") for m in range(4000)],
+    )
+
+    index = PacketLogIndex(path, storage_dir=storage)
+    index.refresh()
+    index.flush()
+    assert list(storage.iterdir())
+
+    with patch(
+        "custom_components.ramses_extras.features.ramses_debugger.packet_log_index.parse_packet_log_line"
+    ) as parse:
+        restored = PacketLogIndex(path, storage_dir=storage)
+        restored.refresh()
+
+    parse.assert_not_called()
+    assert restored.indexed_bytes == path.stat().st_size
+    assert restored.lookup(code="1F09") == index.lookup(code="1F09")
+
+
+def test_packet_log_index_debounces_snapshots(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "packet_log.log"
+    storage = tmp_path / ".storage"
+    _write(path, [_line(m, "I", "01:111111", "--:------", "1F09") for m in range(10)])
+    now = [1000.0]
+    monkeypatch.setattr(packet_log_index_module.time, "monotonic", lambda: now[0])
+
+    index = get_packet_log_index(path, storage_dir=storage)
+    assert not storage.exists()
+
+    now[0] += packet_log_index_module.PERSIST_INTERVAL_S
+    _write(path, [_line(10, "I", "01:111111", "--:------", "1F09")])
+    get_packet_log_index(path, storage_dir=storage)
+    assert PacketLogIndex(path, storage_dir=storage).indexed_bytes == (
+        path.stat().st_size
+    )
+
+    # Appends within the interval are only persisted by an explicit flush.
+    _write(path, [_line(11, "I", "01:111111", "--:------", "1F09")])
+    get_packet_log_index(path, storage_dir=storage)
+    assert PacketLogIndex(path, storage_dir=storage).indexed_bytes < (
+        path.stat().st_size
+    )
+
+    flush_packet_log_indexes()
+    restored = PacketLogIndex(path, storage_dir=storage)
+    assert restored.indexed_bytes == path.stat().st_size
+    assert restored.lookup(code="1F09") == index.lookup(code="1F09")
+
+
+@pytest.mark.asyncio
+async def test_packet_log_parser_uses_index_for_filters(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    hass = MagicMock(spec=HomeAssistant)
+    # Without a parsed tail every filtered query goes to the index.
+    monkeypatch.setattr(messages_provider, "_read_packet_log_tail", lambda path: None)
+
+    async def _run_executor(fn):
+        return fn()
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run_executor)
+
+    path = tmp_path / "packet_log.log"
+    _write(
+        path,
+        [
+            _line(
+                m, "I", "32:153289" if m % 3 == 0 else "01:111111", "--:------", "31DA"
+            )
+            for m in range(60)
+        ],
+    )
+
+    msgs = await PacketLogParser.get_messages(
+        hass, log_path=path, src="32:153289", code="31DA", limit=3
+    )
+    assert [m.dtm[11:16] for m in msgs] == ["10:57", "10:54", "10:51"]
+
+    msgs = await PacketLogParser.get_messages(
+        hass,
+        log_path=path,
+        src="32:153289",
+        since="2026-01-20T10:10",
+        until="2026-01-20T10:20",
+        limit=10,
+    )
+    assert [m.dtm[11:16] for m in msgs] == ["10:18", "10:15", "10:12"]
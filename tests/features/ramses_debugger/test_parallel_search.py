@@ -0,0 +1,137 @@
+"""Unit tests for the ramses_debugger parallel multi-file log search."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.ramses_extras.features.ramses_debugger import log_backend
+from custom_components.ramses_extras.features.ramses_debugger.parallel_search import (
+    async_search_files_with_context,
+    search_files_with_context,
+    split_ranges,
+)
+
+
+def _lines(count: int, tag: str) -> list[str]:
+    return [
+        f"{tag} line {i:04d} {'ERROR 32:153289' if i % 97 == 0 else 'ok'}"
+        for i in range(1, count + 1)
+    ]
+
+
+def test_split_ranges_are_newline_aligned(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    path.write_text("\n".join(_lines(500, "base")) + "\n", encoding="utf-8")
+    data = path.read_bytes()
+
+    ranges = split_ranges(path, 1000)
+
+    assert len(ranges) > 5
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:], strict=False):
+        assert end == start
+        assert data[end - 1 : end] == b"\n"
+
+
+def test_search_files_matches_single_file_search(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    path.write_text("\n".join(_lines(1000, "base")), encoding="utf-8")
+
+    expected = log_backend.search_with_context(
+        path, query="error\n0500", before=3, after=2
+    )
+    result = search_files_with_context(
+        [path], query="error\n0500", before=3, after=2, chunk_bytes=700
+    )
+
+    assert result["matches"] == expected["matches"]
+    assert result["blocks"] == expected["blocks"]
+    assert result["plain"] == expected["plain"]
+    assert [m["line"] for m in result["match_lines"]] == expected["match_lines"]
+    assert result["scan_lines"] == 1000
+
+
+def test_search_files_merges_rotated_files_in_order(tmp_path: Path) -> None:
+    base = tmp_path / "home-assistant.log"
+    base.write_text("\n".join(_lines(300, "base")) + "\n", encoding="utf-8")
+    rotated = tmp_path / "home-assistant.log.1"
+    rotated.write_text("\n".join(_lines(200, "one")) + "\n", encoding="utf-8")
+    compressed = tmp_path / "home-assistant.log.2.gz"
+    with gzip.open(compressed, "wt", encoding="utf-8") as f:
+        f.write("\n".join(_lines(100, "two")) + "\n")
+
+    result = search_files_with_context(
+        [base, rotated, compressed],
+        query="32:153289",
+        before=1,
+        after=1,
+        chunk_bytes=1024,
+    )
+
+    assert result["files"] == [
+        "home-assistant.log",
+        "home-assistant.log.1",
+        "home-assistant.log.2.gz",
+    ]
+    assert result["match_lines"] == [
+        {"file_id": "home-assistant.log", "line": 97},
+        {"file_id": "home-assistant.log", "line": 194},
+        {"file_id": "home-assistant.log", "line": 291},
+        {"file_id": "home-assistant.log.1", "line": 97},
+        {"file_id": "home-assistant.log.1", "line": 194},
+        {"file_id": "home-assistant.log.2.gz", "line": 97},
+    ]
+    assert [(b["file_id"], b["start_line"]) for b in result["blocks"]][-2:] == [
+        ("home-assistant.log.1", 193),
+        ("home-assistant.log.2.gz", 96),
+    ]
+    assert result["blocks"][-1]["lines"] == [
+        "two line 0096 ok",
+        "two line 0097 ERROR 32:153289",
+        "two line 0098 ok",
+    ]
+
+    capped = search_files_with_context(
+        [base, rotated, compressed], query="32:153289", max_matches=4
+    )
+    assert capped["matches"] == 4
+    assert capped["truncated_by_max_matches"] is True
+    assert capped["blocks"][-1]["file_id"] == "home-assistant.log.1"
+
+    exact = search_files_with_context(
+        [base, rotated, compressed], query="32:153289", max_matches=6
+    )
+    assert exact["matches"] == 6
+    assert exact["truncated_by_max_matches"] is False
+
+
+@pytest.mark.asyncio
+async def test_async_search_runs_each_task_as_executor_job(tmp_path: Path) -> None:
+    base = tmp_path / "home-assistant.log"
+    base.write_text("\n".join(_lines(300, "base")) + "\n", encoding="utf-8")
+    compressed = tmp_path / "home-assistant.log.1.gz"
+    with gzip.open(compressed, "wt", encoding="utf-8") as f:
+        f.write("\n".join(_lines(100, "one")) + "\n")
+
+    loop = asyncio.get_running_loop()
+    hass = MagicMock(spec=HomeAssistant)
+    hass.async_add_executor_job = MagicMock(
+        side_effect=lambda fn, *args: loop.run_in_executor(None, fn, *args)
+    )
+
+    kwargs = {"query": "32:153289", "before": 1, "after": 1, "chunk_bytes": 1024}
+    result = await async_search_files_with_context(hass, [base, compressed], **kwargs)
+    expected = search_files_with_context([base, compressed], **kwargs)
+
+    assert result["match_lines"] == expected["match_lines"]
+    assert result["blocks"] == expected["blocks"]
+    # plan + one job per byte range / gzip file + merge
+    scan_jobs = hass.async_add_executor_job.call_count - 2
+    assert scan_jobs == len(split_ranges(base, 1024)) + 1
@@ -0,0 +1,217 @@
+"""Unit tests for the ramses_debugger parsed segment cache tier."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.ramses_extras.features.ramses_debugger import (
+    messages_provider,
+)
+from custom_components.ramses_extras.features.ramses_debugger.messages_provider import (
+    PacketLogParser,
+)
+from custom_components.ramses_extras.features.ramses_debugger.packet_log_parse import (
+    parse_packet_log_line,
+)
+from custom_components.ramses_extras.features.ramses_debugger.parsed_segments import (
+    ParsedSegmentCache,
+    get_parsed_segment_cache,
+)
+
+
+def _line(i: int, src: str = "01:111111") -> str:
+    return (
+        f"2026-01-20T10:{i // 60 % 60:02d}:{i % 60:02d}.000000 000  I --- {src} "
+        f"--:------ {src} 1F09 003 FF{i % 256:02X}00\n"
+    )
+
+
+def _write(path: Path, start: int, count: int) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.writelines(_line(i) for i in range(start, start + count))
+
+
+def test_get_tail_reuses_segments_and_parses_only_appended(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 2000)
+
+    cache = ParsedSegmentCache(segment_bytes=16 * 1024)
+    first = cache.get_tail(
+        path, kind="packet_log", parse_line=parse_packet_log_line, max_bytes=10**9
+    )
+    assert len(first) == 2000
+    assert cache.stats()["parsed_bytes"] == path.stat().st_size
+
+    again = cache.get_tail(
+        path, kind="packet_log", parse_line=parse_packet_log_line, max_bytes=10**9
+    )
+    assert again == first
+    assert cache.stats()["parsed_bytes"] == path.stat().st_size
+
+    before = path.stat().st_size
+    _write(path, 2000, 3)
+    with path.open("a", encoding="utf-8") as f:
+        f.write("2026-01-20T11:00:00.000000 partial")
+
+    grown = cache.get_tail(
+        path, kind="packet_log", parse_line=parse_packet_log_line, max_bytes=10**9
+    )
+    assert len(grown) == 2003
+    appended = len("".join(_line(i) for i in range(2000, 2003)))
+    assert cache.stats()["parsed_bytes"] == before + appended
+
+
+def test_get_tail_bounds_bytes_and_drops_rotated_segments(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 3000)
+
+    cache = ParsedSegmentCache(segment_bytes=8 * 1024)
+    tail = cache.get_tail(
+        path, kind="packet_log", parse_line=parse_packet_log_line, max_bytes=20_000
+    )
+    assert 0 < len(tail) < 3000
+    assert tail[-1].payload == parse_packet_log_line(_line(2999)).payload
+
+    os.replace(path, tmp_path / "packet_log.log.1")
+    _write(path, 0, 5)
+    fresh = cache.get_tail(
+        path, kind="packet_log", parse_line=parse_packet_log_line, max_bytes=20_000
+    )
+    assert len(fresh) == 5
+    assert cache.stats()["messages"] == 5
+
+
+def test_get_tail_evicts_to_byte_budget(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 3000)
+
+    cache = ParsedSegmentCache(segment_bytes=8 * 1024, max_bytes=40 * 1024)
+    cache.get_tail(
+        path, kind="packet_log", parse_line=parse_packet_log_line, max_bytes=10**9
+    )
+    stats = cache.stats()
+    assert 0 < stats["bytes"] <= 40 * 1024
+    assert stats["messages"] < 3000
+
+
+def test_get_tail_drops_segments_before_the_tail(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 1000)
+
+    cache = ParsedSegmentCache(segment_bytes=8 * 1024)
+    tail_bytes = 20_000
+    cache.get_tail(
+        path, kind="packet_log", parse_line=parse_packet_log_line, max_bytes=tail_bytes
+    )
+    for start in range(1000, 5000, 500):
+        _write(path, start, 500)
+        tail = cache.get_tail(
+            path,
+            kind="packet_log",
+            parse_line=parse_packet_log_line,
+            max_bytes=tail_bytes,
+        )
+
+    # Only the segments of the newest tail stay cached as the file grows.
+    stats = cache.stats()
+    assert stats["messages"] == len(tail)
+    assert stats["bytes"] < tail_bytes + 8 * 1024
+
+
+@pytest.mark.asyncio
+async def test_packet_log_filters_share_parsed_tier(tmp_path: Path) -> None:
+    hass = MagicMock(spec=HomeAssistant)
+
+    async def _run_executor(fn):
+        return fn()
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run_executor)
+
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 100)
+    get_parsed_segment_cache().clear()
+
+    newest = await PacketLogParser.get_messages(hass, log_path=path, limit=5)
+    assert len(newest) == 5
+    assert newest[0].dtm == "2026-01-20T10:01:39.000000"
+
+    parsed_bytes = get_parsed_segment_cache().stats()["parsed_bytes"]
+    other = await PacketLogParser.get_messages(hass, log_path=path, limit=50)
+
+    stats = get_parsed_segment_cache().stats()
+    assert len(other) == 50
+    assert stats["hits"] >= 1
+    assert stats["parsed_bytes"] == parsed_bytes
+
+
+@pytest.mark.asyncio
+async def test_packet_log_filtered_queries_use_parsed_tier(tmp_path: Path) -> None:
+    hass = MagicMock(spec=HomeAssistant)
+
+    async def _run_executor(fn):
+        return fn()
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run_executor)
+
+    path = tmp_path / "packet_log.log"
+    with path.open("w", encoding="utf-8") as f:
+        f.writelines(
+            _line(i, "01:111111" if i % 2 else "02:222222") for i in range(100)
+        )
+    get_parsed_segment_cache().clear()
+    await PacketLogParser.get_messages(hass, log_path=path, limit=5)
+    parsed_bytes = get_parsed_segment_cache().stats()["parsed_bytes"]
+
+    with patch.object(messages_provider, "_read_packet_log_messages") as indexed:
+        msgs = await PacketLogParser.get_messages(
+            hass,
+            log_path=path,
+            src="02:222222",
+            since="2026-01-20T10:00:10",
+            until="2026-01-20T10:00:21",
+            limit=50,
+        )
+        rare = await PacketLogParser.get_messages(
+            hass, log_path=path, src="03:333333", limit=5
+        )
+
+    indexed.assert_not_called()
+    assert get_parsed_segment_cache().stats()["parsed_bytes"] == parsed_bytes
+    assert [m.dtm[17:19] for m in msgs] == ["20", "18", "16", "14", "12", "10"]
+    assert rare == []
+
+
+@pytest.mark.asyncio
+async def test_packet_log_filtered_query_falls_back_beyond_tail(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    hass = MagicMock(spec=HomeAssistant)
+
+    async def _run_executor(fn):
+        return fn()
+
+    hass.async_add_executor_job = AsyncMock(side_effect=_run_executor)
+    # The tail no longer covers the whole file, so too few matches in it
+    # cannot be the full answer.
+    monkeypatch.setattr(messages_provider, "PACKET_LOG_TAIL_BYTES", 0)
+
+    path = tmp_path / "packet_log.log"
+    _write(path, 0, 100)
+    get_parsed_segment_cache().clear()
+
+    with patch.object(
+        messages_provider,
+        "_read_packet_log_messages",
+        wraps=messages_provider._read_packet_log_messages,
+    ) as indexed:
+        msgs = await PacketLogParser.get_messages(
+            hass, log_path=path, src="01:111111", limit=500
+        )
+
+    indexed.assert_called_once()
+    assert len(msgs) == 100
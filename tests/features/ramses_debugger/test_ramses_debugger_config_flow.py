@@ -60,8 +60,6 @@ async def test_async_step_ramses_debugger_config_with_user_input(flow):
         "ramses_debugger_cache_ttl_ms": 2000,
         "ramses_debugger_max_flows": 3000,
         "ramses_debugger_buffer_max_global": 10000,
-        "ramses_debugger_buffer_max_per_flow": 1000,
-        "ramses_debugger_buffer_max_flows": 3000,
         "ramses_debugger_default_poll_ms": 2000,
     }
 
@@ -84,8 +82,6 @@ async def test_async_step_ramses_debugger_config_with_user_input(flow):
         assert options["ramses_debugger_cache_ttl_ms"] == 2000
         assert options["ramses_debugger_max_flows"] == 3000
         assert options["ramses_debugger_buffer_max_global"] == 10000
-        assert options["ramses_debugger_buffer_max_per_flow"] == 1000
-        assert options["ramses_debugger_buffer_max_flows"] == 3000
         assert options["ramses_debugger_default_poll_ms"] == 2000
 
         # Should return to main menu
@@ -229,8 +225,6 @@ async def test_async_step_ramses_debugger_config_schema_validation():
             "ramses_debugger_cache_max_entries": 256,
             "ramses_debugger_max_flows": 2000,
             "ramses_debugger_buffer_max_global": 5000,
-            "ramses_debugger_buffer_max_per_flow": 500,
-            "ramses_debugger_buffer_max_flows": 2000,
             "ramses_debugger_default_poll_ms": 1000,
         }
         result = schema(valid_data)
@@ -49,11 +49,15 @@ class TestRamsesDebuggerConst:
             "traffic_get_stats",
             "traffic_reset_stats",
             "traffic_subscribe_stats",
+            "traffic_get_rates",
+            "traffic_get_latency",
             "log_list_files",
             "log_get_tail",
             "log_search",
+            "log_search_stream",
             "packet_log_list_files",
             "packet_log_get_messages",
+            "packet_log_subscribe",
             "messages_get_messages",
             "cache_get_stats",
             "cache_clear",
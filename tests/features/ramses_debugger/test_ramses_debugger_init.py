@@ -57,6 +57,7 @@ class TestCreateRamsesDebuggerFeature:
         debugger_data = hass.data[DOMAIN][RAMSES_DEBUGGER_DOMAIN]
         assert "cache" in debugger_data
         assert "traffic_collector" in debugger_data
+        assert "packet_log_follower" in debugger_data
 
     def test_create_feature_with_cache_max_entries(self, hass, config_entry):
         """Test feature creation with custom cache max entries."""
@@ -73,8 +74,6 @@ class TestCreateRamsesDebuggerFeature:
         config_entry.options = {
             "ramses_debugger_max_flows": 50,
             "ramses_debugger_buffer_max_global": 1000,
-            "ramses_debugger_buffer_max_per_flow": 100,
-            "ramses_debugger_buffer_max_flows": 25,
         }
 
         # Mock the traffic collector to verify configuration
@@ -95,12 +94,10 @@ class TestCreateRamsesDebuggerFeature:
             result = create_ramses_debugger_feature(hass, config_entry)
 
             # Verify traffic collector was created and methods called
-            mock_tc_class.assert_called_once_with(hass)
+            mock_tc_class.assert_called_once_with(hass, persist=True)
             mock_tc_instance.configure.assert_called_once_with(
                 max_flows=50,
                 buffer_max_global=1000,
-                buffer_max_per_flow=100,
-                buffer_max_flows=25,
             )
             mock_tc_instance.start.assert_called_once()
 
@@ -161,7 +158,7 @@ class TestCreateRamsesDebuggerFeature:
             result = create_ramses_debugger_feature(hass, config_entry)
 
             # Verify traffic collector was created and started
-            mock_tc_class.assert_called_once_with(hass)
+            mock_tc_class.assert_called_once_with(hass, persist=True)
             mock_tc_instance.start.assert_called_once()
 
             # Verify result structure
@@ -169,21 +166,45 @@ class TestCreateRamsesDebuggerFeature:
             assert "traffic_collector" in result
 
     def test_create_feature_registers_unload_handler(self, hass, config_entry):
-        """Test that traffic collector stop is registered for unload."""
+        """Test that background sources stop and indexes flush on unload."""
         create_ramses_debugger_feature(hass, config_entry)
 
-        # Verify async_on_unload was called
-        config_entry.async_on_unload.assert_called_once()
+        # Verify async_on_unload was called for both background sources, the
+        # traffic snapshot save and the packet log index flush
+        assert config_entry.async_on_unload.call_count == 4
 
-        # Verify the callback is the traffic collector's stop method
-        call_args = config_entry.async_on_unload.call_args
-        stop_callback = call_args[0][0]
+        stop_callbacks = [
+            call_args[0][0] for call_args in config_entry.async_on_unload.call_args_list
+        ]
 
         debugger_data = hass.data[DOMAIN][RAMSES_DEBUGGER_DOMAIN]
         traffic_collector = debugger_data["traffic_collector"]
+        packet_log_follower = debugger_data["packet_log_follower"]
 
-        # The callback should be the traffic collector's stop method
-        assert stop_callback == traffic_collector.stop
+        assert stop_callbacks[:3] == [
+            traffic_collector.stop,
+            traffic_collector.async_save,
+            packet_log_follower.stop,
+        ]
+
+    async def test_create_feature_flushes_packet_log_indexes_on_unload(
+        self, hass, config_entry
+    ):
+        """Test that the unload hook persists packet log indexes off the loop."""
+
+        async def _run_executor(fn, *args):
+            return fn(*args)
+
+        hass.async_add_executor_job = MagicMock(side_effect=_run_executor)
+        create_ramses_debugger_feature(hass, config_entry)
+        flush_on_unload = config_entry.async_on_unload.call_args_list[-1][0][0]
+
+        with patch(
+            "custom_components.ramses_extras.features.ramses_debugger.flush_packet_log_indexes"
+        ) as flush:
+            await flush_on_unload()
+
+        flush.assert_called_once_with()
 
     def test_create_feature_with_skip_automation_setup(self, hass, config_entry):
         """Test feature creation with skip_automation_setup flag."""
@@ -10,7 +10,10 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from custom_components.ramses_extras.const import DOMAIN
-from custom_components.ramses_extras.features.ramses_debugger import websocket_commands
+from custom_components.ramses_extras.features.ramses_debugger import (
+    log_backend,
+    websocket_commands,
+)
 from custom_components.ramses_extras.features.ramses_debugger.messages_provider import (
     NormalizedMessage,
 )
@@ -121,6 +124,33 @@ async def test_ws_log_list_tail_and_search(hass, tmp_path: Path) -> None:
     assert "ERROR first" in payload["plain"]
 
 
+@pytest.mark.asyncio
+async def test_ws_log_get_tail_offset_lines(hass, tmp_path: Path) -> None:
+    base = tmp_path / "home-assistant.log"
+    base.write_text("".join(f"line {i}\n" for i in range(1, 101)), encoding="utf-8")
+
+    _setup_config_entry(hass, log_path=base)
+
+    conn = _FakeConnection()
+    await ws_log_get_tail(
+        hass,
+        conn,
+        {
+            "id": 1,
+            "type": "ramses_extras/ramses_debugger/log/get_tail",
+            "file_id": base.name,
+            "max_lines": 3,
+            "offset_lines": 10,
+        },
+    )
+
+    assert not conn.errors
+    payload = conn.results[-1][1]
+    assert payload["text"] == "line 88\nline 89\nline 90\n"
+    assert payload["start_line"] == 88
+    assert payload["end_line"] == 90
+
+
 @pytest.mark.asyncio
 async def test_ws_packet_log_list_and_get_messages(hass, tmp_path: Path) -> None:
     base = tmp_path / "packet_log.log"
@@ -260,8 +290,8 @@ async def test_ws_packet_log_get_messages_decode(hass, tmp_path: Path) -> None:
             new=AsyncMock(return_value=messages),
         ),
         patch(
-            "custom_components.ramses_extras.features.ramses_debugger.messages_provider.decode_message_with_ramses_rf",
-            return_value={"decoded": True},
+            "custom_components.ramses_extras.features.ramses_debugger.messages_provider.decode_messages_with_ramses_rf",
+            side_effect=lambda msgs: [{"decoded": True} for _ in msgs],
         ),
     ):
         await ws_packet_log_get_messages(
@@ -369,6 +399,219 @@ async def test_ws_log_search_truncated_by_max_chars(hass, tmp_path: Path) -> Non
     assert len(payload["plain"]) <= 50
 
 
+@pytest.mark.parametrize("compressed", [False, True])
+def test_search_with_context_single_pass_merges_blocks(
+    tmp_path: Path, compressed: bool
+) -> None:
+    content = "".join(
+        f"ERROR {i}\n" if i in (5, 8, 20) else f"INFO {i}\n" for i in range(1, 31)
+    )
+    if compressed:
+        path = tmp_path / "home-assistant.log.1.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(content)
+    else:
+        path = tmp_path / "home-assistant.log"
+        path.write_text(content, encoding="utf-8")
+
+    result = log_backend.search_with_context(path, query="error", before=2, after=1)
+
+    assert result["matches"] == 3
+    assert result["match_lines"] == [5, 8, 20]
+    assert [(b["start_line"], b["end_line"]) for b in result["blocks"]] == [
+        (3, 9),
+        (18, 21),
+    ]
+    assert result["blocks"][0]["lines"] == [
+        "INFO 3",
+        "INFO 4",
+        "ERROR 5",
+        "INFO 6",
+        "INFO 7",
+        "ERROR 8",
+        "INFO 9",
+    ]
+    assert result["scan_lines"] == 30
+    assert result["scan_bytes"] == len(content.encode("utf-8"))
+    assert result["scan_bytes_per_s"] >= 0
+
+
+def test_search_with_context_stops_after_max_matches_context(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    path.write_text("".join(f"hit {i}\n" for i in range(1, 101)), encoding="utf-8")
+
+    result = log_backend.search_with_context(
+        path, query="hit", before=0, after=2, max_matches=3
+    )
+
+    assert result["match_lines"] == [1, 2, 3]
+    assert result["truncated_by_max_matches"] is True
+    assert result["blocks"][0]["lines"] == ["hit 1", "hit 2", "hit 3", "hit 4", "hit 5"]
+    assert result["scan_lines"] == 5
+
+
+def test_compile_search_pattern_matches_any_term() -> None:
+    pattern = log_backend.compile_search_pattern("32:153289\n32:153290\n32:1\n18:")
+    assert pattern is not None
+    assert pattern.search("RQ --- 32:199999 18:000730")
+    assert pattern.search("rq --- 18:abc")
+    assert not pattern.search("RQ --- 37:169161 --:------")
+
+    sensitive = log_backend.compile_search_pattern("Error", case_sensitive=True)
+    assert sensitive is not None
+    assert sensitive.search("Error 1")
+    assert not sensitive.search("ERROR 1")
+
+    assert log_backend.compile_search_pattern(" \n\n") is None
+    assert log_backend.compile_search_pattern("a.c").search("abc") is None
+
+
+def test_search_with_context_regex_mode(tmp_path: Path) -> None:
+    path = tmp_path / "home-assistant.log"
+    path.write_text(
+        "RQ 31DA from 32:153289\nI 22F1 from 32:153289\nRP 31DA to 18:000730\n",
+        encoding="utf-8",
+    )
+
+    result = log_backend.search_with_context(
+        path, query="^RQ\n^rp .* 18:", before=0, after=0, regex=True
+    )
+    assert result["match_lines"] == [1, 3]
+
+    with pytest.raises(ValueError):
+        log_backend.search_with_context(path, query="(unclosed", regex=True)
+
+
+@pytest.mark.asyncio
+async def test_ws_log_search_invalid_regex(hass, tmp_path: Path) -> None:
+    base = tmp_path / "home-assistant.log"
+    base.write_text("ERROR first\n", encoding="utf-8")
+    _setup_config_entry(hass, log_path=base)
+
+    conn = _FakeConnection()
+    await ws_log_search(
+        hass,
+        conn,
+        {
+            "id": 1,
+            "type": "ramses_extras/ramses_debugger/log/search",
+            "file_id": base.name,
+            "query": "ERROR (",
+            "regex": True,
+        },
+    )
+
+    assert conn.results == []
+    assert conn.errors[0][:2] == (1, "invalid_query")
+
+
+def _packet_lines(hours: range, per_hour: int = 60) -> list[str]:
+    return [
+        f"2026-01-20T{h:02d}:{m:02d}:00.000000 000 I --- 01:111111 --:------ "
+        f"01:111111 1F09 003 FF0{m % 10}00"
+        for h in hours
+        for m in range(per_hour)
+    ]
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_iter_time_window_bisects_to_window(tmp_path: Path, compressed: bool) -> None:
+    lines = _packet_lines(range(24))
+    content = "".join(f"{line}\n" for line in lines)
+    if compressed:
+        path = tmp_path / "packet_log.log.1.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(content)
+    else:
+        path = tmp_path / "packet_log.log"
+        path.write_text(content, encoding="utf-8")
+
+    window = list(
+        log_backend.iter_time_window(
+            path, since="2026-01-20T13:00", until="2026-01-20T13:59:59.999999"
+        )
+    )
+    assert window == [line for line in lines if line.startswith("2026-01-20T13:")]
+
+    assert list(log_backend.iter_time_window(path, since="2026-01-21")) == []
+    assert (
+        list(log_backend.iter_time_window(path, until="2026-01-20T00:30"))
+        == (lines[:30])
+    )
+    assert log_backend.get_time_bounds(path) == (
+        "2026-01-20T00:00:00.000000",
+        "2026-01-20T23:59:00.000000",
+    )
+
+
+def test_iter_time_window_only_reads_window(tmp_path: Path) -> None:
+    path = tmp_path / "packet_log.log"
+    path.write_text(
+        "".join(f"{line}\n" for line in _packet_lines(range(24))), encoding="utf-8"
+    )
+
+    reads: list[int] = []
+    real_open = Path.open
+
+    def _tracking_open(self: Path, *args: Any, **kwargs: Any) -> Any:
+        f = real_open(self, *args, **kwargs)
+        real_readline = f.readline
+
+        def _readline(*a: Any) -> bytes:
+            line = real_readline(*a)
+            reads.append(len(line))
+            return line
+
+        f.readline = _readline
+        return f
+
+    with patch.object(Path, "open", _tracking_open):
+        window = list(
+            log_backend.iter_time_window(
+                path, since="2026-01-20T05:00", until="2026-01-20T05:09:59"
+            )
+        )
+
+    assert len(window) == 10
+    assert sum(reads) < path.stat().st_size // 10
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_tail_marked_lines_prefilters_bytes(tmp_path: Path, compressed: bool) -> None:
+    lines = [
+        (
+            f"2026-01-20 10:00:{i % 60:02d} DEBUG (MainThread) "
+            f"[ramses_tx.transport] RQ --- 18:00000{i % 2} 32:153289 31DA"
+            if i % 5 == 0
+            else f"2026-01-20 10:00:{i % 60:02d} INFO (MainThread) [other] line {i}"
+        )
+        for i in range(100)
+    ]
+    lines[3] = "2026-01-20 10:00:03 WARNING (MainThread) [RAMSES_CC] 32:153289"
+    content = "".join(f"{line}\n" for line in lines)
+    if compressed:
+        path = tmp_path / "home-assistant.log.1.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(content)
+    else:
+        path = tmp_path / "home-assistant.log"
+        path.write_text(content, encoding="utf-8")
+
+    marked = [line for line in lines if "ramses" in line.lower()]
+    assert log_backend.tail_marked_lines(path).splitlines() == marked
+
+    required = log_backend.tail_marked_lines(path, require=(b"18:000001",))
+    assert required.splitlines() == [line for line in marked if "18:000001" in line]
+
+    window = sum(len(line) + 1 for line in lines[-20:])
+    tail = log_backend.tail_marked_lines(path, max_bytes=window)
+    assert tail.splitlines() == [line for line in lines[-20:] if "ramses" in line]
+
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    assert log_backend.tail_marked_lines(empty) == ""
+
+
 @pytest.mark.asyncio
 async def test_get_configured_packet_log_path_v1_fallback(hass, tmp_path: Path) -> None:
     """Test that v1 ramses_rf.file_name is used as fallback when packet_log
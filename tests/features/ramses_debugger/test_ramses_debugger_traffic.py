@@ -2,16 +2,24 @@
 
 from __future__ import annotations
 
+import random
 from datetime import datetime
 from typing import Any
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from custom_components.ramses_extras.const import DOMAIN
-from custom_components.ramses_extras.features.ramses_debugger import websocket_commands
+from custom_components.ramses_extras.features.ramses_debugger import (
+    traffic_collector,
+    websocket_commands,
+)
 from custom_components.ramses_extras.features.ramses_debugger.traffic_collector import (
+    SNAPSHOT_MAX_EVENTS,
+    SNAPSHOT_SAVE_DELAY_S,
+    SNAPSHOT_STORAGE_KEY,
     TrafficCollector,
+    TrafficStatsView,
 )
 from custom_components.ramses_extras.framework.helpers.ramses_message_stream import (
     get_ramses_message_stream,
@@ -20,6 +28,8 @@ from custom_components.ramses_extras.framework.helpers.ramses_message_stream imp
 ws_traffic_get_stats = websocket_commands.ws_traffic_get_stats.__wrapped__
 ws_traffic_reset_stats = websocket_commands.ws_traffic_reset_stats.__wrapped__
 ws_traffic_subscribe_stats = websocket_commands.ws_traffic_subscribe_stats.__wrapped__
+ws_traffic_get_rates = websocket_commands.ws_traffic_get_rates.__wrapped__
+ws_traffic_get_latency = websocket_commands.ws_traffic_get_latency.__wrapped__
 
 
 class _FakeConnection:
@@ -313,3 +323,340 @@ def test_collector_ingests_direct_client_messages(hass) -> None:
     flow = stats["flows"][0]
     assert flow["src"] == "32:153289"
     assert flow["dst"] == "37:169161"
+
+
+def test_collector_evicts_least_recently_seen_flow(hass) -> None:
+    collector = TrafficCollector(hass)
+    collector.configure(max_flows=3)
+
+    def _ingest(src: str, second: int) -> None:
+        collector._ingest_message(
+            {
+                "src": src,
+                "dst": "--:------",
+                "verb": "I",
+                "code": "1F09",
+                "dtm": f"2026-01-20T12:00:{second:02d}",
+            }
+        )
+
+    for second, src in enumerate(["01:000001", "01:000002", "01:000003"]):
+        _ingest(src, second)
+    _ingest("01:000001", 10)
+    _ingest("01:000004", 11)
+
+    srcs = {f["src"] for f in collector.get_stats()["flows"]}
+    assert srcs == {"01:000001", "01:000003", "01:000004"}
+
+    collector.configure(max_flows=1)
+    assert [f["src"] for f in collector.get_stats()["flows"]] == ["01:000004"]
+
+
+def _apply_stats_event(view: dict[str, Any], event: dict[str, Any]) -> dict[str, Any]:
+    if not event["delta"]:
+        return {(f["src"], f["dst"]): f for f in event["flows"]}
+    for key in event["removed"]:
+        view.pop(tuple(key), None)
+    for flow in event["flows"]:
+        view[(flow["src"], flow["dst"])] = flow
+    return view
+
+
+@pytest.mark.parametrize("limit", [0, 5, 50])
+def test_stats_view_deltas_track_top_flows(hass, limit: int) -> None:
+    rnd = random.Random(limit)
+    collector = TrafficCollector(hass)
+    collector.configure(max_flows=30)
+    view = TrafficStatsView(collector, code="31DA", limit=limit)
+
+    merged = _apply_stats_event({}, view.snapshot())
+    for step in range(3000):
+        collector._ingest_message(
+            {
+                "src": f"01:{rnd.randrange(40):06d}",
+                "dst": rnd.choice(["--:------", "02:000001"]),
+                "verb": "I",
+                "code": rnd.choice(["31DA", "1F09"]),
+                "dtm": f"2026-01-20T12:{step // 60 % 60:02d}:{step % 60:02d}",
+            }
+        )
+        if step == 1500:
+            collector.reset()
+        if rnd.random() < 0.1:
+            event = view.delta()
+            assert event is not None
+            merged = _apply_stats_event(merged, event)
+
+            expected = collector.get_stats(code="31DA", limit=limit)
+            assert event["total_count"] == expected["total_count"]
+            assert len(merged) == len(expected["flows"])
+            counts = sorted((f["count_total"] for f in merged.values()), reverse=True)
+            assert counts == [f["count_total"] for f in expected["flows"]]
+            for flow in merged.values():
+                assert flow == collector._flows[(flow["src"], flow["dst"])].as_dict()
+
+    view.delta()
+    assert view.delta() is None
+
+
+@pytest.mark.asyncio
+async def test_ws_subscribe_stats_delta_mode(hass) -> None:
+    collector = TrafficCollector(hass)
+    hass.data.setdefault(DOMAIN, {})["ramses_debugger"] = {
+        "traffic_collector": collector,
+    }
+    conn = _FakeConnection()
+
+    await ws_traffic_subscribe_stats(
+        hass,
+        conn,
+        {
+            "id": 7,
+            "type": "ramses_extras/ramses_debugger/traffic/subscribe_stats",
+            "throttle_ms": 0,
+            "limit": 200,
+            "delta": True,
+        },
+    )
+    for src in ("01:111111", "01:222222", "01:111111"):
+        collector._ingest_message(
+            {"src": src, "dst": "--:------", "verb": "I", "code": "1F09"}
+        )
+
+    events = [m["event"] for m in conn.messages]
+    assert [e["delta"] for e in events] == [False, True, True, True]
+    assert [len(e["flows"]) for e in events] == [0, 1, 1, 1]
+    assert events[-1]["flows"][0]["count_total"] == 2
+    assert events[-1]["total_count"] == 3
+
+
+async def test_ws_get_rates(hass) -> None:
+    collector = TrafficCollector(hass)
+    collector.configure(max_flows=1)
+    hass.data.setdefault(DOMAIN, {})["ramses_debugger"] = {
+        "traffic_collector": collector,
+    }
+    for src in ("32:111111", "32:111111", "32:222222"):
+        collector._ingest_message(
+            {"src": src, "dst": "--:------", "verb": "I", "code": "31DA"}
+        )
+    conn = _FakeConnection()
+
+    await ws_traffic_get_rates(
+        hass,
+        conn,
+        {
+            "id": 8,
+            "type": "ramses_extras/ramses_debugger/traffic/get_rates",
+            "code": "31DA",
+            "window_minutes": 10,
+        },
+    )
+    (series,) = conn.results[-1][1]["series"]
+    assert series["kind"] == "code"
+    assert sum(series["counts"][-2:]) == 3
+    assert len(series["counts"]) == 10
+
+    # Evicted flows drop their rate series.
+    await ws_traffic_get_rates(
+        hass,
+        conn,
+        {
+            "id": 9,
+            "type": "ramses_extras/ramses_debugger/traffic/get_rates",
+            "src": "32:111111",
+            "dst": "--:------",
+            "window_minutes": 10,
+        },
+    )
+    assert conn.results[-1][1]["series"][0]["total"] == 0
+
+    collector.reset()
+    await ws_traffic_get_rates(
+        hass,
+        conn,
+        {
+            "id": 10,
+            "type": "ramses_extras/ramses_debugger/traffic/get_rates",
+            "window_minutes": 10,
+        },
+    )
+    assert conn.results[-1][1]["series"][0]["total"] == 0
+
+
+def test_collector_reports_inter_arrival_intervals(hass) -> None:
+    collector = TrafficCollector(hass)
+    for minute in range(30):
+        if minute == 20:
+            continue
+        collector._ingest_message(
+            {
+                "src": "32:111111",
+                "dst": "--:------",
+                "verb": "I",
+                "code": "31DA",
+                "dtm": f"2026-01-01T10:{minute:02d}:00.000000",
+            }
+        )
+    collector._ingest_message(
+        {"src": "18:000730", "dst": "32:111111", "verb": "RQ", "code": "31DA"}
+    )
+
+    stats = collector.get_stats(src="32:111111")
+    (intervals,) = stats["intervals"]
+    assert intervals["code"] == "31DA"
+    assert intervals["count"] == 29
+    assert intervals["period_s"] == pytest.approx(60.0, abs=1.0)
+    assert intervals["missed"] == 1
+    assert intervals["last_seen"] == "2026-01-01T10:29:00.000000"
+
+    assert len(collector.get_stats(code="31DA")["intervals"]) == 2
+    collector.reset()
+    assert collector.get_stats()["intervals"] == []
+
+
+async def test_ws_get_latency(hass) -> None:
+    collector = TrafficCollector(hass)
+    hass.data.setdefault(DOMAIN, {})["ramses_debugger"] = {
+        "traffic_collector": collector,
+    }
+    collector._ingest_message(
+        {
+            "src": "18:000730",
+            "dst": "32:111111",
+            "verb": "RQ",
+            "code": "31DA",
+            "payload": "00",
+            "dtm": "2026-01-01T10:00:00.000000",
+        }
+    )
+    collector._ingest_message(
+        {
+            "src": "32:111111",
+            "dst": "18:000730",
+            "verb": "RP",
+            "code": "31DA",
+            "payload": "00EF007FFF",
+            "dtm": "2026-01-01T10:00:00.120000",
+        }
+    )
+    conn = _FakeConnection()
+
+    await ws_traffic_get_latency(
+        hass,
+        conn,
+        {
+            "id": 11,
+            "type": "ramses_extras/ramses_debugger/traffic/get_latency",
+            "device_id": "32:111111",
+        },
+    )
+    (device,) = conn.results[-1][1]["devices"]
+    assert device["code"] == "31DA"
+    assert device["answered"] == 1
+    assert device["rtt_mean_ms"] == 120.0
+
+
+class _FakeStore:
+    """In-memory stand-in for HA's ``Store``, shared per storage key."""
+
+    data: dict[str, Any] = {}
+
+    def __init__(self, hass: Any, version: int, key: str) -> None:
+        self.key = key
+        self.delayed: list[tuple[Any, float]] = []
+
+    async def async_load(self) -> Any:
+        return self.data.get(self.key)
+
+    async def async_save(self, data: Any) -> None:
+        self.delayed.clear()
+        self.data[self.key] = data
+
+    def async_delay_save(self, data_func: Any, delay: float) -> None:
+        self.delayed.append((data_func, delay))
+
+    def fire(self) -> None:
+        data_func, _ = self.delayed.pop()
+        self.data[self.key] = data_func()
+
+
+@pytest.fixture
+def fake_store():
+    _FakeStore.data = {}
+    with patch.object(traffic_collector, "Store", _FakeStore):
+        yield _FakeStore
+
+
+def _collector_message(i: int) -> dict[str, Any]:
+    return {
+        "src": f"32:{i % 3:06d}",
+        "dst": "--:------",
+        "verb": " I",
+        "code": "31DA",
+        "payload": "00EF",
+        "decoded_payload": {"hvac_id": "00"},
+        "dtm": f"2026-01-01T10:00:00.{i:06d}",
+    }
+
+
+async def test_collector_persists_and_restores_snapshot(hass, fake_store) -> None:
+    collector = TrafficCollector(hass, persist=True)
+    collector.configure(buffer_max_global=2000)
+    for i in range(SNAPSHOT_MAX_EVENTS + 50):
+        collector._ingest_message(_collector_message(i))
+
+    # Steady traffic schedules one delayed save rather than restarting it.
+    store = collector._store
+    assert [delay for _, delay in store.delayed] == [SNAPSHOT_SAVE_DELAY_S]
+    store.fire()
+    await collector.async_save()  # nothing changed since: not written again
+    assert SNAPSHOT_STORAGE_KEY in fake_store.data
+
+    restored = TrafficCollector(hass, persist=True)
+    restored._ingest_message(
+        {"src": "32:000000", "dst": "--:------", "verb": " I", "code": "31DA"}
+    )
+    await restored.async_restore()
+    await restored.async_restore()  # only merged once
+
+    stats = restored.get_stats()
+    assert stats["total_count"] == SNAPSHOT_MAX_EVENTS + 51
+    assert [f["count_total"] for f in stats["flows"]] == [351, 350, 350]
+    # The live buffer already had a message, so persisted ones are skipped.
+    assert len(restored.get_buffer_provider()) == 1
+
+    fresh = TrafficCollector(hass, persist=True)
+    await fresh.async_restore()
+    buffer = fresh.get_buffer_provider()
+    assert len(buffer) == SNAPSHOT_MAX_EVENTS
+    events = buffer._store.snapshot(1)
+    assert events[0]["dtm"] == f"2026-01-01T10:00:00.{SNAPSHOT_MAX_EVENTS + 49:06d}"
+    assert events[0]["decoded_payload"] is True
+
+
+async def test_collector_saves_pending_changes_on_demand(hass, fake_store) -> None:
+    collector = TrafficCollector(hass, persist=True)
+    await collector.async_save()  # nothing collected yet: no write
+    assert fake_store.data == {}
+
+    collector._ingest_message(_collector_message(0))
+    await collector.async_save()
+    assert fake_store.data[SNAPSHOT_STORAGE_KEY]["total_count"] == 1
+    assert collector._store.delayed == []
+
+    # The next change schedules a new delayed save.
+    collector._ingest_message(_collector_message(1))
+    assert len(collector._store.delayed) == 1
+
+
+async def test_collector_ignores_unusable_snapshot(hass, fake_store) -> None:
+    collector = TrafficCollector(hass, persist=True)
+    collector._store.async_load = MagicMock(side_effect=ValueError("bad json"))
+    await collector.async_restore()
+    assert collector.get_stats()["total_count"] == 0
+
+    fake_store.data[SNAPSHOT_STORAGE_KEY] = ["not", "a", "dict"]
+    other = TrafficCollector(hass, persist=True)
+    await other.async_restore()
+    assert other.get_stats()["total_count"] == 0
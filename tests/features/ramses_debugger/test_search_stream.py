@@ -0,0 +1,128 @@
+"""Unit tests for the ramses_debugger streaming log search."""
+
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.ramses_extras.const import DOMAIN
+from custom_components.ramses_extras.features.ramses_debugger import (
+    log_backend,
+    websocket_commands,
+)
+from custom_components.ramses_extras.features.ramses_debugger.search_stream import (
+    LogSearchStream,
+    block_to_dict,
+    decode_search_cursor,
+    encode_search_cursor,
+)
+
+ws_log_search_stream = websocket_commands.ws_log_search_stream.__wrapped__
+
+
+def _content() -> str:
+    return "".join(
+        f"ERROR {i}\n" if i % 7 == 0 or i in (15, 16) else f"INFO {i}\n"
+        for i in range(1, 101)
+    )
+
+
+def _collect_pages(path: Path, *, page_blocks: int) -> list[dict[str, Any]]:
+    pattern = log_backend.compile_search_pattern("error")
+    assert pattern is not None
+
+    blocks: list[dict[str, Any]] = []
+    offset = line = 0
+    while True:
+        stream = LogSearchStream(
+            path, pattern=pattern, before=2, after=1, offset=offset, line=line
+        )
+        page = stream.read(max_blocks=page_blocks, max_bytes=10**9)
+        blocks.extend(block_to_dict(b) for b in page)
+        done = stream.done
+        cursor = encode_search_cursor(path.name, *stream.position)
+        stream.close()
+        if done:
+            return blocks
+        _, offset, line = decode_search_cursor(cursor)
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_paged_stream_matches_full_search(tmp_path: Path, compressed: bool) -> None:
+    if compressed:
+        path = tmp_path / "home-assistant.log.1.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(_content())
+    else:
+        path = tmp_path / "home-assistant.log"
+        path.write_text(_content(), encoding="utf-8")
+
+    expected = log_backend.search_with_context(path, query="error", before=2, after=1)
+
+    for page_blocks in (1, 2, 5, 100):
+        assert _collect_pages(path, page_blocks=page_blocks) == expected["blocks"]
+
+
+def test_search_cursor_round_trip_and_validation(tmp_path: Path) -> None:
+    cursor = encode_search_cursor("home-assistant.log", 1234, 56)
+    assert decode_search_cursor(cursor) == ("home-assistant.log", 1234, 56)
+
+    with pytest.raises(ValueError):
+        decode_search_cursor("not-a-cursor")
+
+    path = tmp_path / "home-assistant.log"
+    path.write_text("a\n", encoding="utf-8")
+    pattern = log_backend.compile_search_pattern("a")
+    assert pattern is not None
+    with pytest.raises(ValueError):
+        LogSearchStream(path, pattern=pattern, offset=100, line=1)
+
+
+@pytest.mark.asyncio
+async def test_ws_log_search_stream_pushes_chunks_and_cursor(
+    hass, tmp_path: Path
+) -> None:
+    base = tmp_path / "home-assistant.log"
+    base.write_text(_content(), encoding="utf-8")
+    hass.data.setdefault(DOMAIN, {})["config_entry"] = MagicMock(
+        options={"ramses_debugger_log_path": str(base)}
+    )
+
+    conn = MagicMock()
+    conn.subscriptions = {}
+    events: list[dict[str, Any]] = []
+    conn.send_message = MagicMock(side_effect=lambda m: events.append(m["event"]))
+
+    msg = {
+        "id": 1,
+        "type": "ramses_extras/ramses_debugger/log/search_stream",
+        "file_id": base.name,
+        "query": "ERROR",
+        "before": 2,
+        "after": 1,
+        "page_blocks": 4,
+        "chunk_blocks": 3,
+    }
+    await ws_log_search_stream(hass, conn, msg)
+
+    assert conn.send_result.call_args[0][1]["success"] is True
+    assert 1 in conn.subscriptions
+    assert [len(e["blocks"]) for e in events] == [3, 1, 0]
+    assert events[-1]["done"] is True
+    assert events[-1]["cursor"]
+
+    await ws_log_search_stream(
+        hass, conn, {**msg, "id": 2, "page_blocks": 100, "cursor": events[-1]["cursor"]}
+    )
+
+    expected = log_backend.search_with_context(base, query="error", before=2, after=1)
+    streamed = [b for e in events for b in e["blocks"]]
+    assert streamed == expected["blocks"]
+    assert events[-1]["cursor"] is None
+
+    await ws_log_search_stream(hass, conn, {**msg, "id": 3, "cursor": "garbage"})
+    assert conn.send_error.call_args[0][:2] == (3, "invalid_cursor")
@@ -0,0 +1,55 @@
+"""Unit tests for ramses_debugger inter-arrival statistics."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from custom_components.ramses_extras.features.ramses_debugger.traffic_intervals import (  # noqa: E501
+    InterArrivalStats,
+    P2Quantile,
+)
+
+
+@pytest.mark.parametrize("p", [0.5, 0.95])
+def test_p2_quantile_tracks_exact_quantile(p: float) -> None:
+    rng = random.Random(17)
+    values = [rng.gauss(60.0, 5.0) for _ in range(5000)]
+    estimator = P2Quantile(p)
+    for value in values:
+        estimator.add(value)
+
+    exact = sorted(values)[int(p * (len(values) - 1))]
+    assert estimator.value() == pytest.approx(exact, abs=0.5)
+    assert len(estimator._q) == 5
+
+
+def test_p2_quantile_small_samples() -> None:
+    estimator = P2Quantile(0.5)
+    assert estimator.value() is None
+    for value in (3.0, 1.0, 2.0):
+        estimator.add(value)
+    assert estimator.value() == 2.0
+
+
+def test_inter_arrival_infers_period_and_missed_intervals() -> None:
+    rng = random.Random(3)
+    stats = InterArrivalStats()
+    ts = 0.0
+    for i in range(200):
+        # Every 10th announcement is lost; a retransmit arrives 0.2 s later.
+        ts += 60.0 + rng.uniform(-2.0, 2.0)
+        if i % 10 == 9:
+            continue
+        stats.add(ts)
+        if i % 50 == 0:
+            stats.add(ts + 0.2)
+
+    out = stats.as_dict()
+    assert out["count"] == 184
+    assert out["period_s"] == pytest.approx(60.0, abs=1.0)
+    assert out["ewma_gap_s"] == pytest.approx(60.0, abs=2.0)
+    assert 0 < out["jitter_s"] < 2.0
+    assert out["p95_gap_s"] > 100.0
+    assert out["missed"] == 19
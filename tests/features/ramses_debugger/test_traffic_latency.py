@@ -0,0 +1,82 @@
+"""Unit tests for ramses_debugger request/reply latency tracking."""
+
+from __future__ import annotations
+
+from custom_components.ramses_extras.features.ramses_debugger import traffic_latency
+from custom_components.ramses_extras.features.ramses_debugger.traffic_latency import (
+    LatencyTracker,
+)
+
+GW = "18:000730"
+FAN = "32:111111"
+CTL = "01:222222"
+
+
+def _device(out: dict, device_id: str, code: str) -> dict:
+    return next(
+        d for d in out["devices"] if d["device_id"] == device_id and d["code"] == code
+    )
+
+
+def test_latency_matches_replies_by_pair_code_and_context() -> None:
+    tracker = LatencyTracker()
+    add = tracker.add
+    add(src=GW, dst=FAN, verb="RQ", code="31DA", payload="00", ts=100.0)
+    add(src=GW, dst=FAN, verb="RQ", code="31DA", payload="00", ts=100.2)  # retry
+    add(src=GW, dst=CTL, verb="RQ", code="30C9", payload="01", ts=100.3)
+    add(src=GW, dst=CTL, verb="RQ", code="30C9", payload="02", ts=100.4)
+    # A reply from another device or for another code does not match.
+    add(src=CTL, dst=GW, verb="RP", code="31DA", payload="00AA", ts=100.5)
+    add(src=FAN, dst=GW, verb="RP", code="31DA", payload="00EF", ts=100.58)
+    add(src=CTL, dst=GW, verb="RP", code="30C9", payload="02078A", ts=100.45)
+    add(src=CTL, dst=GW, verb="RP", code="30C9", payload="0107D0", ts=101.3)
+    add(src=GW, dst=FAN, verb=" W", code="22F1", payload="000304", ts=102.0)
+    add(src=FAN, dst=GW, verb=" I", code="22F1", payload="000304", ts=102.03)
+
+    out = tracker.get_latency()
+    assert out["pending"] == 0
+    fan = _device(out, FAN, "31DA")
+    assert (fan["requests"], fan["retries"], fan["answered"]) == (1, 1, 1)
+    assert fan["rtt_min_ms"] == 580.0
+    ctl = _device(out, CTL, "30C9")
+    assert ctl["answered"] == 2
+    assert (ctl["rtt_min_ms"], ctl["rtt_max_ms"]) == (50.0, 1000.0)
+    assert ctl["histogram"][1] == 1  # 25-50 ms
+    assert ctl["histogram"][5] == 1  # 500-1000 ms
+    assert _device(out, FAN, "22F1")["rtt_mean_ms"] == 30.0
+    assert tracker.get_latency(device_id=CTL, code="31DA")["devices"] == []
+
+
+def test_latency_counts_unanswered_after_timeout() -> None:
+    tracker = LatencyTracker(timeout_s=3.0)
+    tracker.add(src=GW, dst=FAN, verb="RQ", code="10E0", payload="00", ts=10.0)
+    tracker.add(src=CTL, dst="--:------", verb="I", code="1F09", payload="", ts=12.0)
+    assert tracker.get_latency()["pending"] == 1
+
+    tracker.add(src=CTL, dst="--:------", verb="I", code="1F09", payload="", ts=13.5)
+    # A late reply is no longer matched.
+    tracker.add(src=FAN, dst=GW, verb="RP", code="10E0", payload="00", ts=13.6)
+
+    out = tracker.get_latency()
+    assert out["pending"] == 0
+    fan = _device(out, FAN, "10E0")
+    assert (fan["requests"], fan["answered"], fan["unanswered"]) == (1, 0, 1)
+    assert fan["rtt_mean_ms"] is None
+
+    tracker.reset()
+    assert tracker.get_latency()["devices"] == []
+
+
+def test_latency_state_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(traffic_latency, "_MAX_PENDING", 10)
+    monkeypatch.setattr(traffic_latency, "_MAX_DEVICE_STATS", 20)
+    tracker = LatencyTracker()
+    for i in range(100):
+        tracker.add(
+            src=GW, dst=f"04:{i:06d}", verb="RQ", code="30C9", payload="00", ts=1.0
+        )
+
+    out = tracker.get_latency(limit=1000)
+    assert out["pending"] == 10
+    assert out["dropped"] == 90
+    assert len(out["devices"]) == 20
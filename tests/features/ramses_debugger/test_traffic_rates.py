@@ -0,0 +1,90 @@
+"""Unit tests for ramses_debugger rolling traffic rates."""
+
+from __future__ import annotations
+
+from custom_components.ramses_extras.features.ramses_debugger.traffic_rates import (
+    WINDOW_BUCKETS,
+    RateSeries,
+    TrafficRates,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _series(rates: dict, kind: str, key: object) -> dict:
+    return next(s for s in rates["series"] if s["kind"] == kind and s["key"] == key)
+
+
+def test_rates_bucket_per_minute_and_window() -> None:
+    clock = _Clock()
+    rates = TrafficRates(clock)
+    for minute in range(10):
+        for _ in range(minute + 1):
+            rates.add(code="31DA", verb="I", flow=("32:1", "--:-"))
+        rates.add(code="22F1", verb="RQ", flow=None)
+        clock.now += 60
+
+    clock.now -= 60
+    out = rates.get_rates(code="31DA", window_minutes=5)
+    assert out["window_minutes"] == 5
+    assert out["bucket_seconds"] == 60
+    (series,) = out["series"]
+    assert series["counts"] == [6, 7, 8, 9, 10]
+    assert series["total"] == 40
+    assert series["per_minute"] == 8.0
+
+    out = rates.get_rates(window_minutes=3)
+    assert _series(out, "all", None)["counts"] == [9, 10, 11]
+    assert _series(out, "verb", "RQ")["counts"] == [1, 1, 1]
+    assert _series(out, "code", "22F1")["total"] == 3
+
+    flow = rates.get_rates(flow=("32:1", "--:-"), window_minutes=2)["series"][0]
+    assert flow["key"] == ["32:1", "--:-"]
+    assert flow["counts"] == [9, 10]
+
+    missing = rates.get_rates(code="1234", window_minutes=4)["series"][0]
+    assert missing["counts"] == [0, 0, 0, 0]
+
+
+def test_rates_expire_and_memory_stays_bounded() -> None:
+    clock = _Clock()
+    rates = TrafficRates(clock)
+    rates.add(code="0001", verb="W", flow=("01:1", "02:2"))
+
+    # Three days of traffic, one message per minute on another code.
+    for _ in range(3 * WINDOW_BUCKETS):
+        clock.now += 60
+        rates.add(code="31DA", verb="I", flow=None)
+
+    # Idle series are swept; active ones keep at most one day of minutes.
+    assert ("code", "0001") not in rates._series
+    assert ("flow", ("01:1", "02:2")) not in rates._series
+    assert all(len(s) <= WINDOW_BUCKETS for s in rates._series.values())
+    assert all(len(s._minutes) <= 2 * WINDOW_BUCKETS for s in rates._series.values())
+
+    out = rates.get_rates(code="31DA", window_minutes=WINDOW_BUCKETS)
+    assert out["series"][0]["total"] == WINDOW_BUCKETS
+    assert rates.get_rates(code="0001", window_minutes=5000)["window_minutes"] == (
+        WINDOW_BUCKETS
+    )
+
+    rates.drop_flow(("01:1", "02:2"))
+    rates.reset()
+    assert rates.get_rates()["series"][0]["total"] == 0
+
+
+def test_rate_series_last_minute() -> None:
+    series = RateSeries()
+    assert series.last_minute is None
+    series.add(5)
+    series.add(5)
+    series.add(7)
+    assert series.last_minute == 7
+    series.trim(8)
+    assert series.last_minute is None
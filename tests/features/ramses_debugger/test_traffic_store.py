@@ -0,0 +1,230 @@
+"""Unit tests for the ramses_debugger indexed traffic store."""
+
+from __future__ import annotations
+
+import random
+import sys
+from collections import deque
+from typing import Any
+from unittest.mock import MagicMock
+
+from custom_components.ramses_extras.features.ramses_debugger.traffic_store import (
+    TrafficStore,
+    event_dtm,
+)
+from custom_components.ramses_extras.framework.helpers.ramses_message_stream import (
+    RamsesStreamMessage,
+)
+
+
+def _event(i: int, *, src: str | None = None, code: str | None = None) -> dict:
+    return {
+        "dtm": f"2026-01-20T{i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000000",
+        "src": src or f"01:00000{i % 3}",
+        "dst": "--:------",
+        "verb": "RQ" if i % 2 else "I",
+        "code": code or ("31DA" if i % 4 else "1F09"),
+    }
+
+
+def _brute(events: list[dict[str, Any]], **filters: Any) -> list[dict[str, Any]]:
+    since = filters.pop("since", None)
+    until = filters.pop("until", None)
+    limit = filters.pop("limit", 200)
+    out = []
+    for event in events:
+        if any(v and event.get(k) != v for k, v in filters.items()):
+            continue
+        dtm = event_dtm(event)
+        if since and (dtm is None or dtm < since):
+            continue
+        if until and (dtm is None or dtm > until):
+            continue
+        out.append(event)
+        if len(out) >= limit:
+            break
+    return out
+
+
+def test_store_evicts_oldest_and_prunes_indexes() -> None:
+    store = TrafficStore(max_size=10)
+    for i in range(25):
+        store.append(_event(i, src="18:999999" if i == 0 else None))
+
+    assert len(store) == 10
+    assert [e["dtm"][-9:-7] for e in store.events()] == [
+        f"{i:02d}" for i in range(15, 25)
+    ]
+    assert store.query(src="18:999999") == []
+    assert "18:999999" not in store._symbol_ids
+    assert sum(len(seqs) for seqs in store._indexes["src"].values()) == 10
+    assert all(
+        seqs.first() >= store._head
+        for index in store._indexes.values()
+        for seqs in index.values()
+    )
+
+    store.resize(4)
+    assert [e["dtm"][-9:-7] for e in store.events()] == ["21", "22", "23", "24"]
+
+
+def test_store_query_matches_linear_scan() -> None:
+    rnd = random.Random(7)
+    store = TrafficStore(max_size=200)
+    events: list[dict[str, Any]] = []
+    for i in range(1000):
+        event = _event(i)
+        if rnd.random() < 0.05:
+            # Slightly out-of-order and undated events.
+            event["dtm"] = _event(max(0, i - 5))["dtm"]
+        if rnd.random() < 0.02:
+            del event["dtm"]
+        events.append(event)
+        store.append(event)
+
+        if i % 50 == 49:
+            retained = events[-200:]
+            for _ in range(20):
+                filters = {
+                    "src": rnd.choice([None, "01:000000", "01:000002"]),
+                    "verb": rnd.choice([None, "RQ", "I"]),
+                    "code": rnd.choice([None, "31DA", "1F09", "0000"]),
+                    "since": rnd.choice([None, _event(i - rnd.randrange(250))["dtm"]]),
+                    "until": rnd.choice([None, _event(i - rnd.randrange(250))["dtm"]]),
+                    "limit": rnd.choice([1, 7, 500]),
+                }
+                assert store.query(**filters) == _brute(retained, **filters)
+
+
+def test_store_query_visits_only_matching_index() -> None:
+    store = TrafficStore(max_size=10_000)
+    for i in range(10_000):
+        store.append(_event(i, code="10E0" if i % 1000 == 0 else "31DA"))
+
+    visited: list[int] = []
+
+    class _Tracking(list):
+        def __getitem__(self, slot):
+            visited.append(slot)
+            return super().__getitem__(slot)
+
+    store._fields["code"] = _Tracking(store._fields["code"])
+    store._flags = _Tracking(store._flags)
+
+    assert len(store.query(code="10E0", limit=100)) == 10
+    assert sorted(set(visited)) == list(range(0, 10_000, 1000))
+
+    visited.clear()
+    since = _event(9_990)["dtm"]
+    assert len(store.query(since=since, limit=100)) == 10
+    assert sorted(set(visited)) == list(range(9_990, 10_000))
+
+
+def test_store_round_trips_events_without_decoded_payloads() -> None:
+    store = TrafficStore(max_size=5)
+    frame = "... RQ --- 32:153289 37:169161 --:------ 31DA 001 00"
+    live = {
+        "src": "32:153289",
+        "dst": "37:169161",
+        "verb": "RQ",
+        "code": "31DA",
+        "frame": frame,
+        "packet": frame,
+        "payload": "00",
+        "decoded_payload": {"fan_mode": "00"},
+        "dtm": "2026-01-20T10:00:00.123456",
+    }
+    odd = {
+        "src": "32:153289",
+        "dst": None,
+        "verb": "I",
+        "code": "1F09",
+        "payload": {"already": "decoded"},
+        "time_fired": "2026-01-20T10:00:01+00:00",
+        "extra": [1, 2],
+    }
+    store.append(live)
+    store.append(odd)
+
+    assert list(store.events()) == [{**live, "decoded_payload": None}, odd]
+    assert store.snapshot(1) == [odd]
+    assert store.snapshot(2)[0]["decoded_payload"] is True
+    assert store._frames.count(frame) == 1
+    assert store._symbol_ids.keys() == {
+        "32:153289",
+        "37:169161",
+        "RQ",
+        "I",
+        "31DA",
+        "1F09",
+    }
+
+    store.resize(1)
+    assert list(store.events()) == [odd]
+    assert store._symbol_ids.keys() == {"32:153289", "I", "1F09"}
+    assert store.query(until="2026-01-20T10:00:01+00:00") == [odd]
+
+
+def test_store_keeps_pending_stream_decode_without_running_it() -> None:
+    store = TrafficStore(max_size=5)
+    event = RamsesStreamMessage(_event(0), payload="00")
+    stream_decoder = MagicMock(return_value={"fan_mode": "00"})
+    event.set_decoder(stream_decoder)
+
+    store.append(event)
+
+    stream_decoder.assert_not_called()
+    assert list(store.events())[0]["decoded_payload"] is None
+    store.resize(2)
+    assert store.snapshot(1)[0]["decoded_payload"] is True
+
+
+def test_store_uses_less_memory_than_event_dicts() -> None:
+    events = [_event(i) for i in range(2000)]
+    for i, event in enumerate(events):
+        frame = (
+            f"... {event['verb']:>2} --- {event['src']} {event['dst']} "
+            f"{event['src']} {event['code']} 003 0000{i % 256:02X}"
+        )
+        event.update(
+            frame=frame,
+            packet=frame,
+            payload=f"0000{i % 256:02X}",
+            decoded_payload={"temperature": 20.5, "setpoint": i / 10},
+        )
+        event["dtm"] = _event(i)["dtm"]
+
+    def _size(obj: Any, seen: set[int]) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            size += sum(_size(k, seen) + _size(v, seen) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, deque)):
+            size += sum(_size(v, seen) for v in obj)
+        elif hasattr(obj, "_seqs"):
+            size += _size(obj._seqs, seen)
+        return size
+
+    store = TrafficStore(max_size=len(events))
+    for event in events:
+        store.append(event)
+    retained = _size([dict(e) for e in events], set())
+    columnar = _size(
+        [
+            store._fields,
+            *store._fields.values(),
+            store._ts,
+            store._times,
+            store._flags,
+            store._frames,
+            store._extras,
+            store._symbols,
+            store._symbol_ids,
+            store._indexes,
+            *store._indexes.values(),
+        ],
+        set(),
+    )
+    assert columnar * 3 < retained
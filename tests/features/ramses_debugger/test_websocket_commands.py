@@ -13,6 +13,9 @@ from custom_components.ramses_extras.features.ramses_debugger.const import DOMAI
 from custom_components.ramses_extras.features.ramses_debugger.const import (
     DOMAIN as RAMSES_DEBUGGER_DOMAIN,
 )
+from custom_components.ramses_extras.framework.helpers.ramses_decode_cache import (
+    get_decode_cache,
+)
 
 # Unwrap decorator for testing (same approach as other features)
 ws_messages_get_messages = websocket_commands.ws_messages_get_messages.__wrapped__
@@ -22,6 +25,7 @@ ws_traffic_subscribe_stats = websocket_commands.ws_traffic_subscribe_stats.__wra
 ws_log_list_files = websocket_commands.ws_log_list_files.__wrapped__
 ws_packet_log_list_files = websocket_commands.ws_packet_log_list_files.__wrapped__
 ws_packet_log_get_messages = websocket_commands.ws_packet_log_get_messages.__wrapped__
+ws_packet_log_subscribe = websocket_commands.ws_packet_log_subscribe.__wrapped__
 ws_log_get_tail = websocket_commands.ws_log_get_tail.__wrapped__
 ws_log_search = websocket_commands.ws_log_search.__wrapped__
 ws_cache_get_stats = websocket_commands.ws_cache_get_stats.__wrapped__
@@ -282,9 +286,10 @@ class TestWsGetMessages:
             }
         ]
 
+        hass.async_add_executor_job.side_effect = lambda fn, *args: fn(*args)
         with patch(
-            "custom_components.ramses_extras.features.ramses_debugger.messages_provider.decode_message_with_ramses_rf",
-            return_value={"decoded": True},
+            "custom_components.ramses_extras.features.ramses_debugger.messages_provider.decode_messages_with_ramses_rf",
+            side_effect=lambda msgs: [{"decoded": True} for _ in msgs],
         ):
             await ws_messages_get_messages(
                 hass,
@@ -367,30 +372,26 @@ class TestWsTrafficGetStats:
             assert error_args[1] == "collector_not_ready"
 
     @pytest.mark.asyncio
-    async def test_traffic_get_stats_log_sources(self, hass, conn):
+    async def test_traffic_get_stats_log_sources(self, hass, conn, tmp_path):
         """Test traffic stats for log sources."""
+        log_path = tmp_path / "home-assistant.log"
+        log_path.write_text(
+            "2026-01-20 10:00:00.000 DEBUG (MainThread) [ramses_cc] "
+            '{"src": "32:153289", "dst": "37:169161", "verb": "RQ", '
+            '"code": "31DA", "payload": "00"}\n'
+            "2026-01-20 10:00:01.000 INFO (MainThread) [other] unrelated\n"
+        )
+        hass.async_add_executor_job.side_effect = lambda fn, *args: fn(*args)
         with (
             patch(
                 "custom_components.ramses_extras.features.ramses_debugger.websocket_commands._get_traffic_collector",
                 return_value=MagicMock(),
             ),
-            patch(
-                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.get_messages_from_sources"
-            ) as mock_get_messages,
             patch(
                 "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.get_configured_log_path"
             ) as mock_get_log_path,
         ):
-            mock_get_messages.return_value = [
-                {
-                    "src": "32:153289",
-                    "dst": "37:169161",
-                    "dtm": "2026-01-20T10:00:00",
-                    "code": "31DA",
-                    "verb": "RQ",
-                }
-            ]
-            mock_get_log_path.return_value = "/config/home-assistant.log"
+            mock_get_log_path.return_value = log_path
 
             await ws_traffic_get_stats(
                 hass,
@@ -407,7 +408,7 @@ class TestWsTrafficGetStats:
                 "test-id",
                 _with_version(
                     {
-                        "started_at": "2026-01-20T10:00:00",
+                        "started_at": "2026-01-20 10:00:00.000",
                         "total_count": 1,
                         "by_code": {"31DA": 1},
                         "by_verb": {"RQ": 1},
@@ -416,7 +417,7 @@ class TestWsTrafficGetStats:
                                 "src": "32:153289",
                                 "dst": "37:169161",
                                 "count_total": 1,
-                                "last_seen": "2026-01-20T10:00:00",
+                                "last_seen": "2026-01-20 10:00:00.000",
                                 "verbs": {"RQ": 1},
                                 "codes": {"31DA": 1},
                             }
@@ -426,30 +427,27 @@ class TestWsTrafficGetStats:
             )
 
     @pytest.mark.asyncio
-    async def test_traffic_get_stats_packet_log(self, hass, conn):
-        """Test traffic stats for packet_log source (covers lines 171, 184)."""
+    async def test_traffic_get_stats_packet_log(self, hass, conn, tmp_path):
+        """Test traffic stats for packet_log source cover the whole file."""
+        log_path = tmp_path / "packet.log"
+        with log_path.open("w") as f:
+            for i in range(25_000):
+                src = "32:153289" if i % 5 else "18:000730"
+                f.write(
+                    f"2026-01-20T10:00:00.{i:06d} 000 RQ --- {src} 37:169161 "
+                    "--:------ 31DA 001 00\n"
+                )
+        hass.async_add_executor_job.side_effect = lambda fn, *args: fn(*args)
         with (
             patch(
                 "custom_components.ramses_extras.features.ramses_debugger.websocket_commands._get_traffic_collector",
                 return_value=MagicMock(),
             ),
-            patch(
-                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.get_messages_from_sources"
-            ) as mock_get_messages,
             patch(
                 "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.get_configured_packet_log_path"
             ) as mock_get_packet_log_path,
         ):
-            mock_get_messages.return_value = [
-                {
-                    "src": "32:153289",
-                    "dst": "37:169161",
-                    "dtm": "2026-01-20T10:00:00",
-                    "code": "31DA",
-                    "verb": "RQ",
-                }
-            ]
-            mock_get_packet_log_path.return_value = "/config/packet.log"
+            mock_get_packet_log_path.return_value = log_path
 
             await ws_traffic_get_stats(
                 hass,
@@ -458,12 +456,14 @@ class TestWsTrafficGetStats:
                     "id": "test-id",
                     "type": "ramses_extras/ramses_debugger/traffic/get_stats",
                     "traffic_source": "packet_log",
+                    "device_id": "32:153289",
                     "limit": 50,
                 },
             )
 
-            conn.send_result.assert_called_once()
-            mock_get_messages.assert_called_once()
+            stats = conn.send_result.call_args[0][1]
+            assert stats["total_count"] == 20_000
+            assert [f["src"] for f in stats["flows"]] == ["32:153289"]
             mock_get_packet_log_path.assert_called_once()
 
 
@@ -786,6 +786,56 @@ class TestWsLogSearch:
                 ),
             )
 
+    @pytest.mark.asyncio
+    async def test_log_search_include_rotated(self, hass, conn):
+        """Test log search across the base log and its rotated siblings."""
+        base = Path("/config/logs/home-assistant.log")
+        rotated = Path("/config/logs/home-assistant.log.1.gz")
+        mock_result = {"matches": 2, "files": [base.name, rotated.name]}
+
+        hass.async_add_executor_job.reset_mock()
+        hass.async_add_executor_job.side_effect = [
+            base,
+            [SimpleNamespace(path=base), SimpleNamespace(path=rotated)],
+        ]
+
+        with (
+            patch(
+                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.async_search_files_with_context",
+                AsyncMock(return_value=mock_result),
+            ) as search,
+            patch(
+                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.get_configured_log_path",
+                return_value="/config/logs",
+            ),
+            patch(
+                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands._get_cache",
+                return_value=None,
+            ),
+            patch(
+                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands._file_state",
+                return_value=None,
+            ),
+        ):
+            await ws_log_search(
+                hass,
+                conn,
+                {
+                    "id": "test-id",
+                    "type": "ramses_extras/ramses_debugger/log/search",
+                    "file_id": "home-assistant.log",
+                    "query": "error",
+                    "include_rotated": True,
+                },
+            )
+
+            search.assert_awaited_once()
+            assert search.call_args.args == (hass, [base, rotated])
+            conn.send_result.assert_called_once_with(
+                "test-id",
+                _with_version({"file_id": "home-assistant.log", **mock_result}),
+            )
+
     @pytest.mark.asyncio
     async def test_log_search_invalid_query(self, hass, conn):
         """Test log search with invalid query."""
@@ -855,6 +905,7 @@ class TestWsCacheGetStats:
                     {
                         "available": True,
                         "stats": {"entries": 10, "max_entries": 256},
+                        "decode_cache": get_decode_cache().stats(),
                     }
                 ),
             )
@@ -881,6 +932,7 @@ class TestWsCacheGetStats:
                     {
                         "available": False,
                         "stats": None,
+                        "decode_cache": get_decode_cache().stats(),
                     }
                 ),
             )
@@ -1050,6 +1102,71 @@ class TestWsPacketLogGetMessages:
                 ]
 
 
+class TestWsPacketLogSubscribe:
+    """Test ws_packet_log_subscribe websocket command."""
+
+    @pytest.mark.asyncio
+    async def test_packet_log_subscribe_not_ready(self, hass, conn):
+        """Test subscription without an active follower."""
+        await ws_packet_log_subscribe(
+            hass,
+            conn,
+            {
+                "id": "test-id",
+                "type": "ramses_extras/ramses_debugger/packet_log/subscribe",
+            },
+        )
+
+        conn.send_error.assert_called_once()
+        assert conn.send_error.call_args[0][1] == "follower_not_ready"
+
+    @pytest.mark.asyncio
+    async def test_packet_log_subscribe_pushes_filtered_lines(self, hass, conn):
+        """Test appended packet log lines are pushed through the filters."""
+        mock_follower = MagicMock()
+        mock_unsub = MagicMock()
+        mock_follower.subscribe.return_value = mock_unsub
+
+        with (
+            patch(
+                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.get_packet_log_follower",
+                return_value=mock_follower,
+            ),
+            patch(
+                "custom_components.ramses_extras.features.ramses_debugger.websocket_commands.websocket_api"
+            ) as mock_ws_api,
+        ):
+            mock_ws_api.event_message.side_effect = lambda msg_id, data: data
+
+            await ws_packet_log_subscribe(
+                hass,
+                conn,
+                {
+                    "id": "test-id",
+                    "type": "ramses_extras/ramses_debugger/packet_log/subscribe",
+                    "code": "31DA",
+                },
+            )
+
+            assert conn.subscriptions["test-id"] == mock_unsub
+            conn.send_result.assert_called_once_with(
+                "test-id", _with_version({"success": True})
+            )
+
+            callback = mock_follower.subscribe.call_args[0][0]
+            callback(
+                [
+                    SimpleNamespace(src="32:153289", dst="37:169161", code="31DA"),
+                    SimpleNamespace(src="32:153289", dst="37:169161", code="22F1"),
+                ]
+            )
+            callback([SimpleNamespace(src="01:111111", dst="--:------", code="1F09")])
+
+            conn.send_message.assert_called_once_with(
+                {"messages": [{"src": "32:153289", "dst": "37:169161", "code": "31DA"}]}
+            )
+
+
 class TestWsLogGetLines:
     """Test ws_log_get_lines websocket command."""
 
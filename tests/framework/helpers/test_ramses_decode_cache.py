@@ -0,0 +1,79 @@
+"""Tests for the shared ramses_rf decode cache."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from custom_components.ramses_extras.framework.helpers.ramses_decode_cache import (
+    DecodeCache,
+    decode_key,
+)
+
+
+def test_decode_key_normalizes_verb_code_and_payload() -> None:
+    assert decode_key(" I", "31da", "00ab", "32:1", "--:------") == decode_key(
+        "I", "31DA", "00AB", "32:1", "--:------"
+    )
+    assert decode_key("I", "31DA", "00", "32:1") != decode_key(
+        "I", "31DA", "00", "32:2"
+    )
+
+
+def test_get_or_decode_decodes_once() -> None:
+    cache = DecodeCache()
+    decode = MagicMock(return_value={"fan_mode": "00"})
+    key = decode_key("I", "31DA", "00EF")
+
+    assert cache.get_or_decode(key, decode) == {"fan_mode": "00"}
+    assert cache.get_or_decode(key, decode) == {"fan_mode": "00"}
+
+    decode.assert_called_once()
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_failed_decodes_are_not_cached() -> None:
+    cache = DecodeCache()
+    decode = MagicMock(return_value=None)
+    key = decode_key("RQ", "1298", "")
+
+    assert cache.get_or_decode(key, decode) is None
+    assert cache.get_or_decode(key, decode) is None
+
+    assert decode.call_count == 2
+    assert len(cache) == 0
+
+
+def test_lru_eviction_keeps_recently_used_entries() -> None:
+    cache = DecodeCache(max_entries=2)
+    keys = [decode_key("I", "1298", f"00{i:02X}") for i in range(3)]
+
+    cache.get_or_decode(keys[0], lambda: 0)
+    cache.get_or_decode(keys[1], lambda: 1)
+    cache.get_or_decode(keys[0], lambda: -1)  # touch: keys[1] is now oldest
+    cache.get_or_decode(keys[2], lambda: 2)
+
+    assert cache.get_or_decode(keys[0], lambda: -1) == 0
+    assert cache.get_or_decode(keys[1], lambda: 11) == 11
+    assert cache.stats()["evictions"] == 2
+
+
+def test_clear_resets_entries_and_counters() -> None:
+    cache = DecodeCache()
+    key = decode_key("I", "31DA", "00")
+    cache.get_or_decode(key, dict)
+    cache.get_or_decode(key, dict)
+
+    cache.clear()
+
+    assert cache.stats() == {
+        "entries": 0,
+        "max_entries": cache.max_entries,
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "hit_rate": None,
+    }
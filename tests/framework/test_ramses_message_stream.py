@@ -1,16 +1,48 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 from types import SimpleNamespace
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from custom_components.ramses_extras.framework.helpers.ramses_decode_cache import (
+    DecodeCache,
+)
 from custom_components.ramses_extras.framework.helpers.ramses_message_stream import (
+    MessageBatcher,
     RamsesMessageStream,
+    RamsesStreamMessage,
+)
+
+_STREAM_MODULE = (
+    "custom_components.ramses_extras.framework.helpers.ramses_message_stream"
 )
 
 
+def _broadcast_msg(payload: str) -> MagicMock:
+    pkt = MagicMock()
+    pkt.payload = payload
+    pkt.__str__.return_value = (
+        f"000  I --- 32:150000 --:------ 32:150000 31DA 003 {payload}"
+    )
+    msg = MagicMock()
+    msg._pkt = pkt
+    return msg
+
+
+def _decoded_message() -> MagicMock:
+    decoded = MagicMock()
+    decoded.src.id = "32:150000"
+    decoded.dst.id = "--:------"
+    decoded.verb = " I"
+    decoded.code = "31DA"
+    decoded.payload = {"fan_info": "auto"}
+    return decoded
+
+
 class TestRamsesMessageStream:
     def test_handle_msg_includes_frame(self) -> None:
         hass = MagicMock()
@@ -102,6 +134,69 @@ class TestRamsesMessageStream:
         assert data["dtm"] == "2026-04-18T09:00:00.000000"
         assert data["dst"] == "37:170000"
 
+    def test_handle_msg_decodes_repeated_frames_once(self) -> None:
+        """Identical frames reuse the shared decode cache."""
+        hass = MagicMock()
+        stream = RamsesMessageStream(hass)
+        callback = MagicMock()
+        stream.subscribe(callback)
+        message_cls = MagicMock(return_value=_decoded_message())
+        cache = DecodeCache()
+
+        with (
+            patch(f"{_STREAM_MODULE}.Message", message_cls),
+            patch(f"{_STREAM_MODULE}.get_decode_cache", return_value=cache),
+        ):
+            for payload in ("00EF00", "00EF00", "00EF01"):
+                stream._handle_msg(_broadcast_msg(payload))
+            first, second, third = (c.args[0] for c in callback.call_args_list)
+            assert first["decoded_payload"] == {"fan_info": "auto"}
+            assert second["decoded_payload"] is first["decoded_payload"]
+            assert "decoded_payload" in third
+
+        assert message_cls.call_count == 2
+        assert cache.stats()["hits"] == 1
+        assert second["payload"] == "00EF00"
+
+    def test_handle_msg_defers_decoding_until_read(self) -> None:
+        """Nothing is decoded unless a subscriber reads decoded_payload."""
+        hass = MagicMock()
+        stream = RamsesMessageStream(hass)
+        seen: list[dict] = []
+        stream.subscribe(seen.append)
+        stream.subscribe(lambda data: data.get("code"))
+        message_cls = MagicMock(return_value=_decoded_message())
+
+        with (
+            patch(f"{_STREAM_MODULE}.Message", message_cls),
+            patch(f"{_STREAM_MODULE}.get_decode_cache", return_value=DecodeCache()),
+        ):
+            stream._handle_msg(_broadcast_msg("00EF00"))
+            data = seen[0]
+            assert isinstance(data, RamsesStreamMessage)
+            assert data.decode_pending
+            assert "decoded_payload" not in dict(data)
+            message_cls.assert_not_called()
+
+            assert data.get("decoded_payload") == {"fan_info": "auto"}
+            assert data["decoded_payload"] == {"fan_info": "auto"}
+
+        message_cls.assert_called_once()
+        assert not data.decode_pending
+        assert dict(data)["decoded_payload"] == {"fan_info": "auto"}
+
+    def test_stream_message_without_decode_result(self) -> None:
+        """A failed decode leaves decoded_payload absent."""
+        data = RamsesStreamMessage(payload="00")
+        decoder = MagicMock(return_value=None)
+        data.set_decoder(decoder)
+
+        assert data.get("decoded_payload") is None
+        assert "decoded_payload" not in data
+        with pytest.raises(KeyError):
+            data["decoded_payload"]
+        decoder.assert_called_once_with(data)
+
     @pytest.mark.asyncio
     async def test_attach_client_listener_retries_until_available(self) -> None:
         """Listener attachment should retry while coordinator/client initializes."""
@@ -185,6 +280,76 @@ class TestRamsesMessageStream:
         callback1.assert_called_once_with(data)
         callback2.assert_called_once_with(data)
 
+    def test_subscribe_filters_by_code_verb_and_device(self) -> None:
+        """Filtered subscribers only receive matching messages."""
+        stream = RamsesMessageStream(MagicMock())
+        everything = MagicMock()
+        fan_state = MagicMock()
+        replies = MagicMock()
+        remote = MagicMock()
+        to_fan = MagicMock()
+        stream.subscribe(everything)
+        stream.subscribe(fan_state, codes=["31da", "10D0"])
+        stream.subscribe(replies, codes=["31DA"], verbs=["RP"])
+        stream.subscribe(remote, devices=["29:000001"])
+        stream.subscribe(to_fan, dsts=["32:150000"])
+
+        broadcast = {"src": "32:150000", "dst": "--:------", "verb": " I"}
+        messages = [
+            {**broadcast, "code": "31DA"},
+            {**broadcast, "code": "1298"},
+            {"src": "32:150000", "dst": "18:000001", "verb": "RP", "code": "31DA"},
+            {"src": "29:000001", "dst": "32:150000", "verb": " I", "code": "22F1"},
+        ]
+        for data in messages:
+            stream._notify_subscribers(data)
+
+        def _codes(mock: MagicMock) -> list[str]:
+            return [c.args[0]["code"] for c in mock.call_args_list]
+
+        assert _codes(everything) == ["31DA", "1298", "31DA", "22F1"]
+        assert _codes(fan_state) == ["31DA", "31DA"]
+        assert _codes(replies) == ["31DA"]
+        assert _codes(remote) == ["22F1"]
+        assert _codes(to_fan) == ["22F1"]
+
+    def test_filtered_dispatch_only_checks_interested_subscribers(self) -> None:
+        """Subscribers for other codes are not consulted at all."""
+        stream = RamsesMessageStream(MagicMock())
+        callbacks = [MagicMock() for _ in range(10)]
+        for i, callback in enumerate(callbacks):
+            stream.subscribe(callback, codes=[f"{i:04X}", "31DA"])
+        unsubs = [stream.subscribe(MagicMock(), codes=["1298"]) for _ in range(3)]
+
+        with patch(f"{_STREAM_MODULE}._Subscription.matches", autospec=True) as matches:
+            matches.return_value = True
+            stream._notify_subscribers({"code": "0003", "src": "32:150000"})
+
+        assert matches.call_count == 1
+        callbacks[3].assert_called_once()
+
+        for unsub in unsubs:
+            unsub()
+        unsubs[0]()
+        assert "1298" not in stream._by_code
+        assert len(stream._subscribers) == 10
+
+    def test_device_subscriber_called_once_when_src_equals_dst(self) -> None:
+        stream = RamsesMessageStream(MagicMock())
+        callback = MagicMock()
+        unsub = stream.subscribe(callback, devices=["32:150000"])
+
+        stream._notify_subscribers(
+            {"src": "32:150000", "dst": "32:150000", "code": "1298"}
+        )
+        unsub()
+        stream._notify_subscribers(
+            {"src": "32:150000", "dst": "32:150000", "code": "1298"}
+        )
+
+        callback.assert_called_once()
+        assert stream._by_device == {}
+
     def test_frame_from_dict_with_frame_key(self) -> None:
         """Test _frame_from_dict extracts frame from frame key."""
         hass = MagicMock()
@@ -390,3 +555,61 @@ class TestRamsesMessageStream:
         result = get_ramses_message_stream(hass)
 
         assert result is existing_stream
+
+
+class TestMessageBatcher:
+    @staticmethod
+    def _batcher(**kwargs: Any) -> tuple[MessageBatcher, list]:
+        hass = MagicMock()
+        hass.loop = asyncio.get_running_loop()
+        flushed: list = []
+        batcher = MessageBatcher(
+            hass, lambda msgs, coalesced: flushed.append((msgs, coalesced)), **kwargs
+        )
+        return batcher, flushed
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_window(self) -> None:
+        batcher, flushed = self._batcher(batch_ms=20)
+        first = {"src": "32:150000", "code": "31DA"}
+        second = {"src": "32:150000", "code": "1298"}
+        batcher.add(first)
+        batcher.add(second)
+        assert flushed == []
+
+        await asyncio.sleep(0.05)
+
+        assert flushed == [([first, second], 0)]
+        assert len(batcher) == 0
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_is_full(self) -> None:
+        batcher, flushed = self._batcher(batch_ms=10_000, max_batch=2)
+        for i in range(5):
+            batcher.add({"src": "32:150000", "code": "31DA", "n": i})
+
+        assert [[m["n"] for m in msgs] for msgs, _ in flushed] == [[0, 1], [2, 3]]
+        batcher.cancel()
+        await asyncio.sleep(0)
+        assert len(flushed) == 2
+
+    @pytest.mark.asyncio
+    async def test_coalesces_latest_value_per_src_and_code(self) -> None:
+        batcher, flushed = self._batcher(batch_ms=10_000, coalesce=True)
+        superseded = RamsesStreamMessage(src="32:150000", code="31DA", n=0)
+        superseded_decoder = MagicMock(return_value={"fan": "low"})
+        superseded.set_decoder(superseded_decoder)
+        batcher.add(superseded)
+        batcher.add({"src": "32:150000", "code": "1298", "n": 1})
+        latest = RamsesStreamMessage(src="32:150000", code="31DA", n=2)
+        latest.set_decoder(MagicMock(return_value={"fan": "high"}))
+        batcher.add(latest)
+        batcher.add({"src": "32:999999", "code": "31DA", "n": 3})
+
+        batcher.flush()
+
+        ((msgs, coalesced),) = flushed
+        assert [m["n"] for m in msgs] == [1, 2, 3]
+        assert coalesced == 1
+        assert dict(latest)["decoded_payload"] == {"fan": "high"}
+        superseded_decoder.assert_not_called()